@@ -1,6 +1,9 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
+from app.src.api.ledger import router as ledger_router
 from app.src.api.transaction import router as transaction_router
 from app.src.api.user import router as user_router
 from app.src.api.auth import router as auth_router
@@ -9,10 +12,41 @@ from app.src.exceptions.transaction_exceptions import (
 )
 from app.src.exceptions.user_exceptions import register_user_error_handlers
 from app.src.core.config import config
+from app.src.core.database import async_session_maker, shard_router
+from app.src.services.analytics.columnar import analytics_snapshot
+from app.src.services.exchange_rates import exchange_rate_store
+from app.src.services.password_hashing import password_hasher
+from app.src.services.partitions import TransactionPartitionService
+from app.src.services.shard_ids import ShardIdService
+from app.src.settings.analytics import AnalyticsBackendEnum
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for session_maker in shard_router.session_makers:
+        async with session_maker() as session:
+            await TransactionPartitionService(session=session).ensure()
+            await session.commit()
+    await ShardIdService(router=shard_router).interleave()
+    password_hasher.start()
+    exchange_rate_store.start(
+        async_session_maker, config.exchange_rates.EXCHANGE_RATES_REFRESH_INTERVAL
+    )
+    if config.analytics.ANALYTICS_BACKEND == AnalyticsBackendEnum.COLUMNAR:
+        analytics_snapshot.start(
+            shard_router.read_session_makers,
+            config.analytics.ANALYTICS_SNAPSHOT_REFRESH_INTERVAL,
+        )
+    yield
+    await analytics_snapshot.stop()
+    await exchange_rate_store.stop()
+    password_hasher.stop()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(transaction_router)
+app.include_router(ledger_router)
 app.include_router(user_router)
 app.include_router(auth_router)
 
@@ -0,0 +1,202 @@
+"""
+Changing the type of a column without rewriting its table under an exclusive
+lock, for migrations of tables that are written to while they run.
+
+``swap_column`` adds the column again under a temporary name, keeps it in
+sync with a trigger, fills it in batches of ``BATCH_SIZE`` rows committed one
+by one and builds its indexes ``CONCURRENTLY``. Only then, in one short
+transaction, the old column is dropped and the new one takes its name. Each
+step can be repeated, so a migration that failed half way can be run again.
+
+Must be called inside ``op.get_context().autocommit_block()``.
+"""
+
+from typing import Callable, NamedTuple, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+BATCH_SIZE = 10000
+# Longest wait for a table lock before a step gives up rather than queue
+# every other query on the table behind it.
+LOCK_TIMEOUT = "5s"
+
+
+class SwapIndex(NamedTuple):
+    """
+    An index on the swapped column, rebuilt on the new one. ``where`` may
+    refer to the swapped column as ``{column}``; ``constraint`` makes it a
+    unique constraint of that name.
+    """
+
+    name: str
+    columns: Sequence[str]
+    where: str | None = None
+    constraint: bool = False
+
+
+def column_type(table: str, column: str) -> str | None:
+    """``udt_name`` of ``table.column``, e.g. ``int8``, or ``None`` without it."""
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT udt_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() "
+                "AND table_name = :table AND column_name = :column"
+            ),
+            {"table": table, "column": column},
+        )
+        .scalar()
+    )
+
+
+def swap_column(
+    table: str,
+    column: str,
+    type_: str,
+    using: Callable[[str], str],
+    not_null: bool = False,
+    indexes: Sequence[SwapIndex] = (),
+) -> None:
+    """
+    Turn ``table.column`` into a ``type_`` column holding ``using(row)`` of
+    every row, where ``row`` is the prefix to qualify the row's columns with.
+    ``indexes`` are the indexes on the column, which are rebuilt.
+    """
+    new = f"{column}_new"
+    sync = f"{table}_{new}_sync"
+    check = f"{table}_{new}_not_null"
+
+    locked(
+        f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS {new} {type_}',
+        f"CREATE OR REPLACE FUNCTION {sync}() RETURNS trigger LANGUAGE plpgsql "
+        f"AS $sync$ BEGIN NEW.{new} := {using('NEW.')}; RETURN NEW; END $sync$",
+        f'DROP TRIGGER IF EXISTS {sync} ON "{table}"',
+        f'CREATE TRIGGER {sync} BEFORE INSERT OR UPDATE ON "{table}" '
+        f"FOR EACH ROW EXECUTE FUNCTION {sync}()",
+    )
+    backfill(table, f"{new} = {using('')}")
+
+    for index in indexes:
+        create_index(table, column, index)
+    if not_null:
+        locked(
+            f'ALTER TABLE "{table}" DROP CONSTRAINT IF EXISTS {check}',
+            f'ALTER TABLE "{table}" ADD CONSTRAINT {check} '
+            f"CHECK ({new} IS NOT NULL) NOT VALID",
+        )
+        op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {check}')
+
+    swap = [
+        f'DROP TRIGGER {sync} ON "{table}"',
+        f"DROP FUNCTION {sync}()",
+        f'ALTER TABLE "{table}" DROP COLUMN {column}',
+        f'ALTER TABLE "{table}" RENAME COLUMN {new} TO {column}',
+    ]
+    if not_null:
+        # Proven by the validated check, so this does not scan the table.
+        swap.append(f'ALTER TABLE "{table}" ALTER COLUMN {column} SET NOT NULL')
+        swap.append(f'ALTER TABLE "{table}" DROP CONSTRAINT {check}')
+    for index in indexes:
+        if index.constraint:
+            swap.append(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT {index.name} '
+                f"UNIQUE USING INDEX {index.name}_new"
+            )
+        else:
+            swap.append(f"ALTER INDEX {index.name}_new RENAME TO {index.name}")
+        for partition_index, oid in attached_indexes(f"{index.name}_new"):
+            swap.append(f"ALTER INDEX {partition_index} RENAME TO {index.name}_{oid}")
+    locked(*swap)
+
+
+def locked(*statements: str) -> None:
+    """Run ``statements`` in one transaction, waiting at most ``LOCK_TIMEOUT`` for locks."""
+    body = "; ".join((f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'", *statements))
+    op.execute(f"DO $swap$ BEGIN {body}; END $swap$")
+
+
+def backfill(table: str, assignment: str) -> None:
+    """Apply ``assignment`` to every row, one transaction per ``BATCH_SIZE`` ids."""
+    low, high = (
+        op.get_bind().execute(sa.text(f'SELECT min(id), max(id) FROM "{table}"')).one()
+    )
+    if low is None:
+        return
+    for start in range(low, high + 1, BATCH_SIZE):
+        op.execute(
+            f'UPDATE "{table}" SET {assignment} '
+            f"WHERE id >= {start} AND id < {start + BATCH_SIZE}"
+        )
+
+
+def create_index(table: str, column: str, index: SwapIndex) -> None:
+    """
+    Build ``index`` on the new column as ``<name>_new``. A partitioned table
+    cannot build an index ``CONCURRENTLY``, so each partition does and its
+    index is attached to one created on the parent alone.
+    """
+    name = f"{index.name}_new"
+    columns = ", ".join(f"{column}_new" if c == column else c for c in index.columns)
+    where = (
+        f" WHERE {index.where.format(column=f'{column}_new')}" if index.where else ""
+    )
+    unique = "UNIQUE " if index.constraint else ""
+
+    if not is_partitioned(table):
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute(
+            f'CREATE {unique}INDEX CONCURRENTLY {name} ON "{table}" ({columns}){where}'
+        )
+        return
+
+    locked(
+        f"DROP INDEX IF EXISTS {name}",
+        f'CREATE INDEX {name} ON ONLY "{table}" ({columns}){where}',
+    )
+    partitions = op.get_bind().execute(
+        sa.text(
+            "SELECT partition.relname, partition.oid FROM pg_inherits "
+            "JOIN pg_class AS partition ON partition.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": f'"{table}"'},
+    )
+    for partition, oid in partitions.all():
+        partition_index = f"{name}_{oid}"
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {partition_index}")
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY {partition_index} "
+            f'ON "{partition}" ({columns}){where}'
+        )
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def is_partitioned(table: str) -> bool:
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT relkind = 'p' FROM pg_class "
+                "WHERE oid = CAST(:table AS regclass)"
+            ),
+            {"table": f'"{table}"'},
+        )
+        .scalar()
+    )
+
+
+def attached_indexes(index: str) -> list[tuple[str, int]]:
+    """Indexes attached to partitioned ``index``, with the oid of their partition."""
+    rows = op.get_bind().execute(
+        sa.text(
+            "SELECT CAST(CAST(child.indexrelid AS regclass) AS text), "
+            "CAST(child.indrelid AS bigint) "
+            "FROM pg_inherits "
+            "JOIN pg_index AS child ON child.indexrelid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:index)"
+        ),
+        {"index": index},
+    )
+    return [tuple(row) for row in rows]
@@ -7,19 +7,29 @@ from alembic import context
 from src.core.config import config as app_config
 from src.core.models import BaseModel
 from src.models import *  # noqa
+from src.models.transaction import TRANSACTION_PARTITION_NAME
 
 config = context.config
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-config.set_main_option(
-    "sqlalchemy.url", app_config.database.url + "?async_fallback=True"
+# ``alembic -x shard=N upgrade head`` migrates the N-th entry of SHARD_URLS;
+# shard 0, the default, is the primary.
+shard = int(context.get_x_argument(as_dictionary=True).get("shard", 0))
+database_url = (
+    app_config.sharding.SHARD_URLS[shard - 1] if shard else app_config.database.url
 )
+config.set_main_option("sqlalchemy.url", database_url + "?async_fallback=True")
 
 target_metadata = BaseModel.metadata
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Partitions of ``transaction`` are created at runtime, not from models.
+    return not (type_ == "table" and TRANSACTION_PARTITION_NAME.fullmatch(name))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -59,7 +69,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,274 @@
+"""baseline
+
+Creates every table of the current models together with the indexes used by
+the hot paths. Tables and indexes that already exist (databases created with
+``create_all`` before migrations were introduced) are left in place, so the
+baseline can be applied to them directly and only adds what is missing.
+
+Revision ID: 5f2c1d8e9a10
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f2c1d8e9a10"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "exchange_rate",
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("rate", sa.Numeric(), nullable=False),
+        sa.Column("effective_from", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "currency", "effective_from", name="exchange_rate_currency_effective_from"
+        ),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "user",
+        sa.Column("first_name", sa.String(), nullable=False),
+        sa.Column("last_name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "user_created", "user", ["created"], unique=False, if_not_exists=True
+    )
+    op.create_table(
+        "weekly_transaction_stats",
+        sa.Column("week_start", sa.DateTime(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("transactions_count", sa.Integer(), nullable=False),
+        sa.Column("not_rollbacked_transactions_count", sa.Integer(), nullable=False),
+        sa.Column("not_rollbacked_deposit_amount", sa.Numeric(), nullable=False),
+        sa.Column("not_rollbacked_withdraw_amount", sa.Numeric(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "week_start", "currency", name="weekly_transaction_stats_week_currency"
+        ),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "weekly_user_stats",
+        sa.Column("week_start", sa.DateTime(), nullable=False),
+        sa.Column("registered_users_count", sa.Integer(), nullable=False),
+        sa.Column("registered_and_deposit_users_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "registered_and_not_rollbacked_deposit_users_count",
+            sa.Integer(),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("week_start"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "balance_snapshot",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("amount", sa.Numeric(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id",
+            "currency",
+            "taken_at",
+            name="balance_snapshot_user_currency_taken_at",
+        ),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "idempotency_key",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("request_hash", sa.String(), nullable=False),
+        sa.Column("response", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "key", name="idempotency_key_user_key_unique"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "transaction",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=True),
+        sa.Column("amount", sa.Numeric(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "transaction_created_id",
+        "transaction",
+        ["created", "id"],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "transaction_not_rollbacked_created",
+        "transaction",
+        ["created"],
+        unique=False,
+        if_not_exists=True,
+        postgresql_where=sa.text("status <> 'ROLLBACKED'"),
+    )
+    op.create_index(
+        "transaction_not_rollbacked_user_id_created",
+        "transaction",
+        ["user_id", "created"],
+        unique=False,
+        if_not_exists=True,
+        postgresql_where=sa.text("status <> 'ROLLBACKED'"),
+    )
+    op.create_index(
+        "transaction_user_id_created_id",
+        "transaction",
+        ["user_id", "created", "id"],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_table(
+        "user_balance",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=True),
+        sa.Column("amount", sa.Numeric(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "currency", name="user_balance_user_currency_unique"
+        ),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "ledger_entry",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("transaction_id", sa.Integer(), nullable=True),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("amount", sa.Numeric(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["transaction_id"],
+            ["transaction.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ledger_entry_transaction_id",
+        "ledger_entry",
+        ["transaction_id"],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ledger_entry_user_currency_created",
+        "ledger_entry",
+        ["user_id", "currency", "created"],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ledger_entry_user_currency_created", table_name="ledger_entry", if_exists=True
+    )
+    op.drop_index(
+        "ledger_entry_transaction_id", table_name="ledger_entry", if_exists=True
+    )
+    op.drop_table("ledger_entry", if_exists=True)
+    op.drop_table("user_balance", if_exists=True)
+    op.drop_index(
+        "transaction_user_id_created_id", table_name="transaction", if_exists=True
+    )
+    op.drop_index(
+        "transaction_not_rollbacked_user_id_created",
+        table_name="transaction",
+        if_exists=True,
+    )
+    op.drop_index(
+        "transaction_not_rollbacked_created", table_name="transaction", if_exists=True
+    )
+    op.drop_index("transaction_created_id", table_name="transaction", if_exists=True)
+    op.drop_table("transaction", if_exists=True)
+    op.drop_table("idempotency_key", if_exists=True)
+    op.drop_table("balance_snapshot", if_exists=True)
+    op.drop_table("weekly_user_stats", if_exists=True)
+    op.drop_table("weekly_transaction_stats", if_exists=True)
+    op.drop_index("user_created", table_name="user", if_exists=True)
+    op.drop_table("user", if_exists=True)
+    op.drop_table("exchange_rate", if_exists=True)
@@ -0,0 +1,192 @@
+"""partition transaction by month
+
+Turns ``transaction`` into a table range-partitioned by month on ``created``
+without rewriting or blocking the existing rows:
+
+1. A unique ``(id, created)`` index is built ``CONCURRENTLY`` and a
+   ``created < boundary`` check is added ``NOT VALID`` and then validated,
+   neither of which blocks writes. ``boundary`` is the start of next month.
+2. In one short transaction the old table is renamed to
+   ``transaction_history``, a partitioned ``transaction`` sharing its id
+   sequence is created and the old table is attached as the partition for
+   everything before ``boundary``. The validated check lets Postgres skip
+   scanning it, and the existing indexes are adopted instead of rebuilt.
+3. Monthly partitions are created from ``boundary`` on. Later months are
+   added by ``python -m app.src.commands.partitions``.
+
+``ledger_entry.transaction_id`` loses its foreign key, since unique
+constraints of a partitioned table must include the partition key.
+
+Databases created with ``create_all`` already have a partitioned
+``transaction`` and are left as they are; their partitions are created by
+the same command, which also runs on application startup.
+
+Revision ID: 8b4d2e7f1c3a
+Revises: 5f2c1d8e9a10
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4d2e7f1c3a"
+down_revision: Union[str, Sequence[str], None] = "5f2c1d8e9a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HISTORY_PARTITION = "transaction_history"
+MONTHS_AHEAD = 3
+
+INDEXES = (
+    ("transaction_created_id", ["created", "id"], None),
+    ("transaction_user_id_created_id", ["user_id", "created", "id"], None),
+    (
+        "transaction_not_rollbacked_created",
+        ["created"],
+        sa.text("status <> 'ROLLBACKED'"),
+    ),
+    (
+        "transaction_not_rollbacked_user_id_created",
+        ["user_id", "created"],
+        sa.text("status <> 'ROLLBACKED'"),
+    ),
+)
+
+
+def next_month(value: datetime) -> datetime:
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def is_partitioned() -> bool:
+    return op.get_bind().scalar(
+        sa.text(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = 'transaction'::regclass"
+        )
+    )
+
+
+def create_partitioned_table() -> None:
+    op.create_table(
+        "transaction",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('transaction_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=True),
+        sa.Column("amount", sa.Numeric(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id", "created"),
+        postgresql_partition_by="RANGE (created)",
+    )
+    for name, columns, where in INDEXES:
+        op.create_index(name, "transaction", columns, postgresql_where=where)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if is_partitioned():
+        return
+    boundary = next_month(datetime.utcnow())
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "transaction_history_id_created",
+            "transaction",
+            ["id", "created"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.execute(
+            "ALTER TABLE transaction ADD CONSTRAINT transaction_history_bound "
+            f"CHECK (created < '{boundary.isoformat()}') NOT VALID"
+        )
+        op.execute(
+            "ALTER TABLE transaction VALIDATE CONSTRAINT transaction_history_bound"
+        )
+
+    # Fail fast instead of queueing writers behind a long-running query.
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute(
+        "ALTER TABLE ledger_entry "
+        "DROP CONSTRAINT IF EXISTS ledger_entry_transaction_id_fkey"
+    )
+    op.rename_table("transaction", HISTORY_PARTITION)
+    op.drop_constraint("transaction_pkey", HISTORY_PARTITION, type_="primary")
+    op.execute(
+        f"ALTER TABLE {HISTORY_PARTITION} ADD CONSTRAINT {HISTORY_PARTITION}_pkey "
+        "PRIMARY KEY USING INDEX transaction_history_id_created"
+    )
+    op.execute(
+        f"ALTER TABLE {HISTORY_PARTITION} RENAME CONSTRAINT "
+        f"transaction_user_id_fkey TO {HISTORY_PARTITION}_user_id_fkey"
+    )
+    for name, _, _ in INDEXES:
+        op.execute(
+            f"ALTER INDEX {name} "
+            f"RENAME TO {name.replace('transaction', HISTORY_PARTITION, 1)}"
+        )
+
+    create_partitioned_table()
+    op.execute(
+        f"ALTER TABLE transaction ATTACH PARTITION {HISTORY_PARTITION} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    )
+    op.drop_constraint("transaction_history_bound", HISTORY_PARTITION)
+    op.execute("ALTER SEQUENCE transaction_id_seq OWNED BY transaction.id")
+
+    start = boundary
+    for _ in range(MONTHS_AHEAD):
+        end = next_month(start)
+        op.execute(
+            f"CREATE TABLE transaction_y{start.year}m{start.month:02d} "
+            f"PARTITION OF transaction FOR VALUES FROM ('{start.isoformat()}') "
+            f"TO ('{end.isoformat()}')"
+        )
+        start = end
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not is_partitioned():
+        return
+
+    # Unlike the upgrade this copies every row and holds the table locked.
+    op.execute("LOCK TABLE transaction IN ACCESS EXCLUSIVE MODE")
+    op.execute(
+        "CREATE TABLE transaction_unpartitioned "
+        "(LIKE transaction INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("INSERT INTO transaction_unpartitioned SELECT * FROM transaction")
+    op.execute(
+        "ALTER SEQUENCE transaction_id_seq OWNED BY transaction_unpartitioned.id"
+    )
+    op.drop_table("transaction")
+    op.rename_table("transaction_unpartitioned", "transaction")
+
+    op.create_primary_key("transaction_pkey", "transaction", ["id"])
+    op.create_foreign_key(
+        "transaction_user_id_fkey", "transaction", "user", ["user_id"], ["id"]
+    )
+    for name, columns, where in INDEXES:
+        op.create_index(name, "transaction", columns, postgresql_where=where)
+    op.create_foreign_key(
+        "ledger_entry_transaction_id_fkey",
+        "ledger_entry",
+        "transaction",
+        ["transaction_id"],
+        ["id"],
+    )
@@ -0,0 +1,44 @@
+"""transaction archive manifest
+
+Revision ID: 9c6a3f0d2b71
+Revises: 8b4d2e7f1c3a
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c6a3f0d2b71"
+down_revision: Union[str, Sequence[str], None] = "8b4d2e7f1c3a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "transaction_archive",
+        sa.Column("period_start", sa.DateTime(), nullable=False),
+        sa.Column("period_end", sa.DateTime(), nullable=False),
+        sa.Column("path", sa.String(), nullable=True),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("min_id", sa.Integer(), nullable=True),
+        sa.Column("max_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("period_start", name="transaction_archive_period_start"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("transaction_archive", if_exists=True)
@@ -0,0 +1,44 @@
+"""index idempotency keys by created
+
+Lets ``python -m app.src.commands.idempotency_keys`` find expired keys
+without scanning the table. Built ``CONCURRENTLY`` so that transaction
+requests carrying an ``Idempotency-Key`` are not blocked meanwhile.
+
+Revision ID: a4c9e2b7d1f3
+Revises: f1b7d3a9c2e5
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c9e2b7d1f3"
+down_revision: Union[str, Sequence[str], None] = "f1b7d3a9c2e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idempotency_key_created",
+            "idempotency_key",
+            ["created"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idempotency_key_created",
+            table_name="idempotency_key",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
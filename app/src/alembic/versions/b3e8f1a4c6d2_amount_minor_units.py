@@ -0,0 +1,120 @@
+"""store amounts as integer minor units
+
+``transaction``, ``user_balance``, ``ledger_entry`` and ``balance_snapshot``
+amounts become ``BIGINT`` numbers of minor units (``amount * 10 ** scale``
+with the per-currency scale below, mirroring ``CURRENCY_SCALES``). The
+upgrade refuses to run while any amount has a currency without a scale or
+more decimals than its currency's scale, rather than change it.
+
+Each column is swapped online with ``column_swap``, so the tables stay
+writable meanwhile. Tables whose ``amount`` already is ``BIGINT``, e.g.
+created from the models, are left alone.
+
+Revision ID: b3e8f1a4c6d2
+Revises: 9c6a3f0d2b71
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from src.alembic.column_swap import column_type, swap_column
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8f1a4c6d2"
+down_revision: Union[str, Sequence[str], None] = "9c6a3f0d2b71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CURRENCY_SCALES = {
+    "USD": 2,
+    "EUR": 2,
+    "AUD": 2,
+    "CAD": 2,
+    "ARS": 2,
+    "PLN": 2,
+    "BTC": 8,
+    "ETH": 8,
+    "DOGE": 8,
+    "USDT": 6,
+}
+TABLES = ("transaction", "user_balance", "ledger_entry", "balance_snapshot")
+NOT_NULL_TABLES = ("ledger_entry", "balance_snapshot")
+
+
+def per_currency(value, row: str = "") -> str:
+    """``value(scale)`` of the row's currency, ``NULL`` for an unknown one."""
+    cases = " ".join(
+        f"WHEN '{currency}' THEN {value(scale)}"
+        for currency, scale in CURRENCY_SCALES.items()
+    )
+    return f"CASE {row}currency {cases} ELSE NULL END"
+
+
+def to_minor_units(row: str) -> str:
+    return f"round({row}amount * {per_currency(lambda scale: 10**scale, row)})"
+
+
+def from_minor_units(row: str) -> str:
+    return f"{row}amount * {per_currency(lambda scale: f'1e-{scale}', row)}"
+
+
+def check_convertible(tables) -> None:
+    """Fail unless every amount converts to minor units exactly."""
+    known = ", ".join(f"'{currency}'" for currency in CURRENCY_SCALES)
+    scaled = f"amount * {per_currency(lambda scale: 10**scale)}"
+    problems = []
+    for table in tables:
+        unknown, inexact = (
+            op.get_bind()
+            .execute(
+                sa.text(
+                    "SELECT count(*) FILTER (WHERE currency IS NULL "
+                    f"OR currency NOT IN ({known})), "
+                    f"count(*) FILTER (WHERE {scaled} <> round({scaled})) "
+                    f'FROM "{table}" WHERE amount IS NOT NULL'
+                )
+            )
+            .one()
+        )
+        if unknown:
+            problems.append(f"{table}: {unknown} amounts in an unknown currency")
+        if inexact:
+            problems.append(f"{table}: {inexact} amounts with too many decimals")
+    if problems:
+        raise RuntimeError(
+            "Amounts cannot be converted to minor units without changing them; "
+            "fix them first. " + "; ".join(problems)
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = [table for table in TABLES if column_type(table, "amount") != "int8"]
+    check_convertible(tables)
+    with op.get_context().autocommit_block():
+        for table in tables:
+            swap_column(
+                table,
+                "amount",
+                "bigint",
+                to_minor_units,
+                not_null=table in NOT_NULL_TABLES,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            if column_type(table, "amount") != "numeric":
+                swap_column(
+                    table,
+                    "amount",
+                    "numeric",
+                    from_minor_units,
+                    not_null=table in NOT_NULL_TABLES,
+                )
@@ -0,0 +1,44 @@
+"""tell ledger entries apart by the snapshot that saw them
+
+``ledger_entry.xact_id`` records the transaction that wrote each entry and
+``balance_snapshot.xact_snapshot`` the ``pg_current_snapshot()`` a balance
+snapshot was computed with. An entry dated before a snapshot but committed
+after it is then counted on top of that snapshot instead of being lost.
+
+Both columns are nullable and the default is set after the column is added,
+so neither table is rewritten; existing rows keep the previous behaviour.
+
+Revision ID: c5e1a7f3b9d4
+Revises: a4c9e2b7d1f3
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e1a7f3b9d4"
+down_revision: Union[str, Sequence[str], None] = "a4c9e2b7d1f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("ALTER TABLE ledger_entry ADD COLUMN IF NOT EXISTS xact_id xid8")
+    op.execute(
+        "ALTER TABLE ledger_entry ALTER COLUMN xact_id SET DEFAULT pg_current_xact_id()"
+    )
+    op.execute(
+        "ALTER TABLE balance_snapshot ADD COLUMN IF NOT EXISTS xact_snapshot pg_snapshot"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("ALTER TABLE balance_snapshot DROP COLUMN IF EXISTS xact_snapshot")
+    op.execute("ALTER TABLE ledger_entry DROP COLUMN IF EXISTS xact_id")
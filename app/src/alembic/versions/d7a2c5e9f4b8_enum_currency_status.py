@@ -0,0 +1,118 @@
+"""store currency and status as postgres enums
+
+``currency`` on ``transaction``, ``user_balance``, ``ledger_entry`` and
+``balance_snapshot`` and ``transaction.status`` become enum columns, four
+bytes per value instead of the repeated label. The ledger tables follow the
+balance tables so comparisons between them stay enum to enum.
+
+Each column is swapped online with ``column_swap``, together with the
+indexes and unique constraints on it, among them the partial indexes on
+``transaction`` filtering on ``status``. Columns that already have the enum
+type, e.g. created from the models, are left alone.
+
+Revision ID: d7a2c5e9f4b8
+Revises: b3e8f1a4c6d2
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from src.alembic.column_swap import SwapIndex, column_type, swap_column
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a2c5e9f4b8"
+down_revision: Union[str, Sequence[str], None] = "b3e8f1a4c6d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+currency = postgresql.ENUM(
+    "USD",
+    "EUR",
+    "AUD",
+    "CAD",
+    "ARS",
+    "PLN",
+    "BTC",
+    "ETH",
+    "DOGE",
+    "USDT",
+    name="currency",
+)
+transaction_status = postgresql.ENUM(
+    "PROCESSED", "ROLLBACKED", name="transaction_status"
+)
+CURRENCY_TABLES = ("transaction", "user_balance", "ledger_entry", "balance_snapshot")
+NOT_NULL_TABLES = ("ledger_entry", "balance_snapshot")
+CURRENCY_INDEXES = {
+    "user_balance": [
+        SwapIndex(
+            "user_balance_user_currency_unique",
+            ["user_id", "currency"],
+            constraint=True,
+        )
+    ],
+    "ledger_entry": [
+        SwapIndex(
+            "ledger_entry_user_currency_created", ["user_id", "currency", "created"]
+        )
+    ],
+    "balance_snapshot": [
+        SwapIndex(
+            "balance_snapshot_user_currency_taken_at",
+            ["user_id", "currency", "taken_at"],
+            constraint=True,
+        )
+    ],
+}
+STATUS_INDEXES = [
+    SwapIndex(
+        "transaction_not_rollbacked_created", ["created"], "{column} <> 'ROLLBACKED'"
+    ),
+    SwapIndex(
+        "transaction_not_rollbacked_user_id_created",
+        ["user_id", "created"],
+        "{column} <> 'ROLLBACKED'",
+    ),
+]
+
+
+def swap_types(currency_type: str, status_type: str) -> None:
+    """Swap the currency and status columns not yet of the given types."""
+    for table in CURRENCY_TABLES:
+        if column_type(table, "currency") != currency_type:
+            swap_column(
+                table,
+                "currency",
+                currency_type,
+                lambda row: f"CAST({row}currency AS {currency_type})",
+                not_null=table in NOT_NULL_TABLES,
+                indexes=CURRENCY_INDEXES.get(table, ()),
+            )
+    if column_type("transaction", "status") != status_type:
+        swap_column(
+            "transaction",
+            "status",
+            status_type,
+            lambda row: f"CAST({row}status AS {status_type})",
+            indexes=STATUS_INDEXES,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    currency.create(op.get_bind(), checkfirst=True)
+    transaction_status.create(op.get_bind(), checkfirst=True)
+    with op.get_context().autocommit_block():
+        swap_types("currency", "transaction_status")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        swap_types("varchar", "varchar")
+    transaction_status.drop(op.get_bind(), checkfirst=True)
+    currency.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,44 @@
+"""directory of user emails across shards
+
+``user_email`` is used on the primary only. Sign-ups and imports claim an
+email there together with the new user's id before the user is written to
+their shard, so an email is unique across shards rather than per shard.
+``python -m app.src.commands.user_emails`` fills it with the existing users.
+
+Revision ID: e8d4b2f6a1c7
+Revises: c5e1a7f3b9d4
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8d4b2f6a1c7"
+down_revision: Union[str, Sequence[str], None] = "c5e1a7f3b9d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_email",
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_email", if_exists=True)
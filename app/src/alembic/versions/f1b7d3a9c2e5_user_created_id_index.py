@@ -0,0 +1,61 @@
+"""index users by (created, id)
+
+The admin user list pages by ``(created, id)`` keysets; extending
+``user_created`` with ``id`` serves both the range and the order from the
+index.
+
+Both indexes are built and dropped ``CONCURRENTLY``, outside the migration
+transaction, so writes to ``user`` are never blocked. ``IF [NOT] EXISTS``
+lets a run interrupted between the two steps be repeated.
+
+Revision ID: f1b7d3a9c2e5
+Revises: d7a2c5e9f4b8
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1b7d3a9c2e5"
+down_revision: Union[str, Sequence[str], None] = "d7a2c5e9f4b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "user_created_id",
+            "user",
+            ["created", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "user_created",
+            table_name="user",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "user_created",
+            "user",
+            ["created"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "user_created_id",
+            table_name="user",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
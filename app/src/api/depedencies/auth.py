@@ -1,7 +1,7 @@
 from typing import Annotated
 from fastapi import Depends, HTTPException, Path
 from fastapi.security import OAuth2PasswordBearer
-from app.src.api.depedencies.user_dependencies import get_user_service
+from app.src.api.depedencies.user_dependencies import get_current_user_service
 from app.src.core.config import config
 from app.src.core.redis import RedisClient, get_redis_client
 from app.src.exceptions.auth_exceptions import CredentialException
@@ -9,21 +9,21 @@ from app.src.schemas.auth import RequestUserLoginInfoModel, TokenTypeEnum
 from fastapi import status
 from app.src.models.user import User
 from app.src.schemas.user_schemas import UserModel
-from app.src.services.user import UserService
+from app.src.services.user import ShardedUserService, UserService
 from app.src.utils.jwt import decode_token
 from jwt import ExpiredSignatureError
 from app.src.services.auth_service import AuthService
-from app.src.core.database import get_async_session
-from sqlalchemy.ext.asyncio import AsyncSession
+from app.src.core.database import shard_router
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
 def get_auth_service(
-    session: AsyncSession = Depends(get_async_session),
     redis_client: RedisClient = Depends(get_redis_client),
 ) -> AuthService:
-    return AuthService(session=session, redis=redis_client)
+    return AuthService(
+        users=ShardedUserService(router=shard_router), redis=redis_client
+    )
 
 
 async def login_attempts_dependency(
@@ -69,7 +69,7 @@ class UserFetchFromToken:
     async def __call__(
         self,
         payload: dict = Depends(get_current_token_payload),
-        user_service: UserService = Depends(get_user_service),
+        user_service: UserService = Depends(get_current_user_service),
     ):
         await self.__validate_token_type(payload, self.token_type)
         user = await self.__get_current_auth_user(payload, user_service)
@@ -0,0 +1,11 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.api.depedencies.session_dependencies import get_read_session
+from app.src.services.ledger import LedgerService
+
+
+def get_ledger_service(
+    session: AsyncSession = Depends(get_read_session),
+) -> LedgerService:
+    return LedgerService(session=session)
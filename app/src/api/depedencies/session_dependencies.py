@@ -0,0 +1,98 @@
+from typing import AsyncGenerator, List
+
+from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordBearer
+from jwt import PyJWTError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.src.core.database import shard_router
+from app.src.core.redis import RedisClient, get_redis_client
+from app.src.services.read_your_writes import ReadYourWritesService
+from app.src.utils.jwt import decode_token
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
+
+
+def get_token_user_id(
+    token: str | None = Depends(optional_oauth2_scheme),
+) -> int | None:
+    """Id of the user making the request, ``None`` for anonymous requests."""
+    if token is None:
+        return None
+    try:
+        return decode_token(token).get("user_id")
+    except PyJWTError:
+        return None
+
+
+def get_shard_user_id(
+    request: Request, token_user_id: int | None = Depends(get_token_user_id)
+) -> int | None:
+    """
+    User whose shard serves the request: the ``user_id`` in the path, or the
+    caller when the path names no user.
+    """
+    user_id = request.path_params.get("user_id")
+    if user_id is not None and user_id.isdigit():
+        return int(user_id)
+    return token_user_id
+
+
+def get_read_your_writes_service(
+    redis_client: RedisClient = Depends(get_redis_client),
+) -> ReadYourWritesService:
+    return ReadYourWritesService(redis=redis_client)
+
+
+async def get_write_session(
+    user_id: int | None = Depends(get_token_user_id),
+    shard_user_id: int | None = Depends(get_shard_user_id),
+    read_your_writes: ReadYourWritesService = Depends(get_read_your_writes_service),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Primary session for write use cases and the reads they make. The user is
+    marked before the write starts and again once the session is closed,
+    since this runs after the response was sent.
+    """
+    if user_id is not None:
+        await read_your_writes.mark(user_id)
+    async with shard_router.session_maker_for(shard_user_id)() as session:
+        yield session
+    if user_id is not None:
+        await read_your_writes.mark(user_id)
+
+
+async def get_read_session_makers(
+    user_id: int | None = Depends(get_token_user_id),
+    read_your_writes: ReadYourWritesService = Depends(get_read_your_writes_service),
+) -> List[async_sessionmaker[AsyncSession]]:
+    """
+    Per-shard session makers for the caller's reads: replicas, or primaries
+    while the caller is within the read-your-writes window of their last
+    write.
+    """
+    if user_id is not None and await read_your_writes.wrote_recently(user_id):
+        return shard_router.session_makers
+    return shard_router.read_session_makers
+
+
+async def get_read_session(
+    shard_user_id: int | None = Depends(get_shard_user_id),
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Read session on the shard of the user the request is about."""
+    async with session_makers[shard_router.shard_for(shard_user_id)]() as session:
+        yield session
+
+
+async def get_caller_read_session(
+    user_id: int | None = Depends(get_token_user_id),
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Read session on the caller's own shard, to load the caller."""
+    async with session_makers[shard_router.shard_for(user_id)]() as session:
+        yield session
@@ -1,27 +1,105 @@
+from typing import List
+
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.src.core.database import get_async_session
+from app.src.api.depedencies.session_dependencies import (
+    get_read_session_makers,
+    get_write_session,
+)
+from app.src.core.config import config
+from app.src.core.database import shard_router
+from app.src.core.redis import RedisClient, get_redis_client
+from app.src.services.analytics.cache import CachedAnalysisService
+from app.src.services.analytics.columnar import ColumnarAnalysisService
+from app.src.services.analytics.report import (
+    AnalysisService,
+    TransactionAnalysisService,
+)
+from app.src.services.analytics.rollup import WeeklyRollupService
+from app.src.services.analytics.sharded import (
+    ShardedAnalysisService,
+    ShardedCohortService,
+)
+from app.src.services.analytics.stream import TransactionAnalyticsService
+from app.src.services.export import TransactionExportService
 from app.src.services.flows.transaction_flows import (
+    CreateTransactionBatchUseCase,
     CreateTransactionUseCase,
     TransactionRollBackUseCase,
 )
-from app.src.services.transaction import TransactionService
+from app.src.services.transaction import ShardedTransactionService
+from app.src.settings.analytics import AnalyticsBackendEnum
 
 
 def get_transaction_service(
-    session: AsyncSession = Depends(get_async_session),
-) -> TransactionService:
-    return TransactionService(session=session)
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+) -> ShardedTransactionService:
+    return ShardedTransactionService(router=shard_router, session_makers=session_makers)
 
 
 def get_transaction_create_use_case(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_write_session),
+    redis_client: RedisClient = Depends(get_redis_client),
 ) -> CreateTransactionUseCase:
-    return CreateTransactionUseCase(session=session)
+    return CreateTransactionUseCase(session=session, redis=redis_client)
+
+
+def get_transaction_create_batch_use_case(
+    session: AsyncSession = Depends(get_write_session),
+    redis_client: RedisClient = Depends(get_redis_client),
+) -> CreateTransactionBatchUseCase:
+    return CreateTransactionBatchUseCase(session=session, redis=redis_client)
 
 
 def get_transaction_roll_back_use_case(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_write_session),
+    redis_client: RedisClient = Depends(get_redis_client),
 ) -> TransactionRollBackUseCase:
-    return TransactionRollBackUseCase(session=session)
+    return TransactionRollBackUseCase(session=session, redis=redis_client)
+
+
+def get_transaction_analysis_service(
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+    redis_client: RedisClient = Depends(get_redis_client),
+) -> AnalysisService:
+    if config.analytics.ANALYTICS_BACKEND == AnalyticsBackendEnum.COLUMNAR:
+        # Served from memory already; caching closed weeks could also pin rows
+        # computed before the snapshot caught up with a rollback.
+        return ColumnarAnalysisService()
+    if config.analytics.ANALYTICS_BACKEND == AnalyticsBackendEnum.ROLLUP:
+        backend = ShardedAnalysisService(session_makers, WeeklyRollupService)
+    else:
+        backend = ShardedAnalysisService(session_makers, TransactionAnalysisService)
+
+    if config.analytics.ANALYTICS_CACHE_ENABLED:
+        return CachedAnalysisService(backend=backend, redis=redis_client)
+    return backend
+
+
+def get_cohort_service(
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+) -> ShardedCohortService:
+    return ShardedCohortService(session_makers)
+
+
+def get_transaction_analytics_service(
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+) -> TransactionAnalyticsService:
+    return TransactionAnalyticsService(session_makers=session_makers)
+
+
+def get_transaction_export_service(
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+) -> TransactionExportService:
+    return TransactionExportService(router=shard_router, session_makers=session_makers)
@@ -1,8 +1,16 @@
+from typing import List
+
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.src.core.database import get_async_session
-from app.src.services.user import UserService
+from app.src.api.depedencies.session_dependencies import (
+    get_caller_read_session,
+    get_read_session_makers,
+    get_write_session,
+)
+from app.src.core.database import shard_router
+from app.src.services.user import ShardedUserService, UserService
+from app.src.services.user_import import UserImportService
 
 # def get_user_repository(session: AsyncSession = Depends(get_async_session)) -> UserRepository:
 #     return UserRepository(session=session)
@@ -11,5 +19,23 @@ from app.src.services.user import UserService
 #     return UserBalanceRepository(session=session)
 
 
-def get_user_service(session: AsyncSession = Depends(get_async_session)) -> UserService:
+def get_user_service(session: AsyncSession = Depends(get_write_session)) -> UserService:
+    return UserService(session=session)
+
+
+def get_current_user_service(
+    session: AsyncSession = Depends(get_caller_read_session),
+) -> UserService:
     return UserService(session=session)
+
+
+def get_sharded_user_service(
+    session_makers: List[async_sessionmaker[AsyncSession]] = Depends(
+        get_read_session_makers
+    ),
+) -> ShardedUserService:
+    return ShardedUserService(router=shard_router, session_makers=session_makers)
+
+
+def get_user_import_service() -> UserImportService:
+    return UserImportService(router=shard_router)
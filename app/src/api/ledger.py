@@ -0,0 +1,45 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Path, status
+
+from app.src.api.depedencies.auth import check_user_ownership
+from app.src.api.depedencies.ledger_dependencies import get_ledger_service
+from app.src.core.permissions import PermissionsDependency, UserPermission
+from app.src.schemas.ledger_schemas import (
+    BalanceAtFilter,
+    ResponseBalanceModel,
+    ResponseStatementModel,
+    StatementFilter,
+)
+from app.src.services.ledger import LedgerService
+
+router = APIRouter(
+    tags=["ledger"], dependencies=[Depends(PermissionsDependency([UserPermission]))]
+)
+
+
+@router.get(
+    "/{user_id}/balances",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(check_user_ownership)],
+)
+async def get_balances(
+    user_id: int = Path(ge=0, description="User ID must be positive integer"),
+    filters: BalanceAtFilter = Depends(),
+    service: LedgerService = Depends(get_ledger_service),
+) -> List[ResponseBalanceModel]:
+    """Balances as of ``at`` (now when omitted), from the ledger."""
+    return await service.get_balances(user_id=user_id, filters=filters)
+
+
+@router.get(
+    "/{user_id}/statement",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(check_user_ownership)],
+)
+async def get_statement(
+    user_id: int = Path(ge=0, description="User ID must be positive integer"),
+    filters: StatementFilter = Depends(),
+    service: LedgerService = Depends(get_ledger_service),
+) -> ResponseStatementModel:
+    return await service.get_statement(user_id=user_id, filters=filters)
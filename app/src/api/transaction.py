@@ -1,49 +1,97 @@
 from typing import Optional, List
-from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, Path, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Header, Path, status
+from fastapi.responses import StreamingResponse
 
 from app.src.api.depedencies.auth import check_user_ownership
 from app.src.api.depedencies.transaction_dependencies import (
+    get_cohort_service,
+    get_transaction_analysis_service,
+    get_transaction_analytics_service,
+    get_transaction_create_batch_use_case,
     get_transaction_create_use_case,
+    get_transaction_export_service,
     get_transaction_roll_back_use_case,
     get_transaction_service,
 )
-from app.src.core.database import get_async_session
 from app.src.core.permissions import (
     AdminPermission,
     PermissionsDependency,
     UserPermission,
 )
 from app.src.schemas.transaction_schemas import (
+    AnalyticsFilter,
+    CohortFilter,
+    ExportFormatEnum,
+    RequestTransactionBatchModel,
     RequestTransactionModel,
+    ResponseCohortModel,
+    ResponseTransactionPageModel,
+    TransactionExportParams,
+    TransactionFilter,
     TransactionModel,
+    TransactionPageParams,
 )
 from app.src.services.flows.transaction_flows import (
+    CreateTransactionBatchUseCase,
     CreateTransactionUseCase,
     TransactionRollBackUseCase,
 )
-from app.src.services.transaction import (
-    TransactionService,
-    get_not_rollbacked_deposit_amount,
-    get_not_rollbacked_transactions_count,
-    get_not_rollbacked_withdraw_amount,
-    get_registered_and_deposit_users_count,
-    get_registered_and_not_rollbacked_deposit_users_count,
-    get_transactions_count,
+from app.src.services.analytics.report import AnalysisService
+from app.src.services.analytics.stream import TransactionAnalyticsService
+from app.src.services.export import EXPORT_FIELDS, TransactionExportService
+from app.src.services.analytics.sharded import ShardedCohortService
+from app.src.services.transaction import ShardedTransactionService
+from app.src.utils.streaming import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    chunks_to_csv,
+    chunks_to_ndjson,
+    to_ndjson,
 )
-from app.src.services.user import get_registered_users_count
 
 router = APIRouter(dependencies=[Depends(PermissionsDependency([UserPermission]))])
 
+IDEMPOTENCY_KEY_HEADER = Header(
+    default=None,
+    alias="Idempotency-Key",
+    max_length=255,
+    description="Retries with the same key replay the first response",
+)
+
 
 @router.get("/transactions", status_code=status.HTTP_200_OK)
 async def get_transactions(
-    user_id: Optional[int] = None,
-    service: TransactionService = Depends(get_transaction_service),
-) -> List[TransactionModel] | None:
-    return await service.get_all(user_id=user_id)
+    filters: TransactionFilter = Depends(),
+    page: TransactionPageParams = Depends(),
+    service: ShardedTransactionService = Depends(get_transaction_service),
+) -> ResponseTransactionPageModel:
+    return await service.get_page(filters=filters, page=page)
+
+
+@router.get(
+    "/transactions/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionsDependency([AdminPermission]))],
+)
+async def export_transactions(
+    filters: TransactionFilter = Depends(),
+    params: TransactionExportParams = Depends(),
+    service: TransactionExportService = Depends(get_transaction_export_service),
+) -> StreamingResponse:
+    """
+    All transactions matching ``filters`` as NDJSON or CSV, newest first.
+    Pass the ``cursor`` of the last received row to resume an interrupted
+    export.
+    """
+    chunks = service.stream(filters, cursor=params.cursor)
+
+    if params.format == ExportFormatEnum.csv:
+        return StreamingResponse(
+            chunks_to_csv(chunks, EXPORT_FIELDS), media_type=CSV_MEDIA_TYPE
+        )
+    return StreamingResponse(chunks_to_ndjson(chunks), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.post(
@@ -54,15 +102,36 @@ async def get_transactions(
 async def post_transaction(
     request: RequestTransactionModel,
     user_id: int = Path(ge=0, description="User ID must be positive integer"),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
     transaction_use_case: CreateTransactionUseCase = Depends(
         get_transaction_create_use_case
     ),
 ) -> TransactionModel | None:
-    transaction = await transaction_use_case.execute(user_id=user_id, request=request)
+    transaction = await transaction_use_case.execute(
+        user_id=user_id, request=request, idempotency_key=idempotency_key
+    )
 
     return transaction
 
 
+@router.post(
+    "/{user_id}/transactions/batch",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(check_user_ownership)],
+)
+async def post_transaction_batch(
+    request: RequestTransactionBatchModel,
+    user_id: int = Path(ge=0, description="User ID must be positive integer"),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
+    transaction_use_case: CreateTransactionBatchUseCase = Depends(
+        get_transaction_create_batch_use_case
+    ),
+) -> List[TransactionModel]:
+    return await transaction_use_case.execute(
+        user_id=user_id, request=request, idempotency_key=idempotency_key
+    )
+
+
 @router.patch(
     "/{user_id}/transactions/{transaction_id}",
     dependencies=[Depends(check_user_ownership)],
@@ -72,12 +141,13 @@ async def patch_rollback_transaction(
     transaction_id: int = Path(
         ge=0, description="Transaction ID must be positive integer"
     ),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
     transaction_use_case: TransactionRollBackUseCase = Depends(
         get_transaction_roll_back_use_case
     ),
 ) -> TransactionModel | None:
     transaction = await transaction_use_case.execute(
-        user_id=user_id, transaction_id=transaction_id
+        user_id=user_id, transaction_id=transaction_id, idempotency_key=idempotency_key
     )
     return transaction
 
@@ -86,63 +156,39 @@ async def patch_rollback_transaction(
     "/transactions/analysis",
     response_model=Optional[list] | None,
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(PermissionsDependency(AdminPermission))],
+    dependencies=[Depends(PermissionsDependency([AdminPermission]))],
 )
 async def get_transaction_analysis(
-    session: AsyncSession = Depends(get_async_session),
+    service: AnalysisService = Depends(get_transaction_analysis_service),
 ) -> List[dict]:
-    dt_gt = datetime.utcnow().date() - timedelta(weeks=1) + timedelta(days=1)
-    dt_lt = datetime.utcnow().date()
-    results = []
-    for i in range(52):
-        registered_users_count = await get_registered_users_count(
-            session, dt_gt=dt_gt, dt_lt=dt_lt
-        )
-        registered_and_deposit_users_count = (
-            await get_registered_and_deposit_users_count(
-                session, dt_gt=dt_gt, dt_lt=dt_lt
-            )
-        )
-        registered_and_not_rollbacked_deposit_users_count = (
-            await get_registered_and_not_rollbacked_deposit_users_count(
-                session, dt_gt=dt_gt, dt_lt=dt_lt
-            )
-        )
-        not_rollbacked_deposit_amount = await get_not_rollbacked_deposit_amount(
-            session, dt_gt=dt_gt, dt_lt=dt_lt
-        )
-        not_rollbacked_withdraw_amount = await get_not_rollbacked_withdraw_amount(
-            session, dt_gt=dt_gt, dt_lt=dt_lt
-        )
-        transactions_count = await get_transactions_count(
-            session, dt_gt=dt_gt, dt_lt=dt_lt
-        )
-        not_rollbacked_transactions_count = await get_not_rollbacked_transactions_count(
-            session, dt_gt=dt_gt, dt_lt=dt_lt
-        )
-        result = {
-            "start_date": dt_gt,
-            "end_date": dt_lt,
-            "registered_users_count": registered_users_count,
-            "registered_and_deposit_users_count": registered_and_deposit_users_count,
-            "registered_and_not_rollbacked_deposit_users_count": registered_and_not_rollbacked_deposit_users_count,
-            "not_rollbacked_deposit_amount": not_rollbacked_deposit_amount,
-            "not_rollbacked_withdraw_amount": not_rollbacked_withdraw_amount,
-            "transactions_count": transactions_count,
-            "not_rollbacked_transactions_count": not_rollbacked_transactions_count,
-        }
-        for field in (
-            "registered_users_count",
-            "registered_and_deposit_users_count",
-            "registered_and_not_rollbacked_deposit_users_count",
-            "not_rollbacked_deposit_amount",
-            "not_rollbacked_withdraw_amount",
-            "transactions_count",
-            "not_rollbacked_transactions_count",
-        ):
-            if result[field] > 0:
-                results.append(result)
-                break
-        dt_gt -= timedelta(weeks=1)
-        dt_lt -= timedelta(weeks=1)
-    return results
+    return await service.get_weekly_report(weeks=52)
+
+
+@router.get(
+    "/transactions/analysis/cohort",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionsDependency([AdminPermission]))],
+)
+async def get_cohort_count(
+    filters: CohortFilter = Depends(),
+    service: ShardedCohortService = Depends(get_cohort_service),
+) -> ResponseCohortModel:
+    users_count = await service.count(filters)
+
+    return ResponseCohortModel(users_count=users_count)
+
+
+@router.get(
+    "/transactions/analytics",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionsDependency([AdminPermission]))],
+)
+async def stream_transaction_analytics(
+    filters: AnalyticsFilter = Depends(),
+    service: TransactionAnalyticsService = Depends(get_transaction_analytics_service),
+) -> StreamingResponse:
+    """Analysis metrics per day/week/month bucket, streamed as NDJSON."""
+    rows = service.stream(filters)
+
+    return StreamingResponse(to_ndjson(rows), media_type=NDJSON_MEDIA_TYPE)
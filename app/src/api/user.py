@@ -1,9 +1,13 @@
 import typing
 
-from fastapi import APIRouter, Depends, status, Path
+from fastapi import APIRouter, Depends, Request, status, Path
 
 from app.src.api.depedencies.auth import check_user_ownership
-from app.src.api.depedencies.user_dependencies import get_user_service
+from app.src.api.depedencies.user_dependencies import (
+    get_sharded_user_service,
+    get_user_import_service,
+    get_user_service,
+)
 from app.src.core.permissions import (
     AdminPermission,
     PermissionsDependency,
@@ -12,11 +16,15 @@ from app.src.core.permissions import (
 from app.src.schemas.auth import RoleEnum
 from app.src.schemas.user_schemas import (
     RequestUserUpdateModel,
-    ResponseUserModel,
+    ResponseUserPageModel,
     UserFilter,
+    UserImportReportModel,
     UserModel,
+    UserPageParams,
 )
-from app.src.services.user import UserService
+from app.src.services.user import ShardedUserService, UserService
+from app.src.services.user_import import UserImportService
+from app.src.utils.streaming import CSV_MEDIA_TYPE, iter_lines
 
 router = APIRouter(
     tags=["admin"], dependencies=[Depends(PermissionsDependency([AdminPermission]))]
@@ -25,14 +33,42 @@ router = APIRouter(
 
 @router.get(
     "/users",
-    response_model=list[ResponseUserModel],
+    response_model=ResponseUserPageModel,
     status_code=status.HTTP_200_OK,
 )
 async def get_users(
     filters: UserFilter = Depends(),
-    service: UserService = Depends(get_user_service),
+    page: UserPageParams = Depends(),
+    service: ShardedUserService = Depends(get_sharded_user_service),
+):
+    """
+    Users matching ``filters``, one page at a time. Pass ``next_cursor`` back
+    as ``cursor`` with the same filters and sort for the following page.
+    """
+    return await service.get_page(filters=filters, page=page)
+
+
+@router.post(
+    "/users/import",
+    response_model=UserImportReportModel,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {CSV_MEDIA_TYPE: {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_users(
+    request: Request,
+    service: UserImportService = Depends(get_user_import_service),
 ):
-    return await service.get_all(filters=filters)
+    """
+    Register the users of a CSV request body with the columns ``email``,
+    ``first_name``, ``last_name`` and ``password``. The body is processed as
+    it is uploaded; rejected rows are listed in the report by line.
+    """
+    return await service.import_lines(iter_lines(request.stream()))
 
 
 @router.patch(
@@ -0,0 +1,63 @@
+"""
+Transaction archival.
+
+Usage:
+    python -m app.src.commands.archive [--dry-run]
+
+Moves every calendar month older than ``TRANSACTION_ARCHIVE_AFTER_DAYS`` to
+a Parquet file under ``TRANSACTION_ARCHIVE_DIR``, shard by shard and one
+month per transaction, so an interrupted run keeps the months it finished.
+Meant to run periodically (e.g. daily from cron); months already archived
+are skipped.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.src.core.database import shard_router
+from app.src.exceptions.transaction_exceptions import (
+    ArchiveRowCountMismatchException,
+)
+from app.src.services.archive import TransactionArchiveService
+
+
+async def archive(dry_run: bool) -> int:
+    for shard, session_maker in enumerate(shard_router.session_makers):
+        label = shard_router.label(shard)
+        async with session_maker() as session:
+            service = TransactionArchiveService(session=session, shard=shard)
+            months = await service.get_pending_months()
+            await session.rollback()
+
+            for start, end in months:
+                if dry_run:
+                    print(f"{label}Would archive {start:%Y-%m}")
+                    continue
+                try:
+                    archived = await service.archive_month(start, end)
+                except ArchiveRowCountMismatchException:
+                    await session.rollback()
+                    print(
+                        f"{label}Transactions of {start:%Y-%m} changed while archiving"
+                    )
+                    return 1
+                await session.commit()
+                print(
+                    f"{label}Archived {archived.row_count} transactions of {start:%Y-%m}"
+                )
+
+        print(f"{label}{len(months)} months {'pending' if dry_run else 'archived'}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Transaction archival")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    return asyncio.run(archive(args.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Fail when a hot-path query would fall back to a sequential scan.
+
+Usage:
+    python -m app.src.commands.explain_check [--users N] [--transactions N]
+
+Seeds the tables with synthetic data, refreshes planner statistics and runs
+the repository and service calls behind the hot endpoints while capturing
+every statement they send. Each captured statement is then ``EXPLAIN``-ed
+with its real parameters and any ``Seq Scan`` on a large table is reported.
+Everything happens in one transaction that is rolled back at the end, so the
+check is safe to run against any database that has the current schema.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy import bindparam, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.core.database import async_session_maker
+from app.src.models.transaction import Transaction
+from app.src.models.user import User
+from app.src.repositories.ledger import LedgerEntryRepository
+from app.src.repositories.transaction import TransactionRepository
+from app.src.repositories.user import UserBalanceRepository, UserRepository
+from app.src.schemas.transaction_schemas import (
+    CohortActivityEnum,
+    CohortFilter,
+    TransactionFilter,
+)
+from app.src.schemas.user_schemas import UserFilter, UserSortEnum
+from app.src.services.analytics.report import TransactionAnalysisService
+from app.src.services.transaction import CohortService
+
+CHECKED_TABLES = {"user", "user_balance", "transaction", "ledger_entry"}
+MIN_RELATION_PAGES = 100
+
+SEED_STATEMENTS = (
+    """
+    INSERT INTO "user" (first_name, last_name, email, password_hash, status, role, created)
+    SELECT 'Seed', 'User', 'explain-check-' || g || '@example.com', 'x', 'ACTIVE',
+           'USER', now() - g * interval '1 minute' * (525600 / :users)
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO user_balance (user_id, currency, amount, created)
+    SELECT u.id, c.currency, 1000000, u.created
+    FROM "user" AS u
+    CROSS JOIN (VALUES ('USD'::currency), ('EUR'), ('BTC')) AS c (currency)
+    WHERE u.email LIKE 'explain-check-%'
+    """,
+    """
+    INSERT INTO transaction (user_id, currency, amount, status, created)
+    SELECT u.id,
+           (ARRAY['USD', 'EUR', 'BTC']::currency[])[1 + g % 3],
+           CASE WHEN g % 4 = 0 THEN -10 ELSE 100 END,
+           CASE WHEN g % 20 = 0 THEN 'ROLLBACKED' ELSE 'PROCESSED' END::transaction_status,
+           now() - g * interval '1 minute' * (525600 / :transactions)
+    FROM generate_series(1, :transactions) AS g
+    JOIN "user" AS u ON u.email = 'explain-check-' || (1 + g % :users) || '@example.com'
+    """,
+    """
+    INSERT INTO ledger_entry (user_id, transaction_id, currency, amount, kind, created)
+    SELECT user_id, id, currency, amount, 'TRANSACTION', created
+    FROM transaction
+    """,
+)
+
+
+async def seed(session: AsyncSession, users: int, transactions: int) -> None:
+    params = {"users": users, "transactions": transactions}
+    for statement in SEED_STATEMENTS:
+        await session.execute(text(statement), params)
+    for table in CHECKED_TABLES:
+        await session.execute(text(f'ANALYZE "{table}"'))
+
+
+async def run_hot_paths(
+    session: AsyncSession, user: User, transaction: Transaction
+) -> None:
+    """The calls whose statements are checked."""
+    now = datetime.utcnow()
+
+    transaction_repository = TransactionRepository(session)
+    await transaction_repository.get(transaction.id)
+    await transaction_repository.get_page(TransactionFilter(), None, 100)
+    await transaction_repository.get_page(
+        TransactionFilter(), (transaction.created, transaction.id), 100
+    )
+    await transaction_repository.get_page(TransactionFilter(user_id=user.id), None, 100)
+    await transaction_repository.set_rollbacked(transaction.id, user.id)
+
+    user_repository = UserRepository(session)
+    await user_repository.get_by_email(user.email)
+    await user_repository.get_page(
+        UserFilter(), (None, None), UserSortEnum.id, False, None, 100
+    )
+    await user_repository.get_page(
+        UserFilter(),
+        (None, None),
+        UserSortEnum.created,
+        True,
+        (user.created, user.id),
+        100,
+    )
+
+    user_balance_repository = UserBalanceRepository(session)
+    await user_balance_repository.get_user_balance_by_currency(user.id, "USD")
+    await user_balance_repository.get_for_users([user.id])
+    await user_balance_repository.add_amount(user.id, "USD", Decimal(1))
+
+    ledger_entry_repository = LedgerEntryRepository(session)
+    await ledger_entry_repository.get_balances(user.id, now)
+    await ledger_entry_repository.get_range(
+        user.id, "USD", now - timedelta(days=30), now
+    )
+
+    await TransactionAnalysisService(session).get_weeks(now - timedelta(weeks=2), now)
+    await CohortService(session).count(
+        CohortFilter(
+            registered_from=(now - timedelta(days=7)).date(),
+            registered_to=now.date(),
+            activity=CohortActivityEnum.deposit,
+            exclude_rollbacked=True,
+        )
+    )
+
+
+async def get_large_relations(session: AsyncSession) -> Dict[str, str]:
+    """
+    Checked tables and their partitions, mapped to the checked table, that
+    span at least ``MIN_RELATION_PAGES``. Sequentially scanning an empty
+    future partition or a small current one is the right plan.
+    """
+    query = text(
+        "SELECT relation.relname, coalesce(parent.relname, relation.relname) "
+        "FROM pg_class AS relation "
+        "LEFT JOIN pg_inherits ON pg_inherits.inhrelid = relation.oid "
+        "LEFT JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE relation.relkind = 'r' AND relation.relpages >= :min_pages "
+        "AND coalesce(parent.relname, relation.relname) IN :tables"
+    ).bindparams(bindparam("tables", expanding=True))
+    query_result = await session.execute(
+        query, {"min_pages": MIN_RELATION_PAGES, "tables": list(CHECKED_TABLES)}
+    )
+    return dict(query_result.tuples().all())
+
+
+def seq_scans(plan: dict, relations: Dict[str, str]) -> List[str]:
+    """Checked tables sequentially scanned by ``plan``, directly or by partition."""
+    scans = []
+    if plan.get("Node Type") == "Seq Scan" and plan["Relation Name"] in relations:
+        scans.append(relations[plan["Relation Name"]])
+    for child in plan.get("Plans", []):
+        scans.extend(seq_scans(child, relations))
+    return scans
+
+
+async def check(users: int, transactions: int) -> int:
+    statements: List[Tuple[str, tuple]] = []
+    failures = 0
+    async with async_session_maker() as session:
+        try:
+            await seed(session, users, transactions)
+            user = await session.scalar(
+                select(User).where(User.email.like("explain-check-%")).limit(1)
+            )
+            transaction = await session.scalar(
+                select(Transaction).where(Transaction.user_id == user.id).limit(1)
+            )
+
+            connection = await session.connection()
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                if not executemany:
+                    statements.append((statement, parameters))
+
+            sync_engine = connection.sync_engine
+            event.listen(sync_engine, "before_cursor_execute", capture)
+            try:
+                await run_hot_paths(session, user, transaction)
+            finally:
+                event.remove(sync_engine, "before_cursor_execute", capture)
+
+            relations = await get_large_relations(session)
+            for statement, parameters in statements:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                scans = seq_scans(plan[0]["Plan"], relations)
+                if scans:
+                    failures += 1
+                    print(f"Seq Scan on {', '.join(sorted(set(scans)))}:")
+                    print(f"    {' '.join(statement.split())}")
+        finally:
+            await session.rollback()
+
+    print(f"{len(statements)} statements checked, {failures} with sequential scans")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sequential scan check")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--transactions", type=int, default=200000)
+    args = parser.parse_args()
+
+    return asyncio.run(check(args.users, args.transactions))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Idempotency key purge.
+
+Usage:
+    python -m app.src.commands.idempotency_keys
+
+Deletes the ``idempotency_key`` rows older than ``IDEMPOTENCY_KEY_TTL`` on
+every shard, ``IDEMPOTENCY_PURGE_BATCH_SIZE`` rows per transaction so that
+locks stay short. Meant to run periodically (e.g. hourly from cron).
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.src.core.database import shard_router
+from app.src.services.idempotency import IdempotencyKeyPurgeService
+
+
+async def purge() -> int:
+    for shard, session_maker in enumerate(shard_router.session_makers):
+        deleted = 0
+        async with session_maker() as session:
+            service = IdempotencyKeyPurgeService(session=session)
+            while purged := await service.purge_batch():
+                await session.commit()
+                deleted += purged
+
+        print(f"{shard_router.label(shard)}Purged {deleted} idempotency keys")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Idempotency key purge")
+    parser.parse_args()
+
+    return asyncio.run(purge())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
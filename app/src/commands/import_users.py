@@ -0,0 +1,78 @@
+"""
+Bulk user import.
+
+Usage:
+    python -m app.src.commands.import_users FILE [--errors ERRORS_CSV]
+
+Registers the users of a UTF-8 CSV file with the columns ``email``,
+``first_name``, ``last_name`` and ``password``, the same way as
+``POST /users/import``. Rejected rows are printed, or written to
+``ERRORS_CSV`` as ``line,email,errors`` when given. Exits with 1 when the
+file itself is unusable; row errors do not change the exit code.
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+from typing import AsyncIterator
+
+from app.src.core.database import shard_router
+from app.src.exceptions.user_exceptions import InvalidUserImportFileException
+from app.src.schemas.user_schemas import UserImportReportModel
+from app.src.services.user_import import UserImportService
+
+
+# Bytes of lines read per trip to the worker thread.
+READ_SIZE = 1 << 16
+
+
+async def read_lines(path: str) -> AsyncIterator[str]:
+    """The lines of ``path``, read in a worker thread a block at a time."""
+    file = await asyncio.to_thread(open, path, encoding="utf-8-sig", newline="")
+    try:
+        while lines := await asyncio.to_thread(file.readlines, READ_SIZE):
+            for line in lines:
+                yield line
+    finally:
+        await asyncio.to_thread(file.close)
+
+
+def write_errors(report: UserImportReportModel, path: str | None) -> None:
+    if path is None:
+        for error in report.errors:
+            print(f"line {error.line} ({error.email}): {'; '.join(error.errors)}")
+        return
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("line", "email", "errors"))
+        for error in report.errors:
+            writer.writerow((error.line, error.email, "; ".join(error.errors)))
+
+
+async def import_users(path: str, errors_path: str | None) -> int:
+    service = UserImportService(router=shard_router)
+    try:
+        report = await service.import_lines(read_lines(path))
+    except InvalidUserImportFileException:
+        print(
+            "Expected a UTF-8 CSV with the columns email, first_name, last_name, password"
+        )
+        return 1
+
+    write_errors(report, errors_path)
+    print(f"{report.imported} users imported, {report.rejected} rows rejected")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk user import")
+    parser.add_argument("file")
+    parser.add_argument("--errors", help="write rejected rows to this CSV file")
+    args = parser.parse_args()
+
+    return asyncio.run(import_users(args.file, args.errors))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
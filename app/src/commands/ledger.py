@@ -0,0 +1,51 @@
+"""
+Ledger maintenance.
+
+Usage:
+    python -m app.src.commands.ledger snapshot
+    python -m app.src.commands.ledger backfill
+
+Both run on every shard in turn. ``snapshot`` is meant to run periodically (e.g. hourly from cron) and writes
+a balance snapshot for every user and currency with new entries. ``backfill``
+books entries for transactions created before the ledger existed.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.src.core.database import shard_router
+from app.src.services.ledger import LedgerService
+
+
+async def snapshot() -> int:
+    for shard, session_maker in enumerate(shard_router.session_makers):
+        async with session_maker() as session:
+            count = await LedgerService(session=session).take_snapshots()
+            await session.commit()
+
+        print(f"{shard_router.label(shard)}Wrote {count} balance snapshots")
+    return 0
+
+
+async def backfill() -> int:
+    for shard, session_maker in enumerate(shard_router.session_makers):
+        async with session_maker() as session:
+            await LedgerService(session=session).backfill()
+            await session.commit()
+
+        print(f"{shard_router.label(shard)}Backfilled ledger entries")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ledger maintenance")
+    parser.add_argument("command", choices=["snapshot", "backfill"])
+    args = parser.parse_args()
+
+    command = snapshot if args.command == "snapshot" else backfill
+    return asyncio.run(command())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
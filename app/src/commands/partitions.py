@@ -0,0 +1,45 @@
+"""
+Transaction partition maintenance.
+
+Usage:
+    python -m app.src.commands.partitions [--months-ahead N]
+
+Creates the monthly ``transaction`` partitions missing up to ``N`` months
+(``TRANSACTION_PARTITIONS_AHEAD`` by default) after the current one, on
+every shard. It also runs on application startup; schedule it (e.g. daily from cron) so that
+long-running deployments never reach the last partition.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.src.core.database import shard_router
+from app.src.services.partitions import TransactionPartitionService
+
+
+async def ensure(months_ahead: int | None) -> int:
+    for shard, session_maker in enumerate(shard_router.session_makers):
+        async with session_maker() as session:
+            created = await TransactionPartitionService(session=session).ensure(
+                months_ahead
+            )
+            await session.commit()
+
+        print(
+            f"{shard_router.label(shard)}Created {len(created)} partitions: "
+            f"{', '.join(created) or '-'}"
+        )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Transaction partition maintenance")
+    parser.add_argument("--months-ahead", type=int, default=None)
+    args = parser.parse_args()
+
+    return asyncio.run(ensure(args.months_ahead))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Weekly rollup maintenance.
+
+Usage:
+    python -m app.src.commands.rollup rebuild [--weeks N]
+    python -m app.src.commands.rollup check [--weeks N]
+
+Every shard has its own rollup and is processed in turn. Without
+``--weeks`` the whole history is processed. Weeks overlapping archived
+transactions are skipped, since their raw rows are gone. ``check`` exits
+with a non-zero status when the rollup of any shard disagrees with its raw
+tables.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from app.src.core.database import async_session_maker, shard_router
+from app.src.services.analytics.report import report_window
+from app.src.services.analytics.rollup import WeeklyRollupService
+from app.src.services.exchange_rates import exchange_rate_store
+
+
+async def get_range(
+    service: WeeklyRollupService, weeks: int | None
+) -> tuple[datetime, datetime]:
+    start, end = report_window(weeks or 1)
+    history_start = await service.history_start()
+    if weeks is None or start < history_start:
+        start = history_start
+    return start, end
+
+
+async def rebuild(weeks: int | None) -> int:
+    async with async_session_maker() as session:
+        await exchange_rate_store.refresh(session)
+    for shard, session_maker in enumerate(shard_router.session_makers):
+        async with session_maker() as session:
+            service = WeeklyRollupService(session=session)
+            start, end = await get_range(service, weeks)
+            await service.rebuild(start, end)
+            await session.commit()
+        print(
+            f"{shard_router.label(shard)}Rebuilt weekly rollup for "
+            f"{start.date()} - {end.date()}"
+        )
+    return 0
+
+
+async def check(weeks: int | None) -> int:
+    async with async_session_maker() as session:
+        await exchange_rate_store.refresh(session)
+    failed = False
+    for shard, session_maker in enumerate(shard_router.session_makers):
+        label = shard_router.label(shard)
+        async with session_maker() as session:
+            service = WeeklyRollupService(session=session)
+            start, end = await get_range(service, weeks)
+            mismatches = await service.check(start, end)
+
+        for mismatch in mismatches:
+            print(
+                label
+                + "{week_start:%Y-%m-%d} {currency} {field}: "
+                "expected {expected}, rollup has {actual}".format(**mismatch)
+            )
+        print(f"{label}{len(mismatches)} mismatches for {start.date()} - {end.date()}")
+        failed = failed or bool(mismatches)
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Weekly rollup maintenance")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--weeks", type=int, default=None)
+    args = parser.parse_args()
+
+    command = rebuild if args.command == "rebuild" else check
+    return asyncio.run(command(args.weeks))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Shard id sequences.
+
+Usage:
+    python -m app.src.commands.shard_ids
+
+Interleaves the id sequences of ``transaction``, ``ledger_entry`` and
+``balance_snapshot`` across shards so that no two shards hand out the same
+id, see ``ShardIdService``. Sequences already interleaved are left alone.
+It also runs on application startup; run it after adding a shard, before
+the shard takes writes.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.src.core.database import shard_router
+from app.src.services.shard_ids import ShardIdService
+
+
+async def interleave() -> int:
+    try:
+        restarted = await ShardIdService(router=shard_router).interleave()
+    except ValueError as exc:
+        print(exc)
+        return 1
+
+    for table, base in restarted.items():
+        if base is None:
+            print(f"{table}: unchanged")
+        else:
+            print(f"{table}: restarted at {base} + shard")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Shard id sequences")
+    parser.parse_args()
+
+    return asyncio.run(interleave())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+User email directory backfill.
+
+Usage:
+    python -m app.src.commands.user_emails
+
+Records the email and id of every user on every shard in the primary's
+``user_email`` directory, which sign-ups and imports claim emails in when
+sharded. Run it once after migrating and whenever shards holding existing
+users are added; until then an email registered on one shard can be
+registered again on another. Emails already in the directory are skipped,
+so it is safe to run again.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.src.core.database import shard_router
+from app.src.services.user import ShardedUserService
+
+# Users read from a shard and recorded per transaction on the primary.
+CHUNK_SIZE = 10000
+
+
+async def register() -> int:
+    service = ShardedUserService(router=shard_router)
+    for shard in range(len(shard_router.session_makers)):
+        read, added = await service.register_emails(shard, CHUNK_SIZE)
+        print(f"{shard_router.label(shard)}Recorded {added} of {read} user emails")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="User email directory backfill")
+    parser.parse_args()
+
+    return asyncio.run(register())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,16 @@
+from app.src.settings.analytics import AnalyticsSetting
 from app.src.settings.application import ApplicationSetting
+from app.src.settings.archive import ArchiveSetting
 from app.src.settings.auth import AuthSetting
 from app.src.settings.database import PostgreSQLSetting
+from app.src.settings.exchange_rates import ExchangeRateSetting
+from app.src.settings.export import ExportSetting
+from app.src.settings.idempotency import IdempotencySetting
+from app.src.settings.partitions import PartitionSetting
+from app.src.settings.password_hashing import PasswordHashingSetting
 from app.src.settings.redis import RedisSetting
+from app.src.settings.sharding import ShardingSetting
+from app.src.settings.user_import import UserImportSetting
 
 
 class Config:
@@ -9,6 +18,15 @@ class Config:
     application: ApplicationSetting = ApplicationSetting()
     auth: AuthSetting = AuthSetting()
     redis: RedisSetting = RedisSetting()
+    analytics: AnalyticsSetting = AnalyticsSetting()
+    exchange_rates: ExchangeRateSetting = ExchangeRateSetting()
+    export: ExportSetting = ExportSetting()
+    idempotency: IdempotencySetting = IdempotencySetting()
+    partitions: PartitionSetting = PartitionSetting()
+    archive: ArchiveSetting = ArchiveSetting()
+    sharding: ShardingSetting = ShardingSetting()
+    user_import: UserImportSetting = UserImportSetting()
+    password_hashing: PasswordHashingSetting = PasswordHashingSetting()
 
 
 config = Config()
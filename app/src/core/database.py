@@ -2,11 +2,47 @@ from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.src.core.config import config
+from app.src.core.sharding import ShardRouter
 
 engine = create_async_engine(url=config.database.url, echo=True)
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+# Read-only transactions, so a write routed here by mistake fails instead of
+# diverging from the primary. Shares the primary's pool without a replica.
+replica_engine = (
+    create_async_engine(url=config.database.replica_url, echo=True)
+    if config.database.replica_url
+    else engine
+).execution_options(postgresql_readonly=True)
+
+replica_session_maker = async_sessionmaker(replica_engine, expire_on_commit=False)
+
+shard_engines = [
+    create_async_engine(url=url, echo=True) for url in config.sharding.SHARD_URLS
+]
+
+shard_router = ShardRouter(
+    session_makers=[
+        async_session_maker,
+        *(
+            async_sessionmaker(shard_engine, expire_on_commit=False)
+            for shard_engine in shard_engines
+        ),
+    ],
+    read_session_makers=[
+        replica_session_maker,
+        *(
+            async_sessionmaker(
+                shard_engine.execution_options(postgresql_readonly=True),
+                expire_on_commit=False,
+            )
+            for shard_engine in shard_engines
+        ),
+    ],
+    virtual_nodes=config.sharding.SHARD_VIRTUAL_NODES,
+)
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -26,3 +26,18 @@ EXCHANGE_RATES_TO_USD = {
     CurrencyEnum.DOGE: 0.3627,
     CurrencyEnum.USDT: 0.9709,
 }
+
+# Amounts are stored as BIGINT minor units: ``amount * 10 ** scale``. Crypto
+# currencies use satoshi precision, which keeps every balance within BIGINT.
+CURRENCY_SCALES = {
+    CurrencyEnum.USD: 2,
+    CurrencyEnum.EUR: 2,
+    CurrencyEnum.AUD: 2,
+    CurrencyEnum.CAD: 2,
+    CurrencyEnum.ARS: 2,
+    CurrencyEnum.PLN: 2,
+    CurrencyEnum.BTC: 8,
+    CurrencyEnum.ETH: 8,
+    CurrencyEnum.DOGE: 8,
+    CurrencyEnum.USDT: 6,
+}
@@ -4,9 +4,12 @@ from fastapi import HTTPException, status
 class BaseHttpApplicationException(HTTPException):
     status_code: int | None = None
     detail: str | None = None
+    headers: dict[str, str] | None = None
 
     def __init__(self):
-        super().__init__(status_code=self.status_code, detail=self.detail)
+        super().__init__(
+            status_code=self.status_code, detail=self.detail, headers=self.headers
+        )
 
 
 class BadRequestDataException(BaseHttpApplicationException):
@@ -1,4 +1,8 @@
+import json
+from typing import Any, List
+
 from redis.asyncio import Redis
+from redis.exceptions import WatchError
 
 from app.src.core.config import config
 
@@ -60,6 +64,36 @@ class RedisClient:
             return int(value)
         return value
 
+    async def set_json(
+        self, key: str, value: Any, expire: int | None = None, persist: bool = False
+    ) -> None:
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key (str): The key to set.
+            value (Any): Any value accepted by ``json.dumps``.
+            expire (int | None): TTL in seconds, the client's default when omitted.
+            persist (bool): Keep the key until it is deleted explicitly.
+        """
+        await self.redis.set(
+            key,
+            json.dumps(value),
+            ex=None if persist else expire or self.__expire_time,
+        )
+
+    async def get_json(self, key: str) -> Any:
+        """Get a value stored with ``set_json``, ``None`` if the key is missing."""
+        value = await self.redis.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def get_many_json(self, keys: List[str]) -> List[Any]:
+        """Get several ``set_json`` values in one round trip, ``None`` for misses."""
+        if not keys:
+            return []
+        values = await self.redis.mget(keys)
+        return [json.loads(value) if value is not None else None for value in values]
+
     async def clear_all(self):
         """Clear all keys and values from the Redis database."""
         await self.redis.flushall()
@@ -67,6 +101,46 @@ class RedisClient:
     async def delete(self, key: str) -> None:
         await self.redis.delete(key)
 
+    async def delete_versioned(self, keys: List[str], version_keys: List[str]) -> None:
+        """Delete ``keys`` and bump their ``version_keys`` in one transaction."""
+        async with self.redis.pipeline() as pipe:
+            for version_key in version_keys:
+                pipe.incr(version_key)
+            pipe.delete(*keys)
+            await pipe.execute()
+
+    async def set_json_if_version(
+        self,
+        key: str,
+        value: Any,
+        version_key: str,
+        version: int,
+        expire: int | None = None,
+        persist: bool = False,
+    ) -> bool:
+        """
+        ``set_json`` unless ``version_key`` no longer holds ``version``, a
+        missing version counting as 0.
+
+        Returns:
+            bool: Whether the value was stored.
+        """
+        async with self.redis.pipeline() as pipe:
+            try:
+                await pipe.watch(version_key)
+                if int(await pipe.get(version_key) or 0) != version:
+                    return False
+                pipe.multi()
+                pipe.set(
+                    key,
+                    json.dumps(value),
+                    ex=None if persist else expire or self.__expire_time,
+                )
+                await pipe.execute()
+            except WatchError:
+                return False
+        return True
+
 
 async def get_redis_client() -> RedisClient:
     return RedisClient(
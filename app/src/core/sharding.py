@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+from bisect import bisect
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Sequence,
+    TypeVar,
+)
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+T = TypeVar("T")
+
+
+class HashRing:
+    """
+    Consistent hash ring over shards ``0..shard_count - 1``.
+
+    Every shard owns ``virtual_nodes`` points on the ring and a key belongs to
+    the shard of the first point after its hash, so adding a shard only moves
+    the keys that land on the new shard's points.
+    """
+
+    def __init__(self, shard_count: int, virtual_nodes: int):
+        points = sorted(
+            (self.__hash(f"shard-{shard}:{node}"), shard)
+            for shard in range(shard_count)
+            for node in range(virtual_nodes)
+        )
+        self.__hashes = [point for point, _ in points]
+        self.__shards = [shard for _, shard in points]
+
+    def shard_for(self, key: int) -> int:
+        index = bisect(self.__hashes, self.__hash(str(key))) % len(self.__hashes)
+        return self.__shards[index]
+
+    @staticmethod
+    def __hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+async def gather_shards(
+    session_makers: Sequence[async_sessionmaker[AsyncSession]],
+    query: Callable[[AsyncSession], Awaitable[T]],
+) -> List[T]:
+    """Run ``query`` on every shard concurrently, each in its own session."""
+
+    async def run(session_maker: async_sessionmaker[AsyncSession]) -> T:
+        async with session_maker() as session:
+            return await query(session)
+
+    return list(await asyncio.gather(*map(run, session_makers)))
+
+
+async def merge_shard_chunks(
+    streams: Sequence[AsyncGenerator[List[T], None]],
+    key: Callable[[T], Any],
+    chunk_size: int,
+    reverse: bool = False,
+) -> AsyncIterator[List[T]]:
+    """
+    Merge per-shard streams of chunks, each already sorted by ``key``, into
+    one stream of chunks of ``chunk_size`` in the same order. Only the
+    current chunk of every shard is held in memory.
+    """
+    pick = max if reverse else min
+    heads = {}
+
+    async def advance(shard: int) -> None:
+        """Move ``shard`` on to its next non-empty chunk, or drop it."""
+        async for chunk in streams[shard]:
+            if chunk:
+                heads[shard] = (chunk, 0)
+                return
+        heads.pop(shard, None)
+
+    try:
+        for shard in range(len(streams)):
+            await advance(shard)
+
+        merged: List[T] = []
+        while heads:
+            shard = pick(heads, key=lambda head: key(heads[head][0][heads[head][1]]))
+            chunk, position = heads[shard]
+            merged.append(chunk[position])
+            if position + 1 < len(chunk):
+                heads[shard] = (chunk, position + 1)
+            else:
+                await advance(shard)
+
+            if len(merged) == chunk_size:
+                yield merged
+                merged = []
+        if merged:
+            yield merged
+    finally:
+        # Release the sessions of shards left unread by an abandoned stream.
+        for stream in streams:
+            await stream.aclose()
+
+
+class ShardRouter:
+    """
+    Maps a ``user_id`` to the database holding the user, their balances and
+    their transactions.
+
+    Shard 0 is the primary, which also keeps the tables shared by all users
+    and hands out user ids. Each shard has a session maker for writes and one
+    for reads, the latter read-only and on the primary's replica for shard 0.
+    """
+
+    def __init__(
+        self,
+        session_makers: List[async_sessionmaker[AsyncSession]],
+        read_session_makers: List[async_sessionmaker[AsyncSession]],
+        virtual_nodes: int,
+    ):
+        self.session_makers = session_makers
+        self.read_session_makers = read_session_makers
+        self.__ring = HashRing(len(session_makers), virtual_nodes)
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.session_makers) > 1
+
+    def shard_for(self, user_id: int | None) -> int:
+        """Shard of ``user_id``, the primary when there is no user."""
+        if user_id is None or not self.sharded:
+            return 0
+        return self.__ring.shard_for(user_id)
+
+    def session_maker_for(
+        self, user_id: int | None
+    ) -> async_sessionmaker[AsyncSession]:
+        return self.session_makers[self.shard_for(user_id)]
+
+    def read_session_maker_for(
+        self, user_id: int | None
+    ) -> async_sessionmaker[AsyncSession]:
+        return self.read_session_makers[self.shard_for(user_id)]
+
+    def label(self, shard: int) -> str:
+        """Prefix for per-shard command output, empty when not sharded."""
+        return f"Shard {shard}: " if self.sharded else ""
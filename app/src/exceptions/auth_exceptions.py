@@ -11,3 +11,9 @@ class InvalidUserPasswordException(BaseHttpApplicationException):
 class CredentialException(BaseHttpApplicationException):
     status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Could not validate credentials"
+
+
+class PasswordHashingBusyException(BaseHttpApplicationException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Too many sign-ins at once, try again shortly"
+    headers = {"Retry-After": "1"}
@@ -18,9 +18,27 @@ class UpdateTransactionForBlockedUserException(Exception): ...
 class TransactionAlreadyRollbackedException(Exception): ...
 
 
+class TransactionArchivedException(Exception): ...
+
+
 class RoleNotExistsException(Exception): ...
 
 
+class InvalidDateRangeException(Exception): ...
+
+
+class InvalidCursorException(Exception): ...
+
+
+class IdempotencyKeyReusedException(Exception): ...
+
+
+class ArchiveRowCountMismatchException(Exception): ...
+
+
+class AnalyticsSnapshotNotReadyException(Exception): ...
+
+
 # FastApi exception handlers
 def register_transaction_error_handlers(app: FastAPI):
     @app.exception_handler(RoleNotExistsException)
@@ -51,6 +69,13 @@ def register_transaction_error_handlers(app: FastAPI):
             content={"detail": "Transaction is already rollbacked"},
         )
 
+    @app.exception_handler(TransactionArchivedException)
+    async def transaction_archived_handler(request, exc):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "Archived transactions can not be rollbacked"},
+        )
+
     @app.exception_handler(TransactionNotExistsException)
     async def transaction_not_exists_handler(request, exc):
         return JSONResponse(
@@ -64,3 +89,34 @@ def register_transaction_error_handlers(app: FastAPI):
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"detail": "Transaction does not belong to user"},
         )
+
+    @app.exception_handler(InvalidDateRangeException)
+    async def invalid_date_range_handler(request, exc):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "End date must not be before start date"},
+        )
+
+    @app.exception_handler(InvalidCursorException)
+    async def invalid_cursor_handler(request, exc):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "Invalid pagination cursor"},
+        )
+
+    @app.exception_handler(IdempotencyKeyReusedException)
+    async def idempotency_key_reused_handler(request, exc):
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content={
+                "detail": "Idempotency key was already used for a different request"
+            },
+        )
+
+    @app.exception_handler(AnalyticsSnapshotNotReadyException)
+    async def analytics_snapshot_not_ready_handler(request, exc):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Analytics are still loading, try again later"},
+            headers={"Retry-After": "30"},
+        )
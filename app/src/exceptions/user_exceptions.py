@@ -22,6 +22,12 @@ class NegativeBalanceException(Exception): ...
 class UserBalanceNotFound(BaseHttpApplicationException): ...
 
 
+class InvalidBalanceFilterException(Exception): ...
+
+
+class InvalidUserImportFileException(Exception): ...
+
+
 # FastAPI exception handlers
 def register_user_error_handlers(app: FastAPI):
     @app.exception_handler(UserAlreadyExistsException)
@@ -65,3 +71,22 @@ def register_user_error_handlers(app: FastAPI):
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"detail": "User balance was not found"},
         )
+
+    @app.exception_handler(InvalidBalanceFilterException)
+    async def invalid_balance_filter_handler(request, exc):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "detail": "Balance bounds need a currency and must fit its precision"
+            },
+        )
+
+    @app.exception_handler(InvalidUserImportFileException)
+    async def invalid_user_import_file_handler(request, exc):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "detail": "Expected UTF-8 CSV with the columns "
+                "email, first_name, last_name and password"
+            },
+        )
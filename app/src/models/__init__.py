@@ -1,4 +1,20 @@
+from .exchange_rate import ExchangeRate
+from .idempotency_key import IdempotencyKey
+from .ledger import BalanceSnapshot, LedgerEntry
 from .transaction import Transaction
-from .user import User
+from .transaction_archive import TransactionArchive
+from .user import User, UserEmail
+from .weekly_stats import WeeklyTransactionStats, WeeklyUserStats
 
-__all__ = ["User", "Transaction"]
+__all__ = [
+    "User",
+    "UserEmail",
+    "Transaction",
+    "TransactionArchive",
+    "ExchangeRate",
+    "IdempotencyKey",
+    "LedgerEntry",
+    "BalanceSnapshot",
+    "WeeklyTransactionStats",
+    "WeeklyUserStats",
+]
@@ -0,0 +1,21 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Numeric, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.src.core.models import BaseModel
+
+
+class ExchangeRate(BaseModel):
+    __tablename__ = "exchange_rate"
+
+    currency: Mapped[str] = mapped_column(nullable=False)
+    rate: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
+    effective_from: Mapped[datetime] = mapped_column(nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "currency", "effective_from", name="exchange_rate_currency_effective_from"
+        ),
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.src.core.models import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    __tablename__ = "idempotency_key"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    key: Mapped[str] = mapped_column(nullable=False)
+    request_hash: Mapped[str] = mapped_column(nullable=False)
+    response: Mapped[dict | list | None] = mapped_column(JSONB, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="idempotency_key_user_key_unique"),
+        Index("idempotency_key_created", "created"),
+    )
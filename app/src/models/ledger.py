@@ -0,0 +1,58 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, ForeignKey, Index, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.src.core.models import BaseModel
+from app.src.models.types import CurrencyType, XactIdType, XactSnapshotType
+from app.src.utils.money import from_minor_units
+
+
+class LedgerEntry(BaseModel):
+    __tablename__ = "ledger_entry"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    # Not a foreign key: ``transaction`` is partitioned and its unique
+    # constraints include ``created``.
+    transaction_id: Mapped[int | None] = mapped_column(nullable=True)
+    currency: Mapped[str] = mapped_column(CurrencyType, nullable=False)
+    # Minor units of ``currency``, see ``CURRENCY_SCALES``.
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    kind: Mapped[str] = mapped_column(nullable=False)
+    # Transaction that wrote the entry. ``created`` is when that transaction
+    # started, not when it committed, so snapshots tell the entries they saw
+    # by this id instead. Null for entries written before the column existed.
+    xact_id: Mapped[int | None] = mapped_column(
+        XactIdType, server_default=func.pg_current_xact_id(), nullable=True
+    )
+
+    __table_args__ = (
+        Index("ledger_entry_user_currency_created", "user_id", "currency", "created"),
+        Index("ledger_entry_transaction_id", "transaction_id"),
+    )
+
+    @property
+    def decimal_amount(self) -> Decimal:
+        return from_minor_units(self.amount, self.currency)
+
+
+class BalanceSnapshot(BaseModel):
+    __tablename__ = "balance_snapshot"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    currency: Mapped[str] = mapped_column(CurrencyType, nullable=False)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    taken_at: Mapped[datetime] = mapped_column(nullable=False)
+    # ``pg_current_snapshot()`` of the statement that took the snapshot, null
+    # for snapshots taken before the column existed.
+    xact_snapshot: Mapped[tuple | None] = mapped_column(XactSnapshotType, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "currency",
+            "taken_at",
+            name="balance_snapshot_user_currency_taken_at",
+        ),
+    )
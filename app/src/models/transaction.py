@@ -1,18 +1,70 @@
+import re
+from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import BigInteger, ForeignKey, Index, func, text
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 
 from app.src.core.models import BaseModel
+from app.src.models.types import CurrencyType, TransactionStatusType
 from app.src.models.user import User
+from app.src.utils.money import from_minor_units
+
+# ``transaction_history`` holds everything before the first monthly
+# ``transaction_yYYYYmMM`` partition.
+TRANSACTION_HISTORY_PARTITION = "transaction_history"
+TRANSACTION_PARTITION_NAME = re.compile(r"transaction_(history|y\d{4}m\d{2})")
+
+
+def transaction_partition_name(start: datetime) -> str:
+    return f"transaction_y{start.year}m{start.month:02d}"
 
 
 class Transaction(BaseModel):
+    """
+    Range-partitioned by month on ``created``; see
+    ``services/partitions.py`` for how partitions are created.
+    """
+
     __tablename__ = "transaction"
 
+    # Postgres requires the partition key in every unique constraint of a
+    # partitioned table, so ``created`` is part of the table's primary key.
+    # ``id`` alone still identifies a row and stays the ORM identity.
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    created: Mapped[datetime] = mapped_column(
+        primary_key=True, server_default=func.now()
+    )
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
-    currency: Mapped[str] = mapped_column(nullable=True)
-    amount: Mapped[Decimal] = mapped_column(nullable=True)
-    status: Mapped[str] = mapped_column(nullable=True)
+    currency: Mapped[str] = mapped_column(CurrencyType, nullable=True)
+    # Minor units of ``currency``, see ``CURRENCY_SCALES``.
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    status: Mapped[str] = mapped_column(TransactionStatusType, nullable=True)
 
     owner: Mapped["User"] = relationship("User", back_populates="transaction")
+
+    __table_args__ = (
+        Index("transaction_created_id", "created", "id"),
+        Index("transaction_user_id_created_id", "user_id", "created", "id"),
+        # Analytics only aggregate rows that were not rolled back.
+        Index(
+            "transaction_not_rollbacked_created",
+            "created",
+            postgresql_where=text("status <> 'ROLLBACKED'"),
+        ),
+        Index(
+            "transaction_not_rollbacked_user_id_created",
+            "user_id",
+            "created",
+            postgresql_where=text("status <> 'ROLLBACKED'"),
+        ),
+        {"postgresql_partition_by": "RANGE (created)"},
+    )
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {"primary_key": [cls.__table__.c.id]}
+
+    @property
+    def decimal_amount(self) -> Decimal:
+        return from_minor_units(self.amount, self.currency)
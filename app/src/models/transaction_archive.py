@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.src.core.models import BaseModel
+
+
+class TransactionArchive(BaseModel):
+    """
+    Manifest entry of one month of transactions moved to a Parquet file.
+
+    ``path`` is relative to ``TRANSACTION_ARCHIVE_DIR``; months without
+    transactions are recorded with ``row_count`` 0 and no file.
+    """
+
+    __tablename__ = "transaction_archive"
+
+    period_start: Mapped[datetime] = mapped_column(nullable=False)
+    period_end: Mapped[datetime] = mapped_column(nullable=False)
+    path: Mapped[str | None] = mapped_column(nullable=True)
+    row_count: Mapped[int] = mapped_column(nullable=False)
+    min_id: Mapped[int | None] = mapped_column(nullable=True)
+    max_id: Mapped[int | None] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("period_start", name="transaction_archive_period_start"),
+    )
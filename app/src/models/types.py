@@ -0,0 +1,38 @@
+from enum import Enum as PythonEnum
+from typing import List, Type
+
+from sqlalchemy import Enum
+from sqlalchemy.types import UserDefinedType
+
+from app.src.core.enums import CurrencyEnum
+from app.src.schemas.transaction_schemas import TransactionStatusEnum
+
+
+def enum_values(enum: Type[PythonEnum]) -> List[str]:
+    return [member.value for member in enum]
+
+
+# Postgres enums: each value takes 4 bytes on disk and in indexes instead of
+# the repeated label, and reads come back as the Python enum members.
+CurrencyType = Enum(CurrencyEnum, name="currency", values_callable=enum_values)
+TransactionStatusType = Enum(
+    TransactionStatusEnum, name="transaction_status", values_callable=enum_values
+)
+
+
+class XactIdType(UserDefinedType):
+    """Postgres ``xid8``, a 64-bit transaction id such as ``pg_current_xact_id()``."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "xid8"
+
+
+class XactSnapshotType(UserDefinedType):
+    """Postgres ``pg_snapshot``, the transactions visible to a statement."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "pg_snapshot"
@@ -1,12 +1,14 @@
 from decimal import Decimal
 from typing import List
 
-from sqlalchemy import ForeignKey, Transaction, UniqueConstraint
+from sqlalchemy import BigInteger, ForeignKey, Index, Transaction, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from app.src.core.models import BaseModel
+from app.src.models.types import CurrencyType
 from app.src.schemas.auth import RoleEnum
+from app.src.utils.money import from_minor_units
 
 
 class User(BaseModel):
@@ -27,17 +29,34 @@ class User(BaseModel):
         "Transaction", back_populates="owner"
     )
 
+    __table_args__ = (Index("user_created_id", "created", "id"),)
+
     @hybrid_property
     def fullname(self):
         return f"{self.first_name} {self.last_name}"
 
 
+class UserEmail(BaseModel):
+    """
+    Directory of every registered email on the primary, claimed before the
+    user is written to their shard, so that an address is unique across
+    shards and not just within one.
+    """
+
+    __tablename__ = "user_email"
+
+    email: Mapped[str] = mapped_column(nullable=False, unique=True)
+    # Not a foreign key: the user may live on another shard.
+    user_id: Mapped[int] = mapped_column(nullable=False)
+
+
 class UserBalance(BaseModel):
     __tablename__ = "user_balance"
 
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
-    currency: Mapped[str] = mapped_column(nullable=True)
-    amount: Mapped[Decimal] = mapped_column(default=0, nullable=True)
+    currency: Mapped[str] = mapped_column(CurrencyType, nullable=True)
+    # Minor units of ``currency``, see ``CURRENCY_SCALES``.
+    amount: Mapped[int] = mapped_column(BigInteger, default=0, nullable=True)
 
     __table_args__ = (
         UniqueConstraint(
@@ -45,3 +64,7 @@ class UserBalance(BaseModel):
         ),
     )
     owner: Mapped["User"] = relationship("User", back_populates="user_balance")
+
+    @property
+    def decimal_amount(self) -> Decimal:
+        return from_minor_units(self.amount, self.currency)
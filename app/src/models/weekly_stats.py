@@ -0,0 +1,43 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.src.core.models import BaseModel
+
+
+class WeeklyTransactionStats(BaseModel):
+    __tablename__ = "weekly_transaction_stats"
+
+    week_start: Mapped[datetime] = mapped_column(nullable=False)
+    currency: Mapped[str] = mapped_column(nullable=False)
+    transactions_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    not_rollbacked_transactions_count: Mapped[int] = mapped_column(
+        default=0, nullable=False
+    )
+    not_rollbacked_deposit_amount: Mapped[Decimal] = mapped_column(
+        default=0, nullable=False
+    )
+    not_rollbacked_withdraw_amount: Mapped[Decimal] = mapped_column(
+        default=0, nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "week_start", "currency", name="weekly_transaction_stats_week_currency"
+        ),
+    )
+
+
+class WeeklyUserStats(BaseModel):
+    __tablename__ = "weekly_user_stats"
+
+    week_start: Mapped[datetime] = mapped_column(nullable=False, unique=True)
+    registered_users_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    registered_and_deposit_users_count: Mapped[int] = mapped_column(
+        default=0, nullable=False
+    )
+    registered_and_not_rollbacked_deposit_users_count: Mapped[int] = mapped_column(
+        default=0, nullable=False
+    )
@@ -0,0 +1,19 @@
+from typing import List
+
+from sqlalchemy import select
+
+from app.src.core.repository import SQLAlchemyRepository
+from app.src.models.exchange_rate import ExchangeRate
+
+
+class ExchangeRateRepository(SQLAlchemyRepository):
+    model = ExchangeRate
+
+    async def get_history(self) -> List[ExchangeRate]:
+        """All rates ordered by currency and effective date."""
+        query = select(ExchangeRate).order_by(
+            ExchangeRate.currency, ExchangeRate.effective_from
+        )
+        query_result = await self.session.execute(query)
+
+        return list(query_result.scalars().all())
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.src.core.repository import SQLAlchemyRepository
+from app.src.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyKeyRepository(SQLAlchemyRepository):
+    model: IdempotencyKey = IdempotencyKey
+
+    async def claim(self, user_id: int, key: str, request_hash: str) -> bool:
+        """
+        Insert the key unless it exists. While another open transaction holds
+        the same key this waits for it to finish, so only one request per key
+        ever proceeds. Returns ``True`` when this transaction owns the key.
+        """
+        query = (
+            insert(IdempotencyKey)
+            .values(user_id=user_id, key=key, request_hash=request_hash)
+            .on_conflict_do_nothing(
+                index_elements=[IdempotencyKey.user_id, IdempotencyKey.key]
+            )
+            .returning(IdempotencyKey.id)
+        )
+        return await self.session.scalar(query) is not None
+
+    async def get_by_key(self, user_id: int, key: str) -> IdempotencyKey | None:
+        query = select(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+        )
+        query_result = await self.session.execute(query)
+        return query_result.scalar_one_or_none()
+
+    async def delete_created_before(self, before: datetime, limit: int) -> int:
+        """
+        Delete up to ``limit`` keys created before ``before``, skipping rows
+        locked by a request replaying them. Returns how many were deleted.
+        """
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.created < before)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired))
+        )
+        return result.rowcount
+
+    async def set_response(self, user_id: int, key: str, response: dict) -> None:
+        query = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(response=response)
+        )
+        await self.session.execute(query)
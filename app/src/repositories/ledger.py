@@ -0,0 +1,264 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Select, and_, exists, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.src.core.repository import SQLAlchemyRepository
+from app.src.models.ledger import BalanceSnapshot, LedgerEntry
+from app.src.models.transaction import Transaction
+from app.src.models.user import UserBalance
+from app.src.schemas.ledger_schemas import LedgerEntryKindEnum
+from app.src.schemas.transaction_schemas import TransactionStatusEnum
+
+
+def latest_snapshots(before: datetime, user_id: int | None = None):
+    """Newest snapshot per user and currency taken at or before ``before``."""
+    query = (
+        select(
+            BalanceSnapshot.user_id,
+            BalanceSnapshot.currency,
+            BalanceSnapshot.amount,
+            BalanceSnapshot.taken_at,
+            BalanceSnapshot.xact_snapshot,
+        )
+        .where(BalanceSnapshot.taken_at <= before)
+        .distinct(BalanceSnapshot.user_id, BalanceSnapshot.currency)
+        .order_by(
+            BalanceSnapshot.user_id,
+            BalanceSnapshot.currency,
+            BalanceSnapshot.taken_at.desc(),
+        )
+    )
+    if user_id is not None:
+        query = query.where(BalanceSnapshot.user_id == user_id)
+    return query.subquery("snapshots")
+
+
+def covered_by_snapshot(snapshots):
+    """
+    Whether a ledger entry is included in the matching snapshot: created
+    before it was taken and committed by then. An entry whose transaction
+    started before ``taken_at`` but committed after the snapshot read the
+    ledger is left to the entries after the snapshot.
+    """
+    return and_(
+        LedgerEntry.created < snapshots.c.taken_at,
+        or_(
+            snapshots.c.xact_snapshot.is_(None),
+            LedgerEntry.xact_id.is_(None),
+            func.pg_visible_in_snapshot(LedgerEntry.xact_id, snapshots.c.xact_snapshot),
+        ),
+    )
+
+
+def entries_since_snapshot(snapshots, before: datetime) -> Select:
+    """
+    Entries created before ``before`` and not yet covered by the matching
+    snapshot, summed per user and currency.
+    """
+    return (
+        select(
+            LedgerEntry.user_id,
+            LedgerEntry.currency,
+            func.sum(LedgerEntry.amount).label("amount"),
+        )
+        .outerjoin(
+            snapshots,
+            and_(
+                snapshots.c.user_id == LedgerEntry.user_id,
+                snapshots.c.currency == LedgerEntry.currency,
+            ),
+        )
+        .where(
+            LedgerEntry.created < before,
+            or_(
+                snapshots.c.taken_at.is_(None),
+                ~covered_by_snapshot(snapshots),
+            ),
+        )
+        .group_by(LedgerEntry.user_id, LedgerEntry.currency)
+    )
+
+
+class LedgerEntryRepository(SQLAlchemyRepository):
+    model: LedgerEntry = LedgerEntry
+
+    async def add_entries(self, rows: List[dict]) -> None:
+        await self.session.execute(insert(LedgerEntry), rows)
+
+    async def get_balances(
+        self, user_id: int, before: datetime, currency: str | None = None
+    ) -> List[dict]:
+        """
+        Balance per currency from entries created before ``before``: the
+        latest snapshot plus the entries recorded after it, in one query.
+        """
+        snapshots = latest_snapshots(before, user_id)
+        entries = entries_since_snapshot(snapshots, before).where(
+            LedgerEntry.user_id == user_id
+        )
+        if currency:
+            entries = entries.where(LedgerEntry.currency == currency)
+        entries = entries.subquery("entries")
+
+        query = select(
+            func.coalesce(snapshots.c.currency, entries.c.currency).label("currency"),
+            (
+                func.coalesce(snapshots.c.amount, 0)
+                + func.coalesce(entries.c.amount, 0)
+            ).label("amount"),
+        ).select_from(
+            snapshots.join(
+                entries, entries.c.currency == snapshots.c.currency, full=True
+            )
+        )
+        if currency:
+            query = query.where(
+                func.coalesce(snapshots.c.currency, entries.c.currency) == currency
+            )
+        query_result = await self.session.execute(query.order_by("currency"))
+
+        return list(query_result.mappings())
+
+    async def get_range(
+        self, user_id: int, currency: str, start: datetime, end: datetime
+    ) -> List[LedgerEntry]:
+        query = (
+            select(LedgerEntry)
+            .where(
+                LedgerEntry.user_id == user_id,
+                LedgerEntry.currency == currency,
+                LedgerEntry.created >= start,
+                LedgerEntry.created < end,
+            )
+            .order_by(LedgerEntry.created, LedgerEntry.id)
+        )
+        query_result = await self.session.execute(query)
+
+        return list(query_result.scalars().all())
+
+    async def get_last_id(self, created_before: datetime) -> int:
+        """Highest id of the entries created before ``created_before``."""
+        query = select(func.max(LedgerEntry.id)).where(
+            LedgerEntry.created < created_before
+        )
+        return await self.session.scalar(query) or 0
+
+    async def get_rollbacks(self, after_id: int) -> List[tuple[int, int]]:
+        """``(id, transaction_id)`` of rollback entries with an id above ``after_id``."""
+        query = (
+            select(LedgerEntry.id, LedgerEntry.transaction_id)
+            .where(
+                LedgerEntry.id > after_id,
+                LedgerEntry.kind == LedgerEntryKindEnum.rollback,
+            )
+            .order_by(LedgerEntry.id)
+        )
+        query_result = await self.session.execute(query)
+
+        return list(query_result.tuples().all())
+
+    async def backfill(self) -> None:
+        """
+        Create entries for transactions recorded before the ledger existed.
+        Rollbacks of those transactions are booked at the transaction time,
+        since the original rollback time is unknown. Whatever part of a
+        ``UserBalance`` is still not explained by entries is booked as an
+        opening entry dated before all of the balance's other entries.
+        """
+        not_recorded = ~exists().where(LedgerEntry.transaction_id == Transaction.id)
+        columns = ["user_id", "transaction_id", "currency", "amount", "kind", "created"]
+        await self.session.execute(
+            insert(LedgerEntry).from_select(
+                columns,
+                select(
+                    Transaction.user_id,
+                    Transaction.id,
+                    Transaction.currency,
+                    Transaction.amount,
+                    literal(LedgerEntryKindEnum.transaction.value),
+                    Transaction.created,
+                ).where(not_recorded),
+            )
+        )
+        await self.session.execute(
+            insert(LedgerEntry).from_select(
+                columns,
+                select(
+                    Transaction.user_id,
+                    Transaction.id,
+                    Transaction.currency,
+                    -Transaction.amount,
+                    literal(LedgerEntryKindEnum.rollback.value),
+                    Transaction.created,
+                ).where(
+                    Transaction.status == TransactionStatusEnum.roll_backed,
+                    ~exists().where(
+                        LedgerEntry.transaction_id == Transaction.id,
+                        LedgerEntry.kind == LedgerEntryKindEnum.rollback,
+                    ),
+                ),
+            )
+        )
+
+        same_balance = and_(
+            LedgerEntry.user_id == UserBalance.user_id,
+            LedgerEntry.currency == UserBalance.currency,
+        )
+        recorded = select(func.sum(LedgerEntry.amount)).where(same_balance)
+        first_recorded = select(func.min(LedgerEntry.created)).where(same_balance)
+        opening_amount = UserBalance.amount - func.coalesce(
+            recorded.scalar_subquery(), 0
+        )
+        await self.session.execute(
+            insert(LedgerEntry).from_select(
+                columns,
+                select(
+                    UserBalance.user_id,
+                    literal(None),
+                    UserBalance.currency,
+                    opening_amount,
+                    literal(LedgerEntryKindEnum.opening.value),
+                    func.least(UserBalance.created, first_recorded.scalar_subquery()),
+                ).where(opening_amount != 0),
+            )
+        )
+
+
+class BalanceSnapshotRepository(SQLAlchemyRepository):
+    model: BalanceSnapshot = BalanceSnapshot
+
+    async def take(self, taken_at: datetime) -> int:
+        """
+        Snapshot every user and currency with entries since its previous
+        snapshot, as of ``taken_at``. Returns the number of snapshots written.
+
+        Each snapshot keeps the ``pg_current_snapshot()`` it was computed
+        with, so entries of transactions still in flight, which it could not
+        see, are counted after it even though they are dated before it.
+        """
+        snapshots = latest_snapshots(taken_at)
+        entries = entries_since_snapshot(snapshots, taken_at).add_columns(
+            snapshots.c.amount.label("snapshot_amount")
+        )
+        entries = entries.group_by(snapshots.c.amount).subquery()
+
+        query = (
+            insert(BalanceSnapshot)
+            .from_select(
+                ["user_id", "currency", "amount", "taken_at", "xact_snapshot"],
+                select(
+                    entries.c.user_id,
+                    entries.c.currency,
+                    func.coalesce(entries.c.snapshot_amount, 0) + entries.c.amount,
+                    literal(taken_at),
+                    func.pg_current_snapshot(),
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(BalanceSnapshot.id)
+        )
+        query_result = await self.session.execute(query)
+
+        return len(query_result.all())
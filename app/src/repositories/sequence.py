@@ -0,0 +1,39 @@
+from sqlalchemy import func, select, text
+
+from app.src.core.repository import SQLAlchemyRepository
+
+
+class IdSequenceRepository(SQLAlchemyRepository):
+    """The sequence behind the ``id`` column of a table."""
+
+    async def get_state(self, table: str) -> tuple[int, int, int]:
+        """
+        Highest id ``table`` has handed out or stores, 0 for none, and the
+        current value and increment of its sequence. Before its first use
+        since the last restart the sequence's current value is where it
+        starts.
+        """
+        query = text(
+            "SELECT coalesce(greatest(sequence.last_value, stored.max_id), 0), "
+            "coalesce(sequence.last_value, sequence.start_value), "
+            "sequence.increment_by "
+            "FROM pg_sequences AS sequence, "
+            f'(SELECT max(id) AS max_id FROM "{table}") AS stored '
+            "WHERE format('%I.%I', sequence.schemaname, sequence.sequencename) "
+            "= pg_get_serial_sequence(:table, 'id')"
+        )
+        query_result = await self.session.execute(query, {"table": f'"{table}"'})
+
+        return tuple(query_result.one())
+
+    async def restart(self, table: str, start: int, increment: int) -> None:
+        """Hand out ``start``, ``start + increment``, ... as the ids of ``table``."""
+        sequence = await self.session.scalar(
+            select(func.pg_get_serial_sequence(f'"{table}"', "id"))
+        )
+        await self.session.execute(
+            text(
+                f"ALTER SEQUENCE {sequence} "
+                f"INCREMENT BY {int(increment)} START WITH {int(start)} RESTART"
+            )
+        )
@@ -1,16 +1,309 @@
-from typing import List
+import asyncio
+import re
+from contextlib import aclosing
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, List
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Select,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.src.core.enums import CURRENCY_SCALES
 from app.src.core.repository import SQLAlchemyRepository
 from app.src.models.transaction import Transaction
+from app.src.models.user import User
+from app.src.repositories.transaction_archive import (
+    TransactionArchiveRepository,
+    find_in_archive_file,
+    read_archive_file,
+)
+from app.src.schemas.transaction_schemas import (
+    TransactionFilter,
+    TransactionStatusEnum,
+)
+from app.src.schemas.user_schemas import UserStatusEnum
+from app.src.utils.dates import created_bounds
+
+PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+# Arbitrary key of the advisory lock held while partitions are created.
+PARTITION_MAINTENANCE_LOCK = 7_230_115
+
+
+def in_minor_units(amount: Decimal):
+    """``amount`` scaled to the minor units of each row's currency."""
+    return case(
+        *(
+            (Transaction.currency == currency, amount.scaleb(scale))
+            for currency, scale in CURRENCY_SCALES.items()
+        )
+    )
 
 
 class TransactionRepository(SQLAlchemyRepository):
+    """
+    Hot transactions live in Postgres; those older than the archived horizon
+    were moved to Parquet files. ``get``, ``get_page`` and ``iter_archived``
+    read through to the archive, so callers see one history.
+    """
+
     model = Transaction
 
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+        self.__archive_repository = TransactionArchiveRepository(session=session)
+
+    async def get(self, id) -> Transaction | None:
+        transaction = await super().get(id)
+        if transaction is None:
+            transaction = await self.get_archived(id)
+        return transaction
+
     async def get_all_by_user_id(self, user_id: int) -> List[Transaction] | None:
         query = select(Transaction).filter(Transaction.user_id == user_id)
         query_result = await self.session.execute(query)
 
         return query_result.scalars()
+
+    def filtered_query(
+        self,
+        filters: TransactionFilter,
+        after: tuple[datetime, int] | None = None,
+        archived_until: datetime | None = None,
+    ) -> Select:
+        """
+        Hot transactions matching ``filters``, newest first, ordered by
+        ``(created, id)`` so the order is total and matches the
+        ``transaction_created_id`` index. ``after`` is the keyset of the last
+        row already returned. Rows before ``archived_until`` are left to the
+        archive even if an archival run has not committed yet.
+        """
+        query = select(Transaction).order_by(
+            Transaction.created.desc(), Transaction.id.desc()
+        )
+        if filters.user_id is not None:
+            query = query.where(Transaction.user_id == filters.user_id)
+        if filters.currency:
+            query = query.where(Transaction.currency == filters.currency)
+        if filters.status:
+            query = query.where(Transaction.status == filters.status)
+        if filters.amount_from is not None:
+            query = query.where(
+                Transaction.amount >= in_minor_units(filters.amount_from)
+            )
+        if filters.amount_to is not None:
+            query = query.where(Transaction.amount <= in_minor_units(filters.amount_to))
+        start, end = created_bounds(filters)
+        if start:
+            query = query.where(Transaction.created >= start)
+        if end:
+            query = query.where(Transaction.created < end)
+        if archived_until:
+            query = query.where(Transaction.created >= archived_until)
+        if after:
+            query = query.where(tuple_(Transaction.created, Transaction.id) < after)
+        return query
+
+    async def get_archived_until(self) -> datetime | None:
+        return await self.__archive_repository.get_archived_until()
+
+    async def get_page(
+        self,
+        filters: TransactionFilter,
+        after: tuple[datetime, int] | None,
+        limit: int,
+    ) -> List[Transaction]:
+        """
+        Up to ``limit`` transactions following ``after``, continuing into the
+        archive once the hot rows run out.
+        """
+        archived_until = await self.get_archived_until()
+        query = self.filtered_query(filters, after, archived_until).limit(limit)
+        query_result = await self.session.execute(query)
+        transactions = list(query_result.scalars().all())
+
+        if len(transactions) < limit and archived_until:
+            async with aclosing(self.iter_archived(filters, after)) as chunks:
+                async for rows in chunks:
+                    rows = rows[: limit - len(transactions)]
+                    transactions.extend(Transaction(**row) for row in rows)
+                    if len(transactions) == limit:
+                        break
+        return transactions
+
+    async def iter_archived(
+        self, filters: TransactionFilter, after: tuple[datetime, int] | None = None
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Archived rows matching ``filters`` after ``after``, newest first. The
+        Parquet files are read in a worker thread, one row group at a time.
+        """
+        start, end = created_bounds(filters)
+        for archive in await self.__archive_repository.get_files(start, end):
+            if after and archive.period_start > after[0]:
+                continue
+            chunks = read_archive_file(archive.path, filters, start, end, after)
+            while rows := await asyncio.to_thread(next, chunks, None):
+                yield rows
+
+    async def get_archived(self, transaction_id: int) -> Transaction | None:
+        """
+        An archived transaction, detached from the session. Archived rows are
+        read-only.
+        """
+        for archive in await self.__archive_repository.get_files_by_id(transaction_id):
+            row = await asyncio.to_thread(
+                find_in_archive_file, archive.path, transaction_id
+            )
+            if row:
+                return Transaction(**row)
+        return None
+
+    async def get_oldest_created(self) -> datetime | None:
+        return await self.session.scalar(select(func.min(Transaction.created)))
+
+    async def iter_range(
+        self, start: datetime, end: datetime, chunk_size: int, lock: bool = False
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Hot rows created in ``[start, end)``, newest first, in chunks. Each
+        chunk is its own keyset query rather than a fetch from one open
+        cursor, so the range can be dropped in the same transaction. With
+        ``lock`` the rows are read ``FOR SHARE`` and cannot change until
+        commit.
+        """
+        query = (
+            select(
+                Transaction.id,
+                Transaction.user_id,
+                Transaction.currency,
+                Transaction.amount,
+                Transaction.status,
+                Transaction.created,
+            )
+            .where(Transaction.created >= start, Transaction.created < end)
+            .order_by(Transaction.created.desc(), Transaction.id.desc())
+            .limit(chunk_size)
+        )
+        if lock:
+            query = query.with_for_update(read=True)
+        after = None
+        while True:
+            chunk_query = query
+            if after:
+                chunk_query = query.where(
+                    tuple_(Transaction.created, Transaction.id) < after
+                )
+            query_result = await self.session.execute(chunk_query)
+            rows = [dict(row) for row in query_result.mappings()]
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                return
+            after = (rows[-1]["created"], rows[-1]["id"])
+
+    async def delete_range(self, start: datetime, end: datetime) -> int:
+        """Delete the hot rows created in ``[start, end)``, returning their count."""
+        query_result = await self.session.execute(
+            delete(Transaction).where(
+                Transaction.created >= start, Transaction.created < end
+            )
+        )
+        return query_result.rowcount
+
+    async def create_many(self, rows: List[dict]) -> List[Transaction]:
+        """Insert ``rows`` with one multi-row ``INSERT ... RETURNING``."""
+        query = insert(Transaction).returning(Transaction, sort_by_parameter_order=True)
+        query_result = await self.session.scalars(query, rows)
+
+        return list(query_result.all())
+
+    async def set_rollbacked(
+        self, transaction_id: int, user_id: int
+    ) -> Transaction | None:
+        """
+        Mark an active user's transaction as rolled back in a single
+        statement. Returns ``None`` when the transaction does not exist,
+        belongs to someone else, is already rolled back or the user is not
+        active, so two concurrent rollbacks cannot both succeed.
+        """
+        query = (
+            update(Transaction)
+            .where(
+                Transaction.id == transaction_id,
+                Transaction.user_id == user_id,
+                Transaction.status != TransactionStatusEnum.roll_backed,
+                exists().where(
+                    User.id == user_id, User.status == UserStatusEnum.ACTIVE
+                ),
+            )
+            .values(status=TransactionStatusEnum.roll_backed)
+            .returning(Transaction)
+            .execution_options(populate_existing=True)
+        )
+        return await self.session.scalar(query)
+
+
+class TransactionPartitionRepository(SQLAlchemyRepository):
+    model = Transaction
+
+    async def lock(self) -> None:
+        """Serialize partition maintenance across processes until commit."""
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(PARTITION_MAINTENANCE_LOCK))
+        )
+
+    async def get_upper_bound(self) -> datetime | None:
+        """End of the range covered by the partitions, ``None`` without any."""
+        query = text(
+            "SELECT pg_get_expr(partition.relpartbound, partition.oid) "
+            "FROM pg_inherits "
+            "JOIN pg_class AS partition ON partition.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+        )
+        bounds = await self.session.scalars(
+            query, {"parent": Transaction.__tablename__}
+        )
+        return max(
+            (
+                datetime.fromisoformat(match.group(1))
+                for bound in bounds
+                if (match := PARTITION_UPPER_BOUND.search(bound))
+            ),
+            default=None,
+        )
+
+    async def lock_partition(self, name: str) -> bool:
+        """
+        Block writes to partition ``name`` until commit. Returns whether the
+        partition exists.
+        """
+        if await self.session.scalar(select(func.to_regclass(f'"{name}"'))) is None:
+            return False
+        await self.session.execute(text(f'LOCK TABLE "{name}" IN SHARE MODE'))
+        return True
+
+    async def drop_partition(self, name: str) -> None:
+        await self.session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+
+    async def create_partition(
+        self, name: str, start: datetime | None, end: datetime
+    ) -> None:
+        """Partition for ``[start, end)``; ``start=None`` means unbounded."""
+        lower = f"'{start.isoformat()}'" if start else "MINVALUE"
+        await self.session.execute(
+            text(
+                f'CREATE TABLE "{name}" PARTITION OF "{Transaction.__tablename__}" '
+                f"FOR VALUES FROM ({lower}) TO ('{end.isoformat()}')"
+            )
+        )
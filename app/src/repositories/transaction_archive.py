@@ -0,0 +1,203 @@
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, List
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import func, select
+
+from app.src.core.config import config
+from app.src.core.enums import CURRENCY_SCALES
+from app.src.core.repository import SQLAlchemyRepository
+from app.src.models.transaction_archive import TransactionArchive
+from app.src.schemas.transaction_schemas import TransactionFilter
+from app.src.utils.money import from_minor_units, to_minor_units
+
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("currency", pa.string()),
+        # Currency units rather than the table's minor units, so the files
+        # read the same without ``CURRENCY_SCALES``.
+        ("amount", pa.decimal128(38, 18)),
+        ("status", pa.string()),
+        ("created", pa.timestamp("us")),
+    ]
+)
+ARCHIVE_COMPRESSION = "zstd"
+CREATED_COLUMN = ARCHIVE_SCHEMA.get_field_index("created")
+AMOUNT_COLUMN = ARCHIVE_SCHEMA.get_field_index("amount")
+# Archived rows as the ``transaction`` table stores them.
+ROW_SCHEMA = ARCHIVE_SCHEMA.set(AMOUNT_COLUMN, pa.field("amount", pa.int64()))
+
+
+def archive_path(path: str) -> str:
+    return os.path.join(config.archive.TRANSACTION_ARCHIVE_DIR, path)
+
+
+def to_row_amounts(table: pa.Table) -> pa.Table:
+    """Archive rows with their amounts converted to minor units, vectorized."""
+    chunks = []
+    for currency, scale in CURRENCY_SCALES.items():
+        rows = table.filter(pc.field("currency") == currency.value)
+        # Fails instead of rounding when an amount is too precise.
+        amount = pc.cast(rows["amount"], pa.decimal128(20, scale))
+        amount = pc.multiply(
+            amount, pa.scalar(Decimal(10**scale), pa.decimal128(scale + 1, 0))
+        )
+        chunks.append(
+            rows.set_column(
+                AMOUNT_COLUMN, ROW_SCHEMA.field("amount"), pc.cast(amount, pa.int64())
+            )
+        )
+    return pa.concat_tables(chunks)
+
+
+def filter_expression(
+    filters: TransactionFilter,
+    start: datetime | None,
+    end: datetime | None,
+    after: tuple[datetime, int] | None,
+) -> pc.Expression:
+    """``TransactionRepository.filtered_query`` as a Parquet row filter."""
+    expression = pc.scalar(True)
+    if filters.user_id is not None:
+        expression &= pc.field("user_id") == filters.user_id
+    if filters.currency:
+        expression &= pc.field("currency") == str(filters.currency)
+    if filters.status:
+        expression &= pc.field("status") == str(filters.status)
+    if filters.amount_from is not None:
+        expression &= pc.field("amount") >= filters.amount_from
+    if filters.amount_to is not None:
+        expression &= pc.field("amount") <= filters.amount_to
+    if start:
+        expression &= pc.field("created") >= start
+    if end:
+        expression &= pc.field("created") < end
+    if after:
+        created, id = after
+        expression &= (pc.field("created") < created) | (
+            (pc.field("created") == created) & (pc.field("id") < id)
+        )
+    return expression
+
+
+class ArchiveFileWriter:
+    """
+    Writes chunks of rows (newest first) as one row group each. The file is
+    written under a temporary name and only renamed into place by ``close``.
+    """
+
+    def __init__(self, path: str):
+        self.path = archive_path(path)
+        self.__partial_path = f"{self.path}.partial"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.__writer = pq.ParquetWriter(
+            self.__partial_path, ARCHIVE_SCHEMA, compression=ARCHIVE_COMPRESSION
+        )
+
+    def write(self, rows: List[dict]) -> None:
+        rows = [
+            {**row, "amount": from_minor_units(row["amount"], row["currency"])}
+            for row in rows
+        ]
+        self.__writer.write_table(pa.Table.from_pylist(rows, ARCHIVE_SCHEMA))
+
+    def close(self) -> None:
+        self.__writer.close()
+        os.replace(self.__partial_path, self.path)
+
+    def discard(self) -> None:
+        self.__writer.close()
+        os.remove(self.__partial_path)
+
+
+def read_archive_file(
+    path: str,
+    filters: TransactionFilter,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> Iterator[List[dict]]:
+    """
+    Matching rows of an archive file, newest first, one list per row group,
+    with amounts in minor units.
+
+    Row groups are stored newest first, so their ``created`` statistics let
+    groups newer than the requested range be skipped and the scan stop at
+    the first group older than it.
+    """
+    archive_file = pq.ParquetFile(archive_path(path))
+    expression = filter_expression(filters, start, end, after)
+    # Row groups whose oldest row is newer than this can not match.
+    newest = after[0] if after else None
+    if end and (newest is None or end < newest):
+        newest = end
+
+    for index in range(archive_file.num_row_groups):
+        statistics = archive_file.metadata.row_group(index).column(CREATED_COLUMN)
+        statistics = statistics.statistics
+        if statistics is not None and statistics.has_min_max:
+            if start and statistics.max < start:
+                return
+            if newest and statistics.min > newest:
+                continue
+        rows = archive_file.read_row_group(index).filter(expression).to_pylist()
+        for row in rows:
+            row["amount"] = to_minor_units(row["amount"], row["currency"])
+        if rows:
+            yield rows
+
+
+def read_archive_table(path: str) -> pa.Table:
+    """A whole archive file as ``ROW_SCHEMA`` rows."""
+    return to_row_amounts(pq.read_table(archive_path(path), schema=ARCHIVE_SCHEMA))
+
+
+def find_in_archive_file(path: str, transaction_id: int) -> dict | None:
+    table = pq.read_table(archive_path(path), filters=[("id", "=", transaction_id)])
+    if not table.num_rows:
+        return None
+    row = table.to_pylist()[0]
+    row["amount"] = to_minor_units(row["amount"], row["currency"])
+    return row
+
+
+class TransactionArchiveRepository(SQLAlchemyRepository):
+    model: TransactionArchive = TransactionArchive
+
+    async def get_archived_until(self) -> datetime | None:
+        """End of the archived range; older transactions are no longer hot."""
+        return await self.session.scalar(
+            select(func.max(TransactionArchive.period_end))
+        )
+
+    async def get_files(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> List[TransactionArchive]:
+        """Non-empty archive files overlapping ``[start, end)``, newest first."""
+        query = (
+            select(TransactionArchive)
+            .where(TransactionArchive.row_count > 0)
+            .order_by(TransactionArchive.period_start.desc())
+        )
+        if start:
+            query = query.where(TransactionArchive.period_end > start)
+        if end:
+            query = query.where(TransactionArchive.period_start < end)
+        query_result = await self.session.execute(query)
+
+        return list(query_result.scalars().all())
+
+    async def get_files_by_id(self, transaction_id: int) -> List[TransactionArchive]:
+        query = select(TransactionArchive).where(
+            TransactionArchive.min_id <= transaction_id,
+            TransactionArchive.max_id >= transaction_id,
+        )
+        query_result = await self.session.execute(query)
+
+        return list(query_result.scalars().all())
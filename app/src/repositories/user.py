@@ -1,59 +1,258 @@
 from datetime import datetime
-from decimal import Decimal
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List
 
-from sqlalchemy import select, update
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import (
+    CTE,
+    BigInteger,
+    Column,
+    Integer,
+    MetaData,
+    Select,
+    String,
+    Table,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy import values as values_table
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import load_only
 
 from app.src.core.enums import CurrencyEnum
 from app.src.core.repository import SQLAlchemyRepository
-from app.src.models.user import User, UserBalance
-from app.src.schemas.user_schemas import RequestUserModel, UserFilter, UserStatusEnum
-from app.src.utils.auth_security import get_password_hash
+from app.src.models.types import CurrencyType
+from app.src.models.user import User, UserBalance, UserEmail
+from app.src.schemas.auth import RoleEnum
+from app.src.repositories.weekly_stats import WeeklyUserStatsRepository
+from app.src.schemas.user_schemas import (
+    RequestUserModel,
+    UserFilter,
+    UserSortEnum,
+    UserStatusEnum,
+)
+from app.src.utils.dates import created_bounds
+
+USER_LIST_COLUMNS = (User.id, User.email, User.status, User.created)
+
+# Rows of a bulk import, COPY-ed in before being merged into ``user``. Kept
+# out of the models' metadata so migrations never see it.
+user_import_staging = Table(
+    "user_import_staging",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("id", BigInteger),
+    Column("email", String, nullable=False),
+    Column("first_name", String, nullable=False),
+    Column("last_name", String, nullable=False),
+    Column("password_hash", String, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
 
 
 class UserRepository(SQLAlchemyRepository):
     model: User = User
 
-    async def get_users_with_balancies(
-        self, filters: Optional[UserFilter]
-    ) -> List[User]:
-        query = select(User).options(selectinload(User.user_balance))
+    def filtered_query(
+        self,
+        filters: UserFilter,
+        balance_range: tuple[int | None, int | None] = (None, None),
+    ) -> Select:
+        """
+        ``USER_LIST_COLUMNS`` of the users matching ``filters``. The balance
+        bounds are in minor units of ``filters.currency`` and checked with an
+        ``EXISTS`` on the ``user_balance_user_currency_unique`` index.
+        """
+        query = select(*USER_LIST_COLUMNS)
+        if filters.id is not None:
+            query = query.where(User.id == filters.id)
+        if filters.email:
+            query = query.where(User.email == filters.email)
+        if filters.status:
+            query = query.where(User.status == filters.status)
+        start, end = created_bounds(filters)
+        if start:
+            query = query.where(User.created >= start)
+        if end:
+            query = query.where(User.created < end)
 
-        for field, value in filters.model_dump(exclude_none=True).items():
-            query = query.filter(getattr(self.model, field) == value)
-        result = await self.session.execute(query)
+        balance_from, balance_to = balance_range
+        if balance_from is not None or balance_to is not None:
+            balance = select(UserBalance.id).where(
+                UserBalance.user_id == User.id,
+                UserBalance.currency == filters.currency,
+            )
+            if balance_from is not None:
+                balance = balance.where(UserBalance.amount >= balance_from)
+            if balance_to is not None:
+                balance = balance.where(UserBalance.amount <= balance_to)
+            query = query.where(balance.exists())
+        return query
 
-        return result.scalars()
+    async def get_page(
+        self,
+        filters: UserFilter,
+        balance_range: tuple[int | None, int | None],
+        sort: UserSortEnum,
+        descending: bool,
+        after: tuple[datetime, int] | None,
+        limit: int,
+    ) -> List[dict]:
+        """
+        Up to ``limit`` users following the keyset ``after``, as rows of
+        ``USER_LIST_COLUMNS``. Users are ordered by ``id`` or by
+        ``(created, id)``, both index order, so no ORM objects are built and
+        no page costs more than its own rows.
+        """
+        key = (User.created, User.id) if sort == UserSortEnum.created else (User.id,)
+        query = self.filtered_query(filters, balance_range)
+        if after:
+            last = after if sort == UserSortEnum.created else after[1:]
+            if descending:
+                query = query.where(tuple_(*key) < last)
+            else:
+                query = query.where(tuple_(*key) > last)
+        query = query.order_by(
+            *(column.desc() if descending else column for column in key)
+        ).limit(limit)
 
-    async def create_user(self, model: RequestUserModel) -> User:
-        user = User(
-            email=model.email,
-            first_name=model.first_name,
-            last_name=model.last_name,
-            status=UserStatusEnum.ACTIVE,
+        query_result = await self.session.execute(query)
+        return [dict(row) for row in query_result.mappings()]
+
+    async def bulk_create(self, rows: List[tuple], with_ids: bool = False) -> List[str]:
+        """
+        Register ``rows`` of ``user_import_staging`` columns, each with a zero
+        balance in every currency, and commit. The rows are COPY-ed into the
+        temporary staging table and merged by a single ``INSERT ... SELECT ...
+        ON CONFLICT (email) DO NOTHING`` that feeds the same balance and
+        registration CTEs as ``create_user``. Ids come from the rows'
+        ``id`` with ``with_ids``, from the sequence otherwise. Returns the emails of
+        the users created; rows whose email is taken are skipped.
+        """
+        connection = await self.session.connection()
+        await connection.run_sync(user_import_staging.create)
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            user_import_staging.name,
+            records=rows,
+            columns=[staging_column.name for staging_column in user_import_staging.c],
+        )
+
+        staging = user_import_staging.c
+        columns = [
+            staging.email,
+            staging.first_name,
+            staging.last_name,
+            staging.password_hash,
+            literal(UserStatusEnum.ACTIVE.value, User.status.type).label("status"),
+            # Column defaults are not applied to statements nested in a CTE.
+            literal(RoleEnum.USER.value, User.role.type).label("role"),
+        ]
+        if with_ids:
+            columns.insert(0, staging.id)
+        new_user = (
+            insert(User)
+            .from_select(
+                [source.name for source in columns],
+                select(*columns).order_by(staging.line),
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id, User.email, User.created)
+            .cte("new_user")
         )
+        new_balances, registration = self.registration_ctes(new_user)
+        query = select(new_user.c.email).add_cte(new_balances, registration)
 
-        user.password_hash = get_password_hash(model.password)
+        emails = list(await self.session.scalars(query))
+        await self.session.commit()
+        return emails
 
-        self.session.add(user)
-        balances = [
-            UserBalance(
-                owner=user, currency=str(currency), amount=0, created=datetime.utcnow()
+    def registration_ctes(self, new_user: CTE) -> tuple[CTE, CTE]:
+        """
+        CTEs completing the registration of the users returned by
+        ``new_user``, which must have ``id`` and ``created`` columns: their
+        zero balance in every currency, returning the balances, and the
+        weekly registration count.
+        """
+        currencies = values_table(
+            column("currency", CurrencyType), name="currencies"
+        ).data([(currency,) for currency in CurrencyEnum])
+        new_balances = (
+            insert(UserBalance)
+            .from_select(
+                ["user_id", "currency", "amount"],
+                select(new_user.c.id, currencies.c.currency, literal(0)).select_from(
+                    new_user.join(currencies, true())
+                ),
             )
-            for currency in CurrencyEnum
-        ]
+            .returning(UserBalance.user_id, UserBalance.currency, UserBalance.amount)
+            .cte("new_balances")
+        )
+        registration = (
+            WeeklyUserStatsRepository(session=self.session)
+            .registration_upsert(new_user)
+            .cte("registration")
+        )
+        return new_balances, registration
 
-        self.session.add_all(balances)
+    async def create_user(
+        self, model: RequestUserModel, password_hash: str, id: int | None = None
+    ) -> User | None:
+        """
+        Register the user with a zero balance in every currency in a single
+        statement: the user ``INSERT ... ON CONFLICT (email) DO NOTHING`` feeds
+        a multi-row balance insert and the weekly registration count through
+        CTEs. Returns a transient ``User`` built from the ``RETURNING`` rows, or
+        ``None`` when the email is taken, in which case nothing is written.
+        """
+        values = dict(
+            email=model.email,
+            first_name=model.first_name,
+            last_name=model.last_name,
+            password_hash=password_hash,
+            status=UserStatusEnum.ACTIVE,
+            # Column defaults are not applied to statements nested in a CTE.
+            role=RoleEnum.USER,
+        )
+        if id is not None:
+            values["id"] = id
+        new_user = (
+            insert(User)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id, User.email, User.status, User.role, User.created)
+            .cte("new_user")
+        )
+        new_balances, registration = self.registration_ctes(new_user)
+        query = (
+            select(new_user, new_balances.c.currency, new_balances.c.amount)
+            .join_from(new_user, new_balances, new_balances.c.user_id == new_user.c.id)
+            .add_cte(registration)
+        )
 
+        rows = (await self.session.execute(query)).all()
         await self.session.commit()
-        query = (
-            select(User)
-            .options(joinedload(User.user_balance))
-            .where(User.id == user.id)
+        if not rows:
+            return None
+        first = rows[0]
+        return User(
+            id=first.id,
+            email=first.email,
+            status=first.status,
+            role=first.role,
+            created=first.created,
+            user_balance=[
+                UserBalance(user_id=row.id, currency=row.currency, amount=row.amount)
+                for row in rows
+            ],
         )
-        query_result = await self.session.execute(query)
-        return query_result.scalar()
 
     async def get_by_email(self, email: str) -> User | None:
         query = select(User).where(User.email == email)
@@ -61,6 +260,47 @@ class UserRepository(SQLAlchemyRepository):
 
         return result.scalar_one_or_none()
 
+    async def iter_created_range(
+        self, start: datetime | None, end: datetime, chunk_size: int
+    ) -> AsyncIterator[List[dict]]:
+        """
+        ``id`` and ``created`` of users registered in ``[start, end)``, oldest
+        first, in keyset-paginated chunks. ``start=None`` means unbounded.
+        """
+        query = (
+            select(User.id, User.created)
+            .where(User.created < end)
+            .order_by(User.created, User.id)
+            .limit(chunk_size)
+        )
+        if start:
+            query = query.where(User.created >= start)
+        after = None
+        while True:
+            chunk_query = query
+            if after:
+                chunk_query = query.where(tuple_(User.created, User.id) > after)
+            query_result = await self.session.execute(chunk_query)
+            rows = [dict(row) for row in query_result.mappings()]
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                return
+            after = (rows[-1]["created"], rows[-1]["id"])
+
+    async def iter_emails(self, chunk_size: int) -> AsyncIterator[List[tuple]]:
+        """``(email, id)`` of every user by id, in keyset-paginated chunks."""
+        query = select(User.email, User.id).order_by(User.id).limit(chunk_size)
+        after = 0
+        while True:
+            query_result = await self.session.execute(query.where(User.id > after))
+            rows = list(query_result.tuples())
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                return
+            after = rows[-1][1]
+
     async def update_status(self, user: User, status: str) -> User:
         db_user = user
         if db_user not in self.session:
@@ -76,9 +316,72 @@ class UserRepository(SQLAlchemyRepository):
         return db_user
 
 
+class UserEmailRepository(SQLAlchemyRepository):
+    model: UserEmail = UserEmail
+
+    async def claim(self, emails: List[str]) -> Dict[str, int]:
+        """
+        Claim the free ones of ``emails``, each with a new id from this
+        database's ``user.id`` sequence, in a single ``INSERT ... ON CONFLICT
+        (email) DO NOTHING``. Returns the id reserved for every email claimed;
+        emails already claimed are left out.
+        """
+        sequence = func.pg_get_serial_sequence('"user"', "id")
+        claimed = (
+            func.unnest(bindparam("emails", emails, type_=ARRAY(String)))
+            .table_valued("email")
+            .render_derived()
+        )
+        query = (
+            insert(UserEmail)
+            .from_select(
+                ["email", "user_id"],
+                select(claimed.c.email, func.nextval(sequence)),
+            )
+            .on_conflict_do_nothing(index_elements=[UserEmail.email])
+            .returning(UserEmail.email, UserEmail.user_id)
+        )
+        query_result = await self.session.execute(query)
+
+        return dict(query_result.tuples().all())
+
+    async def release(self, emails: List[str]) -> None:
+        """Free ``emails`` again, for users that were not created after all."""
+        query = delete(UserEmail).where(
+            UserEmail.email == any_(bindparam("emails", emails, type_=ARRAY(String)))
+        )
+        await self.session.execute(query)
+
+    async def register(self, rows: List[tuple]) -> int:
+        """
+        Record ``(email, user_id)`` of existing users, skipping emails
+        already in the directory. Returns the number of rows added.
+        """
+        query = (
+            insert(UserEmail)
+            .values([dict(email=email, user_id=user_id) for email, user_id in rows])
+            .on_conflict_do_nothing(index_elements=[UserEmail.email])
+        )
+        query_result = await self.session.execute(query)
+
+        return query_result.rowcount
+
+
 class UserBalanceRepository(SQLAlchemyRepository):
     model: UserBalance = UserBalance
 
+    async def get_for_users(self, user_ids: List[int]) -> List[UserBalance]:
+        query = (
+            select(UserBalance)
+            .options(
+                load_only(UserBalance.user_id, UserBalance.currency, UserBalance.amount)
+            )
+            .where(UserBalance.user_id.in_(user_ids))
+            .order_by(UserBalance.user_id, UserBalance.id)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars())
+
     async def get_user_balance_by_currency(
         self, user_id: int, currency: str
     ) -> UserBalance | None:
@@ -88,17 +391,52 @@ class UserBalanceRepository(SQLAlchemyRepository):
         query_result = await self.session.execute(query)
         return query_result.scalar_one_or_none()
 
-    async def update_balance(
-        self, user_balance: UserBalance, amount: Decimal
-    ) -> UserBalance:
-        balance = user_balance
+    async def get_user_balances_for_update(
+        self, user_id: int, currencies: List[str]
+    ) -> List[UserBalance]:
+        """Balances of ``user_id`` in ``currencies``, row-locked until commit."""
         query = (
-            update(UserBalance)
-            .where(UserBalance.id == balance.id)
-            .values(amount=amount)
+            select(UserBalance)
+            .filter(
+                UserBalance.user_id == user_id, UserBalance.currency.in_(currencies)
+            )
+            .order_by(UserBalance.id)
+            .with_for_update()
         )
+        query_result = await self.session.execute(query)
+        return list(query_result.scalars().all())
 
-        await self.session.execute(query)
-        await self.session.flush(balance)
+    async def update_amounts(self, amounts: Dict[int, int]) -> None:
+        """Set ``amount`` of each balance id in ``amounts`` in one executemany."""
+        await self.session.execute(
+            update(UserBalance),
+            [
+                {"id": balance_id, "amount": amount}
+                for balance_id, amount in amounts.items()
+            ],
+        )
+
+    async def add_amount(self, user_id: int, currency: str, delta: int) -> int | None:
+        """
+        Add ``delta`` to an active user's balance in a single statement.
 
-        return balance
+        The row is locked by the ``UPDATE`` itself and the non-negative check
+        runs on the locked value, so concurrent mutations serialize instead of
+        losing updates. Returns the new amount, or ``None`` when nothing was
+        updated because the balance is missing, the user is not active or the
+        result would be negative.
+        """
+        query = (
+            update(UserBalance)
+            .where(
+                UserBalance.user_id == user_id,
+                UserBalance.currency == currency,
+                UserBalance.amount + delta >= 0,
+                User.id == UserBalance.user_id,
+                User.status == UserStatusEnum.ACTIVE,
+            )
+            .values(amount=UserBalance.amount + delta)
+            .returning(UserBalance.amount)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.session.scalar(query)
@@ -0,0 +1,323 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from sqlalchemy import (
+    CTE,
+    Insert,
+    Select,
+    and_,
+    case,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+
+from app.src.core.repository import SQLAlchemyRepository
+from app.src.models.transaction import Transaction
+from app.src.models.user import User
+from app.src.models.weekly_stats import WeeklyTransactionStats, WeeklyUserStats
+from app.src.schemas.transaction_schemas import TransactionStatusEnum
+
+NOT_ROLLBACKED = Transaction.status != TransactionStatusEnum.roll_backed
+# Arbitrary first key of the per-user advisory locks serializing updates of
+# the deposit cohorts; the user id is the second.
+DEPOSIT_COHORT_LOCK = 7_230_116
+
+
+class WeeklyTransactionStatsRepository(SQLAlchemyRepository):
+    model: WeeklyTransactionStats = WeeklyTransactionStats
+
+    async def add_transactions(self, rows: List[dict]) -> None:
+        """
+        Add per ``(week_start, currency)`` increments in one multi-row upsert.
+        ``rows`` must not repeat a ``(week_start, currency)`` pair.
+        """
+        query = insert(WeeklyTransactionStats).values(rows)
+        query = query.on_conflict_do_update(
+            index_elements=[
+                WeeklyTransactionStats.week_start,
+                WeeklyTransactionStats.currency,
+            ],
+            set_={
+                column: getattr(WeeklyTransactionStats, column)
+                + getattr(query.excluded, column)
+                for column in (
+                    "transactions_count",
+                    "not_rollbacked_transactions_count",
+                    "not_rollbacked_deposit_amount",
+                    "not_rollbacked_withdraw_amount",
+                )
+            },
+        )
+        await self.session.execute(query)
+
+    async def remove_not_rollbacked(
+        self,
+        week_starts: List[datetime],
+        currency: str,
+        deposit_amount: Decimal,
+        withdraw_amount: Decimal,
+    ) -> None:
+        query = (
+            update(WeeklyTransactionStats)
+            .where(
+                WeeklyTransactionStats.week_start.in_(week_starts),
+                WeeklyTransactionStats.currency == currency,
+            )
+            .values(
+                not_rollbacked_transactions_count=WeeklyTransactionStats.not_rollbacked_transactions_count
+                - 1,
+                not_rollbacked_deposit_amount=WeeklyTransactionStats.not_rollbacked_deposit_amount
+                - deposit_amount,
+                not_rollbacked_withdraw_amount=WeeklyTransactionStats.not_rollbacked_withdraw_amount
+                - withdraw_amount,
+            )
+        )
+        await self.session.execute(query)
+
+    async def get_by_week(self, week_starts: List[datetime]) -> List[dict]:
+        """Per-week totals across currencies for the weeks ``week_starts``."""
+        query = self.by_week_query(week_starts)
+        result = await self.session.execute(query)
+
+        return list(result.mappings())
+
+    def by_week_query(self, week_starts: List[datetime]) -> Select:
+        return (
+            select(
+                WeeklyTransactionStats.week_start.label("start_date"),
+                func.sum(WeeklyTransactionStats.not_rollbacked_deposit_amount).label(
+                    "not_rollbacked_deposit_amount"
+                ),
+                func.sum(WeeklyTransactionStats.not_rollbacked_withdraw_amount).label(
+                    "not_rollbacked_withdraw_amount"
+                ),
+                func.sum(WeeklyTransactionStats.transactions_count).label(
+                    "transactions_count"
+                ),
+                func.sum(
+                    WeeklyTransactionStats.not_rollbacked_transactions_count
+                ).label("not_rollbacked_transactions_count"),
+            )
+            .where(WeeklyTransactionStats.week_start.in_(week_starts))
+            .group_by(WeeklyTransactionStats.week_start)
+        )
+
+    def by_currency_query(self, start: datetime, end: datetime) -> Select:
+        return select(
+            WeeklyTransactionStats.week_start.label("start_date"),
+            WeeklyTransactionStats.currency,
+            WeeklyTransactionStats.not_rollbacked_deposit_amount,
+            WeeklyTransactionStats.not_rollbacked_withdraw_amount,
+            WeeklyTransactionStats.transactions_count,
+            WeeklyTransactionStats.not_rollbacked_transactions_count,
+        ).where(
+            WeeklyTransactionStats.week_start >= start,
+            WeeklyTransactionStats.week_start < end,
+        )
+
+    async def lock(self) -> None:
+        """Block concurrent rollup writers until the current transaction ends."""
+        await self.session.execute(
+            text(f"LOCK TABLE {WeeklyTransactionStats.__tablename__} IN EXCLUSIVE MODE")
+        )
+
+    async def replace_range(self, start: datetime, end: datetime, rows: Select) -> None:
+        """
+        Replace rollup rows for weeks in ``[start, end)`` with ``rows``, a
+        select producing ``(start_date, currency, <metrics>)`` per week.
+        """
+        await self.session.execute(
+            delete(WeeklyTransactionStats).where(
+                WeeklyTransactionStats.week_start >= start,
+                WeeklyTransactionStats.week_start < end,
+            )
+        )
+        await self.session.execute(
+            insert(WeeklyTransactionStats).from_select(
+                [
+                    "week_start",
+                    "currency",
+                    "not_rollbacked_deposit_amount",
+                    "not_rollbacked_withdraw_amount",
+                    "transactions_count",
+                    "not_rollbacked_transactions_count",
+                ],
+                rows,
+            )
+        )
+
+
+class WeeklyUserStatsRepository(SQLAlchemyRepository):
+    model: WeeklyUserStats = WeeklyUserStats
+
+    def registration_upsert(self, users: CTE) -> Insert:
+        """
+        Upsert counting the users returned by ``users``, which must have a
+        ``created`` column, in the seven weeks containing their registration.
+        Meant to run as a CTE of the statement inserting them.
+        """
+        offsets = func.generate_series(0, 6).table_valued("days").render_derived()
+        week = func.date_trunc("day", users.c.created) - func.make_interval(
+            0, 0, 0, offsets.c.days
+        )
+        # Column defaults are not applied to statements nested in a CTE.
+        query = insert(WeeklyUserStats).from_select(
+            [
+                "week_start",
+                "registered_users_count",
+                "registered_and_deposit_users_count",
+                "registered_and_not_rollbacked_deposit_users_count",
+            ],
+            select(week, func.count(), literal(0), literal(0))
+            .select_from(users.join(offsets, true()))
+            .group_by(week),
+        )
+        return query.on_conflict_do_update(
+            index_elements=[WeeklyUserStats.week_start],
+            set_={
+                "registered_users_count": WeeklyUserStats.registered_users_count
+                + query.excluded.registered_users_count
+            },
+        )
+
+    async def add_deposit(
+        self, week_starts: List[datetime], user_id: int, transaction_ids: List[int]
+    ) -> None:
+        """
+        Count the user in the deposit cohorts of each of ``week_starts`` they
+        registered in, unless they already made a deposit other than
+        ``transaction_ids`` (not rolled back) in that week. Every week must
+        contain one of ``transaction_ids``.
+        """
+        await self.__lock_user(user_id)
+        other_deposit = self.__other_deposits(user_id, transaction_ids)
+        query = (
+            update(WeeklyUserStats)
+            .where(
+                WeeklyUserStats.week_start.in_(week_starts),
+                self.__registered_in_week(user_id),
+            )
+            .values(
+                registered_and_deposit_users_count=WeeklyUserStats.registered_and_deposit_users_count
+                + case((exists(other_deposit), 0), else_=1),
+                registered_and_not_rollbacked_deposit_users_count=WeeklyUserStats.registered_and_not_rollbacked_deposit_users_count
+                + case((exists(other_deposit.where(NOT_ROLLBACKED)), 0), else_=1),
+            )
+        )
+        await self.session.execute(query)
+
+    async def remove_not_rollbacked_deposit(
+        self, week_starts: List[datetime], user_id: int, transaction_id: int
+    ) -> None:
+        await self.__lock_user(user_id)
+        other_deposit = self.__other_deposits(user_id, [transaction_id]).where(
+            NOT_ROLLBACKED
+        )
+        query = (
+            update(WeeklyUserStats)
+            .where(
+                WeeklyUserStats.week_start.in_(week_starts),
+                self.__registered_in_week(user_id),
+                ~exists(other_deposit),
+            )
+            .values(
+                registered_and_not_rollbacked_deposit_users_count=WeeklyUserStats.registered_and_not_rollbacked_deposit_users_count
+                - 1
+            )
+        )
+        await self.session.execute(query)
+
+    async def __lock_user(self, user_id: int) -> None:
+        """
+        Wait for other transactions updating the user's cohorts to end. Two
+        concurrent first deposits would otherwise not see each other and
+        both count the user; once the lock is held, the update's snapshot
+        includes the deposits committed before it.
+        """
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(DEPOSIT_COHORT_LOCK, user_id))
+        )
+
+    def by_week_query(self, start: datetime, end: datetime) -> Select:
+        return select(
+            WeeklyUserStats.week_start.label("start_date"),
+            WeeklyUserStats.registered_users_count,
+            WeeklyUserStats.registered_and_deposit_users_count,
+            WeeklyUserStats.registered_and_not_rollbacked_deposit_users_count,
+        ).where(WeeklyUserStats.week_start >= start, WeeklyUserStats.week_start < end)
+
+    async def lock(self) -> None:
+        """Block concurrent rollup writers until the current transaction ends."""
+        await self.session.execute(
+            text(f"LOCK TABLE {WeeklyUserStats.__tablename__} IN EXCLUSIVE MODE")
+        )
+
+    async def get_by_week(self, week_starts: List[datetime]) -> List[WeeklyUserStats]:
+        query = select(WeeklyUserStats).where(
+            WeeklyUserStats.week_start.in_(week_starts)
+        )
+        result = await self.session.execute(query)
+
+        return list(result.scalars())
+
+    async def replace_range(
+        self, start: datetime, end: datetime, registered: Select, cohort: Select
+    ) -> None:
+        """
+        Replace rollup rows for weeks in ``[start, end)`` from the per-week
+        ``registered`` and deposit ``cohort`` selects.
+        """
+        await self.session.execute(
+            delete(WeeklyUserStats).where(
+                WeeklyUserStats.week_start >= start, WeeklyUserStats.week_start < end
+            )
+        )
+        registered = registered.subquery()
+        cohort = cohort.subquery()
+        rows = select(
+            registered.c.start_date,
+            registered.c.registered_users_count,
+            func.coalesce(cohort.c.registered_and_deposit_users_count, 0),
+            func.coalesce(
+                cohort.c.registered_and_not_rollbacked_deposit_users_count, 0
+            ),
+        ).outerjoin(cohort, cohort.c.start_date == registered.c.start_date)
+        await self.session.execute(
+            insert(WeeklyUserStats).from_select(
+                [
+                    "week_start",
+                    "registered_users_count",
+                    "registered_and_deposit_users_count",
+                    "registered_and_not_rollbacked_deposit_users_count",
+                ],
+                rows,
+            )
+        )
+
+    def __registered_in_week(self, user_id: int):
+        """Whether the user registered in the week of the updated row."""
+        return exists().where(
+            User.id == user_id,
+            User.created >= WeeklyUserStats.week_start,
+            User.created < WeeklyUserStats.week_start + timedelta(weeks=1),
+        )
+
+    def __other_deposits(self, user_id: int, transaction_ids: List[int]):
+        """The user's other deposits in the week of the updated row."""
+        return select(Transaction.id).where(
+            and_(
+                Transaction.user_id == user_id,
+                Transaction.id.not_in(transaction_ids),
+                Transaction.amount > 0,
+                Transaction.created >= WeeklyUserStats.week_start,
+                Transaction.created < WeeklyUserStats.week_start + timedelta(weeks=1),
+            )
+        )
@@ -0,0 +1,59 @@
+from datetime import date, datetime, timezone
+from enum import StrEnum
+from typing import List, Optional
+
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator
+
+from app.src.core.enums import CurrencyEnum
+from app.src.utils.money import JsonAmount
+
+
+class LedgerEntryKindEnum(StrEnum):
+    transaction = "TRANSACTION"
+    rollback = "ROLLBACK"
+    opening = "OPENING"
+
+
+class BalanceAtFilter(BaseModel):
+    at: Optional[datetime] = None
+    currency: Optional[CurrencyEnum] = None
+
+    @field_validator("at")
+    def to_naive_utc(cls, v):
+        # Ledger timestamps are naive UTC; an offset in the query would
+        # otherwise be dropped without converting.
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+
+class StatementFilter(BaseModel):
+    currency: CurrencyEnum
+    start_date: date
+    end_date: date
+
+
+class ResponseBalanceModel(BaseModel):
+    currency: CurrencyEnum
+    amount: JsonAmount
+
+
+class LedgerEntryModel(BaseModel):
+    id: int
+    transaction_id: Optional[int] = None
+    kind: LedgerEntryKindEnum
+    amount: JsonAmount = Field(
+        validation_alias=AliasChoices("decimal_amount", "amount")
+    )
+    created: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResponseStatementModel(BaseModel):
+    currency: CurrencyEnum
+    start_date: date
+    end_date: date
+    opening_balance: JsonAmount
+    closing_balance: JsonAmount
+    entries: List[LedgerEntryModel]
@@ -1,11 +1,19 @@
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 from decimal import Decimal
 from enum import StrEnum
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import (
+    AliasChoices,
+    BaseModel,
+    ConfigDict,
+    Field,
+    field_validator,
+    model_validator,
+)
 
 from app.src.core.enums import CurrencyEnum
+from app.src.utils.money import JsonAmount, to_minor_units
 
 
 class TransactionStatusEnum(StrEnum):
@@ -13,6 +21,23 @@ class TransactionStatusEnum(StrEnum):
     roll_backed = "ROLLBACKED"
 
 
+class AnalyticsGranularityEnum(StrEnum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class CohortActivityEnum(StrEnum):
+    deposit = "deposit"
+    withdraw = "withdraw"
+    any = "any"
+
+
+class ExportFormatEnum(StrEnum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
 class RequestTransactionModel(BaseModel):
     currency: CurrencyEnum
     amount: Decimal
@@ -23,6 +48,24 @@ class RequestTransactionModel(BaseModel):
             raise ValueError("Transaction can not have zero amount")
         return v
 
+    @model_validator(mode="after")
+    def validate_precision(self):
+        to_minor_units(self.amount, self.currency)
+        return self
+
+    @property
+    def minor_amount(self) -> int:
+        return to_minor_units(self.amount, self.currency)
+
+
+TRANSACTION_BATCH_MAX_SIZE = 1000
+
+
+class RequestTransactionBatchModel(BaseModel):
+    transactions: List[RequestTransactionModel] = Field(
+        min_length=1, max_length=TRANSACTION_BATCH_MAX_SIZE
+    )
+
 
 class ResponseTransactionModel(BaseModel):
     pass
@@ -32,8 +75,80 @@ class TransactionModel(BaseModel):
     id: Optional[int]
     user_id: Optional[int] = None
     currency: Optional[CurrencyEnum] = None
-    amount: Optional[float] = None
+    # Read from ``Transaction.decimal_amount``; stored responses carry ``amount``.
+    amount: Optional[JsonAmount] = Field(
+        default=None, validation_alias=AliasChoices("decimal_amount", "amount")
+    )
     status: Optional[TransactionStatusEnum] = None
     created: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TransactionFilter(BaseModel):
+    """
+    Server-side filters for the transaction list. Amount bounds and the
+    ``[created_from, created_to]`` date window are inclusive.
+    """
+
+    user_id: Optional[int] = None
+    currency: Optional[CurrencyEnum] = None
+    status: Optional[TransactionStatusEnum] = None
+    amount_from: Optional[Decimal] = None
+    amount_to: Optional[Decimal] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+
+
+class TransactionPageParams(BaseModel):
+    cursor: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=1000)
+
+
+class TransactionExportParams(BaseModel):
+    format: ExportFormatEnum = ExportFormatEnum.ndjson
+    cursor: Optional[str] = None
+
+
+class ResponseTransactionPageModel(BaseModel):
+    items: List[TransactionModel]
+    next_cursor: Optional[str] = None
+
+
+class CohortFilter(BaseModel):
+    """
+    Users registered in ``[registered_from, registered_to]`` who, when
+    ``activity`` is set, made a matching transaction in
+    ``[active_from, active_to]``. Open activity bounds are unbounded.
+    """
+
+    registered_from: date
+    registered_to: date
+    activity: Optional[CohortActivityEnum] = None
+    active_from: Optional[date] = None
+    active_to: Optional[date] = None
+    currency: Optional[CurrencyEnum] = None
+    exclude_rollbacked: bool = False
+
+
+class ResponseCohortModel(BaseModel):
+    users_count: int
+
+
+class AnalyticsFilter(BaseModel):
+    granularity: AnalyticsGranularityEnum = AnalyticsGranularityEnum.week
+    start_date: date
+    end_date: date
+    currency: Optional[CurrencyEnum] = None
+
+
+class TransactionAnalysisModel(BaseModel):
+    start_date: date
+    end_date: date
+    registered_users_count: int = 0
+    registered_and_deposit_users_count: int = 0
+    registered_and_not_rollbacked_deposit_users_count: int = 0
+    not_rollbacked_deposit_amount: Decimal = Decimal(0)
+    not_rollbacked_withdraw_amount: Decimal = Decimal(0)
+    transactions_count: int = 0
+    not_rollbacked_transactions_count: int = 0
@@ -1,12 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from enum import StrEnum
 from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
+from pydantic import (
+    AliasChoices,
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    field_validator,
+)
 from pydantic.v1 import root_validator
 
 from app.src.core.enums import CurrencyEnum
 from app.src.schemas.auth import TokenInfo
+from app.src.utils.money import JsonAmount
 
 
 class UserStatusEnum(StrEnum):
@@ -14,14 +23,43 @@ class UserStatusEnum(StrEnum):
     BLOCKED = "BLOCKED"
 
 
+class UserSortEnum(StrEnum):
+    id = "id"
+    created = "created"
+
+
+class SortOrderEnum(StrEnum):
+    asc = "asc"
+    desc = "desc"
+
+
 class UserFilter(BaseModel):
+    """
+    Server-side filters for the user list. The ``[created_from, created_to]``
+    date window and the balance bounds are inclusive; balance bounds apply to
+    the user's ``currency`` balance.
+    """
+
     id: Optional[int] = None
     email: Optional[str] = None
     status: Optional[UserStatusEnum] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+    currency: Optional[CurrencyEnum] = None
+    balance_from: Optional[Decimal] = None
+    balance_to: Optional[Decimal] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserPageParams(BaseModel):
+    cursor: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=1000)
+    sort: UserSortEnum = UserSortEnum.id
+    order: SortOrderEnum = SortOrderEnum.asc
+    include_balances: bool = True
+
+
 class RequestUserModel(BaseModel):
     email: Optional[EmailStr]
     first_name: Optional[str]
@@ -49,7 +87,9 @@ class RequestUserUpdateModel(BaseModel):
 
 class ResponseUserBalanceModel(BaseModel):
     currency: Optional[CurrencyEnum] = None
-    amount: Optional[float] = None
+    amount: Optional[JsonAmount] = Field(
+        default=None, validation_alias=AliasChoices("decimal_amount", "amount")
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -65,6 +105,23 @@ class ResponseUserModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ResponseUserPageModel(BaseModel):
+    items: List[ResponseUserModel]
+    next_cursor: Optional[str] = None
+
+
+class UserImportErrorModel(BaseModel):
+    line: int
+    email: Optional[str] = None
+    errors: List[str]
+
+
+class UserImportReportModel(BaseModel):
+    imported: int = 0
+    rejected: int = 0
+    errors: List[UserImportErrorModel] = []
+
+
 class UserModel(BaseModel):
     id: Optional[int]
     email: Optional[str] = None
@@ -79,7 +136,9 @@ class UserBalanceModel(BaseModel):
     id: Optional[int]
     user_id: Optional[int] = None
     currency: Optional[CurrencyEnum] = None
-    amount: Optional[float] = None
+    amount: Optional[JsonAmount] = Field(
+        default=None, validation_alias=AliasChoices("decimal_amount", "amount")
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Protocol, Tuple
+
+from app.src.core.config import config
+from app.src.core.redis import RedisClient
+from app.src.schemas.transaction_schemas import TransactionAnalysisModel
+from app.src.services.analytics.report import report_window
+from app.src.utils.dates import day_start, window_starts
+
+KEY_PREFIX = "transaction_analysis:week"
+VERSION_KEY_PREFIX = "transaction_analysis:version"
+
+WeekRange = Tuple[datetime, datetime]
+
+# Computations shared by concurrent requests, by week range and the versions
+# of its weeks when they were read.
+in_flight: Dict[Tuple[WeekRange, Tuple[int, ...]], asyncio.Task] = {}
+
+
+class AnalysisBackend(Protocol):
+    async def get_weeks(self, start: datetime, end: datetime) -> List[dict]: ...
+
+
+def week_key(week: datetime) -> str:
+    return f"{KEY_PREFIX}:{week:%Y-%m-%d}"
+
+
+def version_key(week: datetime) -> str:
+    return f"{VERSION_KEY_PREFIX}:{week:%Y-%m-%d}"
+
+
+async def invalidate_weeks(redis: RedisClient, created: Iterable[datetime]) -> None:
+    """
+    Drop the cached report rows of the weeks containing any of ``created``
+    and bump their versions, so a computation already running for one does
+    not store its result. Weeks end on any weekday, so every time falls in
+    seven of them.
+    """
+    if not config.analytics.ANALYTICS_CACHE_ENABLED:
+        return
+    weeks = sorted({week for value in created for week in window_starts(value)})
+    async with redis as storage:
+        await storage.delete_versioned(
+            [week_key(week) for week in weeks], [version_key(week) for week in weeks]
+        )
+
+
+class CachedAnalysisService:
+    """
+    Per-week Redis cache in front of an analysis backend.
+
+    Closed weeks are cached without expiry, the current week with a short TTL;
+    both are invalidated by ``invalidate_weeks`` when one of their transactions
+    is created or rolled back. Only missing weeks are recomputed, and
+    concurrent requests missing the same weeks share a single computation.
+
+    Every week has a version, read together with the cached rows and bumped
+    on invalidation. A computed row is only stored if its week's version is
+    unchanged, so a rollback during the computation cannot leave a stale row
+    cached for good. Redis is not held during the computation, which runs in
+    a task of its own on the backend's sessions and outlives the request that
+    started it.
+    """
+
+    def __init__(self, backend: AnalysisBackend, redis: RedisClient):
+        self.__backend = backend
+        self.__redis = redis
+
+    async def get_weekly_report(
+        self, weeks: int = 52, today: date | None = None
+    ) -> List[dict]:
+        start, end = report_window(weeks, today)
+        current_week = end - timedelta(weeks=1)
+        week_starts = [start + timedelta(weeks=i) for i in range(weeks)]
+
+        async with self.__redis as storage:
+            cached = await storage.get_many_json(
+                [week_key(w) for w in week_starts]
+                + [version_key(w) for w in week_starts]
+            )
+        rows = dict(zip(week_starts, cached[:weeks]))
+        versions = dict(zip(week_starts, (version or 0 for version in cached[weeks:])))
+
+        missing = [week for week, row in rows.items() if row is None]
+        if missing:
+            computed = await self.__coalesce(
+                (missing[0], missing[-1] + timedelta(weeks=1)),
+                tuple(versions[week] for week in missing),
+            )
+            async with self.__redis as storage:
+                for week in missing:
+                    row = computed.get(week, {})
+                    rows[week] = row
+                    await storage.set_json_if_version(
+                        week_key(week),
+                        row,
+                        version_key(week),
+                        versions[week],
+                        expire=config.analytics.ANALYTICS_CURRENT_WEEK_TTL,
+                        persist=week < current_week,
+                    )
+
+        return [
+            TransactionAnalysisModel.model_validate(rows[week]).model_dump()
+            for week in reversed(week_starts)
+            if rows[week]
+        ]
+
+    async def __coalesce(
+        self, week_range: WeekRange, versions: Tuple[int, ...]
+    ) -> Dict[datetime, dict]:
+        """
+        Compute ``week_range`` once, however many requests wait for it. A
+        request that read newer versions starts a computation of its own.
+        """
+        key = (week_range, versions)
+        task = in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.__compute(week_range))
+            in_flight[key] = task
+            task.add_done_callback(lambda _: in_flight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def __compute(self, week_range: WeekRange) -> Dict[datetime, dict]:
+        rows = await self.__backend.get_weeks(*week_range)
+        return {
+            day_start(row["start_date"]): TransactionAnalysisModel.model_validate(
+                row
+            ).model_dump(mode="json")
+            for row in rows
+        }
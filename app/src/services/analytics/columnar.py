@@ -0,0 +1,396 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.src.core.config import config
+from app.src.exceptions.transaction_exceptions import (
+    AnalyticsSnapshotNotReadyException,
+)
+from app.src.repositories.ledger import LedgerEntryRepository
+from app.src.repositories.transaction import TransactionRepository
+from app.src.repositories.transaction_archive import (
+    ROW_SCHEMA,
+    TransactionArchiveRepository,
+    read_archive_table,
+)
+from app.src.repositories.user import UserRepository
+from app.src.schemas.transaction_schemas import TransactionStatusEnum
+from app.src.services.analytics.report import ANALYSIS_FIELDS, report_window
+from app.src.services.exchange_rates import HISTORY_START, exchange_rate_store
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("currency", pa.string()),
+        ("amount", pa.int64()),
+        ("created", pa.timestamp("us")),
+        ("rolled_back", pa.bool_()),
+    ]
+)
+USER_SCHEMA = pa.schema([("id", pa.int64()), ("created", pa.timestamp("us"))])
+# Refreshes append small chunks; past this many they are merged into one.
+MAX_CHUNKS = 64
+WEEK_US = 7 * 24 * 3600 * 1_000_000
+
+Rates = List[Tuple[str, Decimal, datetime, datetime]]
+
+
+def to_snapshot_rows(table: pa.Table) -> pa.Table:
+    """``ROW_SCHEMA`` rows as ``TRANSACTION_SCHEMA`` rows."""
+    rolled_back = pc.equal(table["status"], TransactionStatusEnum.roll_backed.value)
+    return pa.Table.from_arrays(
+        [
+            table["id"],
+            table["user_id"],
+            table["currency"],
+            table["amount"],
+            table["created"],
+            pc.fill_null(rolled_back, False),
+        ],
+        schema=TRANSACTION_SCHEMA,
+    )
+
+
+def append_rows(table: pa.Table, chunks: List[pa.Table]) -> pa.Table:
+    table = pa.concat_tables([table, *chunks])
+    if table.column(0).num_chunks > MAX_CHUNKS:
+        table = table.combine_chunks()
+    return table
+
+
+def with_week(table: pa.Table, start: datetime, end: datetime) -> pa.Table:
+    """
+    Rows created in ``[start, end)`` with the start of their week, weeks
+    being counted from ``start`` as in ``period_of``.
+    """
+    table = table.filter((pc.field("created") >= start) & (pc.field("created") < end))
+    origin = pa.scalar(start, pa.timestamp("us"))
+    offset = pc.cast(pc.subtract(table["created"], origin), pa.int64())
+    week_offset = pc.multiply(pc.divide(offset, WEEK_US), WEEK_US)
+    week = pc.add(origin, pc.cast(week_offset, pa.duration("us")))
+    return table.append_column("week", week)
+
+
+def weekly_metrics(
+    users: pa.Table,
+    transactions: pa.Table,
+    rates: Rates,
+    start: datetime,
+    end: datetime,
+) -> Dict[datetime, dict]:
+    """
+    ``ANALYSIS_FIELDS`` per active week in ``[start, end)``, computed with
+    Arrow group-bys and a hash join instead of per-row Python loops.
+
+    As in ``transactions_by_period``, minor units are summed as integers per
+    week, currency and rate period and only those sums are converted to USD.
+    """
+    users = with_week(users, start, end)
+    transactions = with_week(transactions, start, end)
+    transactions = transactions.append_column(
+        "not_rollbacked", pc.invert(transactions["rolled_back"])
+    )
+    weeks = defaultdict(lambda: dict.fromkeys(ANALYSIS_FIELDS, 0))
+    zero = pa.scalar(0, pa.int64())
+
+    registered = users.group_by("week").aggregate([("id", "count")])
+    for row in registered.to_pylist():
+        weeks[row["week"]]["registered_users_count"] = row["id_count"]
+
+    counts = transactions.group_by("week").aggregate(
+        [("id", "count"), ("not_rollbacked", "sum")]
+    )
+    for row in counts.to_pylist():
+        week = weeks[row["week"]]
+        week["transactions_count"] = row["id_count"]
+        week["not_rollbacked_transactions_count"] = row["not_rollbacked_sum"]
+
+    # Deposits made by their user in the week the user registered.
+    cohort = transactions.filter(pc.field("amount") > zero).join(
+        users.select(["id", "week"]).rename_columns(["user_id", "week"]),
+        keys=["user_id", "week"],
+        join_type="inner",
+    )
+    for field, rows in (
+        ("registered_and_deposit_users_count", cohort),
+        (
+            "registered_and_not_rollbacked_deposit_users_count",
+            cohort.filter(pc.field("not_rollbacked")),
+        ),
+    ):
+        depositors = rows.group_by("week").aggregate([("user_id", "count_distinct")])
+        for row in depositors.to_pylist():
+            weeks[row["week"]][field] = row["user_id_count_distinct"]
+
+    active = transactions.filter(pc.field("not_rollbacked"))
+    active = active.append_column(
+        "deposit",
+        pc.if_else(pc.greater(active["amount"], zero), active["amount"], zero),
+    ).append_column(
+        "withdraw", pc.if_else(pc.less(active["amount"], zero), active["amount"], zero)
+    )
+    rates_by_currency = defaultdict(list)
+    for currency, rate, valid_from, valid_to in rates:
+        rates_by_currency[currency].append((rate, valid_from, valid_to))
+    for currency, currency_rates in rates_by_currency.items():
+        in_currency = active.filter(pc.field("currency") == currency)
+        for rate, valid_from, valid_to in currency_rates:
+            if not in_currency.num_rows:
+                break
+            in_rate = in_currency.filter(
+                (pc.field("created") >= valid_from) & (pc.field("created") < valid_to)
+            )
+            sums = in_rate.group_by("week").aggregate(
+                [("deposit", "sum"), ("withdraw", "sum")]
+            )
+            for row in sums.to_pylist():
+                week = weeks[row["week"]]
+                week["not_rollbacked_deposit_amount"] += row["deposit_sum"] * rate
+                week["not_rollbacked_withdraw_amount"] += row["withdraw_sum"] * rate
+    return weeks
+
+
+def weekly_report_rows(
+    users: pa.Table,
+    transactions: pa.Table,
+    rates: Rates,
+    start: datetime,
+    end: datetime,
+) -> List[dict]:
+    """Report rows for active weeks in ``[start, end)``, newest first."""
+    weeks = weekly_metrics(users, transactions, rates, start, end)
+    return [
+        {
+            "start_date": week.date(),
+            "end_date": (week + timedelta(days=6)).date(),
+            **weeks[week],
+        }
+        for week in sorted(weeks, reverse=True)
+    ]
+
+
+class AnalyticsSnapshot:
+    """
+    Columnar in-memory copy of ``user`` and ``transaction`` for reporting.
+
+    The first refresh loads the archive files and every hot row from one
+    ``REPEATABLE READ`` snapshot. Later refreshes append the rows created
+    since, up to ``ANALYTICS_SNAPSHOT_LAG`` seconds ago: ids are taken before
+    their transaction commits, so a watermark on ``created`` with a lag does
+    not skip rows the way a maximum id would. Rollbacks are applied from the
+    ledger's rollback entries. Tables are replaced rather than modified, so
+    readers never see a refresh half applied.
+    """
+
+    def __init__(self):
+        self.__users: pa.Table = USER_SCHEMA.empty_table()
+        self.__transactions: pa.Table = TRANSACTION_SCHEMA.empty_table()
+        self.__loaded_until: datetime | None = None
+        self.__rollback_mark = 0
+        self.__ready = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+
+    async def get_tables(self) -> Tuple[pa.Table, pa.Table]:
+        """
+        ``(users, transactions)``, waiting for the first load if needed.
+
+        :raises AnalyticsSnapshotNotReadyException: If the first load does not
+            finish within ``ANALYTICS_SNAPSHOT_READY_TIMEOUT`` seconds.
+        """
+        try:
+            await asyncio.wait_for(
+                self.__ready.wait(), config.analytics.ANALYTICS_SNAPSHOT_READY_TIMEOUT
+            )
+        except TimeoutError as exc:
+            raise AnalyticsSnapshotNotReadyException from exc
+        return self.__users, self.__transactions
+
+    async def refresh(self, session: AsyncSession) -> None:
+        until = datetime.utcnow() - timedelta(
+            seconds=config.analytics.ANALYTICS_SNAPSHOT_LAG
+        )
+        if self.__loaded_until is None:
+            await self.__load(session, until)
+            self.__ready.set()
+        elif until > self.__loaded_until:
+            await self.__append(session, self.__loaded_until, until)
+        else:
+            return
+        self.__loaded_until = until
+
+    async def __load(self, session: AsyncSession, until: datetime) -> None:
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        ledger_entry_repository = LedgerEntryRepository(session)
+        rollback_mark = await ledger_entry_repository.get_last_id(until)
+
+        archive_repository = TransactionArchiveRepository(session)
+        chunks = []
+        for archive in await archive_repository.get_files():
+            table = await asyncio.to_thread(read_archive_table, archive.path)
+            chunks.append(to_snapshot_rows(table))
+        archived_until = await archive_repository.get_archived_until()
+        chunks.extend(
+            await self.__read_transactions(
+                session, archived_until or HISTORY_START, until
+            )
+        )
+        users = await self.__read_users(session, None, until)
+
+        self.__transactions = append_rows(TRANSACTION_SCHEMA.empty_table(), chunks)
+        self.__transactions = self.__transactions.combine_chunks()
+        self.__users = append_rows(USER_SCHEMA.empty_table(), users).combine_chunks()
+        self.__rollback_mark = rollback_mark
+
+    async def __append(self, session: AsyncSession, start: datetime, until: datetime):
+        ledger_entry_repository = LedgerEntryRepository(session)
+        rollback_mark = await ledger_entry_repository.get_last_id(until)
+        rollbacks = await ledger_entry_repository.get_rollbacks(self.__rollback_mark)
+        chunks = await self.__read_transactions(session, start, until)
+        users = await self.__read_users(session, start, until)
+
+        transactions = self.__transactions
+        if rollbacks:
+            rolled_back_ids = pa.array([id for _, id in rollbacks], pa.int64())
+            rolled_back = pc.or_(
+                transactions["rolled_back"],
+                pc.is_in(transactions["id"], value_set=rolled_back_ids),
+            )
+            transactions = transactions.set_column(
+                transactions.schema.get_field_index("rolled_back"),
+                "rolled_back",
+                rolled_back,
+            )
+        self.__transactions = append_rows(transactions, chunks)
+        self.__users = append_rows(self.__users, users)
+        # Entries above the mark may still be in flight, so they are read
+        # again next time; marking a rollback twice is harmless.
+        self.__rollback_mark = max(self.__rollback_mark, rollback_mark)
+
+    async def __read_transactions(
+        self, session: AsyncSession, start: datetime, until: datetime
+    ) -> List[pa.Table]:
+        chunks = []
+        async for rows in TransactionRepository(session).iter_range(
+            start, until, config.analytics.ANALYTICS_SNAPSHOT_CHUNK_SIZE
+        ):
+            chunks.append(to_snapshot_rows(pa.Table.from_pylist(rows, ROW_SCHEMA)))
+        return chunks
+
+    async def __read_users(
+        self, session: AsyncSession, start: datetime | None, until: datetime
+    ) -> List[pa.Table]:
+        chunks = []
+        async for rows in UserRepository(session).iter_created_range(
+            start, until, config.analytics.ANALYTICS_SNAPSHOT_CHUNK_SIZE
+        ):
+            chunks.append(pa.Table.from_pylist(rows, USER_SCHEMA))
+        return chunks
+
+    def start(self, session_maker: async_sessionmaker, interval: int) -> None:
+        """Load, then refresh every ``interval`` seconds in a background task."""
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run(session_maker, interval))
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+
+    async def __run(self, session_maker: async_sessionmaker, interval: int) -> None:
+        while True:
+            try:
+                async with session_maker() as session:
+                    await self.refresh(session)
+            except Exception:
+                # Any failure, the first load's included, is retried on the
+                # next tick rather than ending the task for good.
+                logger.exception("Analytics snapshot refresh failed, keeping old one")
+            await asyncio.sleep(interval)
+
+
+class ShardedAnalyticsSnapshot:
+    """
+    One ``AnalyticsSnapshot`` per shard, read as the union of their tables.
+    A user lives on one shard together with all their transactions, so the
+    union holds what a single database would.
+    """
+
+    def __init__(self):
+        self.__snapshots: List[AnalyticsSnapshot] = []
+
+    async def get_tables(self) -> Tuple[pa.Table, pa.Table]:
+        """
+        :raises AnalyticsSnapshotNotReadyException: If not started, or a
+            shard's first load does not finish in time.
+        """
+        if not self.__snapshots:
+            raise AnalyticsSnapshotNotReadyException
+        tables = await asyncio.gather(
+            *(snapshot.get_tables() for snapshot in self.__snapshots)
+        )
+        if len(tables) == 1:
+            return tables[0]
+        return (
+            pa.concat_tables(users for users, _ in tables),
+            pa.concat_tables(transactions for _, transactions in tables),
+        )
+
+    def start(self, session_makers: List[async_sessionmaker], interval: int) -> None:
+        """Start a snapshot of every shard, one session maker each."""
+        if not self.__snapshots:
+            self.__snapshots = [AnalyticsSnapshot() for _ in session_makers]
+            for snapshot, session_maker in zip(self.__snapshots, session_makers):
+                snapshot.start(session_maker, interval)
+
+    async def stop(self) -> None:
+        for snapshot in self.__snapshots:
+            await snapshot.stop()
+        self.__snapshots = []
+
+
+analytics_snapshot = ShardedAnalyticsSnapshot()
+
+
+class ColumnarAnalysisService:
+    """
+    Weekly transaction report computed from ``analytics_snapshot``. Requests
+    never query Postgres; the report lags it by up to the refresh interval
+    plus ``ANALYTICS_SNAPSHOT_LAG``.
+    """
+
+    def __init__(self, snapshot: ShardedAnalyticsSnapshot = analytics_snapshot):
+        self.__snapshot = snapshot
+
+    async def get_weekly_report(
+        self, weeks: int = 52, today: date | None = None
+    ) -> List[dict]:
+        start, end = report_window(weeks, today)
+        return await self.get_weeks(start, end)
+
+    async def get_weeks(self, start: datetime, end: datetime) -> List[dict]:
+        """Report rows for active weeks in ``[start, end)``, newest first."""
+        users, transactions = await self.__snapshot.get_tables()
+        return await asyncio.to_thread(
+            weekly_report_rows,
+            users,
+            transactions,
+            exchange_rate_store.minor_unit_ranges(),
+            start,
+            end,
+        )
@@ -0,0 +1,282 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Protocol
+
+from sqlalchemy import (
+    BigInteger,
+    Interval,
+    Select,
+    cast,
+    distinct,
+    func,
+    literal,
+    or_,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.models.transaction import Transaction
+from app.src.models.user import User
+from app.src.services.transaction import (
+    IS_DEPOSIT,
+    IS_WITHDRAW,
+    NOT_ROLLBACKED,
+    exchange_rates_to_usd,
+    rate_join_clause,
+)
+from app.src.utils.dates import day_start, next_period, period_start
+
+ANALYSIS_FIELDS = (
+    "registered_users_count",
+    "registered_and_deposit_users_count",
+    "registered_and_not_rollbacked_deposit_users_count",
+    "not_rollbacked_deposit_amount",
+    "not_rollbacked_withdraw_amount",
+    "transactions_count",
+    "not_rollbacked_transactions_count",
+)
+
+
+class AnalysisService(Protocol):
+    async def get_weekly_report(
+        self, weeks: int = 52, today: date | None = None
+    ) -> List[dict]: ...
+
+
+def report_window(weeks: int, today: date | None = None) -> tuple[datetime, datetime]:
+    """
+    Half-open ``[first_week, end)`` range covering the last ``weeks``
+    seven-day windows, the last one ending with ``today``.
+    """
+    end = day_start(today or datetime.utcnow().date()) + timedelta(days=1)
+    return end - timedelta(weeks=weeks), end
+
+
+def period_interval(granularity: str):
+    return cast(literal(f"1 {granularity}"), Interval)
+
+
+def period_of(column, start: datetime, granularity: str = "week"):
+    """
+    Start of the period containing ``column``. Days and weeks are counted
+    from ``start``, so weeks need not begin on a Monday; months are calendar
+    months.
+    """
+    if granularity == "month":
+        return func.date_trunc("month", column)
+    return func.date_bin(period_interval(granularity), column, start)
+
+
+def period_bounds(
+    start: datetime, end: datetime, granularity: str
+) -> tuple[datetime, datetime]:
+    """
+    Constant range covering every period that starts in ``[start, end)``,
+    letting Postgres prune ``transaction`` partitions.
+    """
+    if granularity == "month":
+        start = period_start(start, granularity)
+        end = period_start(end, granularity)
+    return start, next_period(end, granularity)
+
+
+def registered_users_by_period(
+    start: datetime, end: datetime, granularity: str = "week"
+) -> Select:
+    user_period = period_of(User.created, start, granularity)
+    return (
+        select(
+            user_period.label("start_date"),
+            func.count().label("registered_users_count"),
+        )
+        .where(User.created >= start, User.created < end)
+        .group_by(user_period)
+    )
+
+
+def deposit_cohort_by_period(
+    start: datetime,
+    end: datetime,
+    granularity: str = "week",
+    currency: Optional[str] = None,
+) -> Select:
+    """
+    Users registered in a period who made a deposit during the same period.
+
+    The per-user transaction window depends on the row, so it is also
+    bounded by ``period_bounds``.
+    """
+    user_period = period_of(User.created, start, granularity)
+    first_created, last_created = period_bounds(start, end, granularity)
+    query = (
+        select(
+            user_period.label("start_date"),
+            func.count(distinct(User.id)).label("registered_and_deposit_users_count"),
+            func.count(distinct(User.id))
+            .filter(NOT_ROLLBACKED)
+            .label("registered_and_not_rollbacked_deposit_users_count"),
+        )
+        .join(Transaction, Transaction.user_id == User.id)
+        .where(
+            User.created >= start,
+            User.created < end,
+            IS_DEPOSIT,
+            Transaction.created >= user_period,
+            Transaction.created < user_period + period_interval(granularity),
+            Transaction.created >= first_created,
+            Transaction.created < last_created,
+        )
+        .group_by(user_period)
+    )
+    if currency:
+        query = query.where(Transaction.currency == currency)
+    return query
+
+
+def transactions_by_period(
+    start: datetime,
+    end: datetime,
+    granularity: str = "week",
+    by_currency: bool = False,
+    currency: Optional[str] = None,
+) -> Select:
+    """
+    Transaction metrics per period (and currency when ``by_currency``).
+
+    Native amounts are summed per period, currency and rate period first and
+    only those partial sums are converted to USD at the rate effective when
+    the transactions were created, so rates are applied once per group.
+    """
+    rates = exchange_rates_to_usd()
+    transaction_period = period_of(Transaction.created, start, granularity)
+    per_rate = (
+        select(
+            transaction_period.label("start_date"),
+            Transaction.currency,
+            rates.c.rate,
+            func.sum(Transaction.amount)
+            .filter(IS_DEPOSIT & NOT_ROLLBACKED)
+            .label("deposit_amount"),
+            func.sum(Transaction.amount)
+            .filter(IS_WITHDRAW & NOT_ROLLBACKED)
+            .label("withdraw_amount"),
+            func.count().label("transactions_count"),
+            func.count()
+            .filter(NOT_ROLLBACKED)
+            .label("not_rollbacked_transactions_count"),
+        )
+        .outerjoin(rates, rate_join_clause(rates))
+        .where(Transaction.created >= start, Transaction.created < end)
+        .group_by(
+            transaction_period, Transaction.currency, rates.c.valid_from, rates.c.rate
+        )
+    )
+    if currency:
+        per_rate = per_rate.where(Transaction.currency == currency)
+    per_rate = per_rate.subquery()
+
+    group_by = [per_rate.c.start_date]
+    if by_currency:
+        group_by.append(per_rate.c.currency)
+
+    return select(
+        *group_by,
+        func.coalesce(func.sum(per_rate.c.deposit_amount * per_rate.c.rate), 0).label(
+            "not_rollbacked_deposit_amount"
+        ),
+        func.coalesce(func.sum(per_rate.c.withdraw_amount * per_rate.c.rate), 0).label(
+            "not_rollbacked_withdraw_amount"
+        ),
+        cast(func.sum(per_rate.c.transactions_count), BigInteger).label(
+            "transactions_count"
+        ),
+        cast(func.sum(per_rate.c.not_rollbacked_transactions_count), BigInteger).label(
+            "not_rollbacked_transactions_count"
+        ),
+    ).group_by(*group_by)
+
+
+def report_query(
+    start: datetime,
+    end: datetime,
+    granularity: str = "week",
+    currency: Optional[str] = None,
+    only_active: bool = False,
+) -> Select:
+    """
+    One row per ``granularity`` bucket in ``[start, end)`` with all seven
+    metrics, oldest first.
+
+    ``generate_series`` produces the bucket spine from ``start`` on; users and
+    transactions are bucketed with ``period_of`` and joined back to it, so
+    the number of round trips does not depend on the number of buckets,
+    users or transactions.
+    """
+    buckets = select(
+        func.generate_series(
+            start, end - period_interval(granularity), period_interval(granularity)
+        ).label("start_date")
+    ).cte("buckets")
+    registered = registered_users_by_period(start, end, granularity).cte("registered")
+    cohort = deposit_cohort_by_period(start, end, granularity, currency).cte("cohort")
+    transactions = transactions_by_period(
+        start, end, granularity, currency=currency
+    ).cte("transactions")
+
+    query = (
+        select(
+            buckets.c.start_date,
+            *(
+                func.coalesce(cte.c[field], literal(0)).label(field)
+                for cte in (registered, cohort, transactions)
+                for field in ANALYSIS_FIELDS
+                if field in cte.c
+            ),
+        )
+        .outerjoin(registered, registered.c.start_date == buckets.c.start_date)
+        .outerjoin(cohort, cohort.c.start_date == buckets.c.start_date)
+        .outerjoin(transactions, transactions.c.start_date == buckets.c.start_date)
+        .order_by(buckets.c.start_date)
+    )
+    if only_active:
+        query = query.where(
+            or_(
+                registered.c.start_date.is_not(None),
+                transactions.c.start_date.is_not(None),
+            )
+        )
+    return query
+
+
+def to_report_row(row, granularity: str = "week") -> dict:
+    start_date = row["start_date"]
+    result = {
+        "start_date": start_date.date(),
+        "end_date": (next_period(start_date, granularity) - timedelta(days=1)).date(),
+    }
+    result.update({field: row[field] for field in ANALYSIS_FIELDS})
+    return result
+
+
+class TransactionAnalysisService:
+    """Weekly transaction report computed by a single grouped query."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_weekly_report(
+        self, weeks: int = 52, today: date | None = None
+    ) -> List[dict]:
+        """
+        Build the report for the last ``weeks`` seven-day windows, the last
+        one ending today, newest first. Weeks without any activity are
+        omitted.
+        """
+        start, end = report_window(weeks, today)
+        return await self.get_weeks(start, end)
+
+    async def get_weeks(self, start: datetime, end: datetime) -> List[dict]:
+        """Report rows for active weeks in ``[start, end)``, newest first."""
+        query = report_query(start, end, only_active=True)
+        rows = (await self.session.execute(query)).mappings()
+
+        return [to_report_row(row) for row in reversed(list(rows))]
@@ -0,0 +1,292 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List
+
+from sqlalchemy import CompoundSelect, Select, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.models.transaction import Transaction
+from app.src.models.user import User
+from app.src.repositories.transaction_archive import TransactionArchiveRepository
+from app.src.repositories.weekly_stats import (
+    WeeklyTransactionStatsRepository,
+    WeeklyUserStatsRepository,
+)
+from app.src.services.analytics.report import (
+    ANALYSIS_FIELDS,
+    deposit_cohort_by_period,
+    registered_users_by_period,
+    report_window,
+    transactions_by_period,
+)
+from app.src.services.transaction import convert_to_usd
+from app.src.utils.dates import day_start, window_starts
+
+TRANSACTION_FIELDS = (
+    "not_rollbacked_deposit_amount",
+    "not_rollbacked_withdraw_amount",
+    "transactions_count",
+    "not_rollbacked_transactions_count",
+)
+USER_FIELDS = (
+    "registered_users_count",
+    "registered_and_deposit_users_count",
+    "registered_and_not_rollbacked_deposit_users_count",
+)
+
+
+def week_starts(start: datetime, end: datetime) -> List[datetime]:
+    """Starts of the consecutive weeks from ``start`` on, up to ``end``."""
+    return [
+        start + timedelta(weeks=week)
+        for week in range(-(-(end - start) // timedelta(weeks=1)))
+    ]
+
+
+def transactions_by_currency(start: datetime, end: datetime) -> Select:
+    return transactions_by_period(start, end, by_currency=True)
+
+
+def every_week(
+    start: datetime, end: datetime, query: Callable[[datetime, datetime], Select]
+) -> CompoundSelect:
+    """
+    ``query``'s rows for the weeks starting on each day of ``[start, end)``,
+    one ``query`` per weekday they start on.
+    """
+    queries = []
+    for offset in range(7):
+        first = start + timedelta(days=offset)
+        weeks = week_starts(first, end)
+        if weeks:
+            queries.append(query(first, weeks[-1] + timedelta(weeks=1)))
+    return union_all(*queries)
+
+
+class WeeklyRollupService:
+    """
+    Maintains and reads the ``weekly_transaction_stats``/``weekly_user_stats``
+    rollup.
+
+    Writers call the ``record_*`` methods before committing their own
+    transaction, so the rollup always changes atomically with the rows it
+    summarizes. Past weeks never change afterwards, which lets the report be
+    served from at most one row per week.
+
+    The report's weeks end on whichever weekday today is, so there is a row
+    for the week starting on every day and each user or transaction is
+    counted in the seven rows of the weeks containing it.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.__transaction_stats_repository = WeeklyTransactionStatsRepository(
+            session=self.session
+        )
+        self.__user_stats_repository = WeeklyUserStatsRepository(session=self.session)
+        self.__archive_repository = TransactionArchiveRepository(session=self.session)
+
+    async def record_transaction_created(self, transaction: Transaction) -> None:
+        await self.record_transactions_created([transaction])
+
+    async def record_transactions_created(
+        self, transactions: List[Transaction]
+    ) -> None:
+        """
+        Record newly created transactions with one upsert per batch and one
+        cohort update per user.
+        """
+        stats = {}
+        deposit_weeks = defaultdict(set)
+        deposit_ids = defaultdict(list)
+        for transaction in transactions:
+            deposit_amount, withdraw_amount = self.__usd_amounts(transaction)
+            for week in window_starts(transaction.created):
+                row = stats.setdefault(
+                    (week, transaction.currency),
+                    {
+                        "week_start": week,
+                        "currency": transaction.currency,
+                        "transactions_count": 0,
+                        "not_rollbacked_transactions_count": 0,
+                        "not_rollbacked_deposit_amount": Decimal(0),
+                        "not_rollbacked_withdraw_amount": Decimal(0),
+                    },
+                )
+                row["transactions_count"] += 1
+                row["not_rollbacked_transactions_count"] += 1
+                row["not_rollbacked_deposit_amount"] += deposit_amount
+                row["not_rollbacked_withdraw_amount"] += withdraw_amount
+            if transaction.amount > 0:
+                deposit_weeks[transaction.user_id].update(
+                    window_starts(transaction.created)
+                )
+                deposit_ids[transaction.user_id].append(transaction.id)
+
+        if stats:
+            await self.__transaction_stats_repository.add_transactions(
+                list(stats.values())
+            )
+        # In user order, so batches of several users lock them consistently.
+        for user_id in sorted(deposit_ids):
+            await self.__user_stats_repository.add_deposit(
+                sorted(deposit_weeks[user_id]), user_id, deposit_ids[user_id]
+            )
+
+    async def record_transaction_rollbacked(self, transaction: Transaction) -> None:
+        weeks = window_starts(transaction.created)
+        deposit_amount, withdraw_amount = self.__usd_amounts(transaction)
+
+        await self.__transaction_stats_repository.remove_not_rollbacked(
+            weeks, transaction.currency, deposit_amount, withdraw_amount
+        )
+        if transaction.amount > 0:
+            await self.__user_stats_repository.remove_not_rollbacked_deposit(
+                weeks, transaction.user_id, transaction.id
+            )
+
+    async def get_weekly_report(
+        self, weeks: int = 52, today: date | None = None
+    ) -> List[dict]:
+        """Same report as ``TransactionAnalysisService`` read from the rollup."""
+        start, end = report_window(weeks, today)
+        return await self.get_weeks(start, end)
+
+    async def get_weeks(self, start: datetime, end: datetime) -> List[dict]:
+        """
+        Report rows for active weeks in ``[start, end)``, newest first, the
+        first week starting at ``start``.
+        """
+        weeks = week_starts(start, end)
+        user_stats = {
+            row.week_start: row
+            for row in await self.__user_stats_repository.get_by_week(weeks)
+        }
+        transaction_stats = {
+            row["start_date"]: row
+            for row in await self.__transaction_stats_repository.get_by_week(weeks)
+        }
+
+        results = []
+        for week in sorted(user_stats.keys() | transaction_stats.keys(), reverse=True):
+            users = user_stats.get(week)
+            transactions = transaction_stats.get(week) or {}
+            result = {
+                "start_date": week.date(),
+                "end_date": week.date() + timedelta(days=6),
+            }
+            result.update({field: getattr(users, field, 0) for field in USER_FIELDS})
+            result.update(
+                {field: transactions.get(field, 0) for field in TRANSACTION_FIELDS}
+            )
+            if any(result[field] > 0 for field in ANALYSIS_FIELDS):
+                results.append(result)
+        return results
+
+    async def history_start(self) -> datetime:
+        """
+        Start of the first week that can be recomputed from the raw tables:
+        the first one containing a user or a transaction, and not
+        overlapping transactions already moved to the archive.
+        """
+        first_created = await self.session.scalar(
+            select(
+                func.least(
+                    select(func.min(User.created)).scalar_subquery(),
+                    select(func.min(Transaction.created)).scalar_subquery(),
+                )
+            )
+        )
+        start = window_starts(first_created or datetime.utcnow())[-1]
+
+        archived_until = await self.__archive_repository.get_archived_until()
+        if archived_until:
+            first_day = day_start(archived_until)
+            if first_day < archived_until:
+                first_day += timedelta(days=1)
+            start = max(start, first_day)
+        return start
+
+    async def rebuild(self, start: datetime, end: datetime) -> None:
+        """
+        Recompute rollup rows for weeks starting in ``[start, end)`` from the
+        raw tables. Concurrent writers wait on the rollup tables until the
+        caller commits, so no increment is lost or counted twice.
+        """
+        await self.__transaction_stats_repository.lock()
+        await self.__user_stats_repository.lock()
+
+        await self.__transaction_stats_repository.replace_range(
+            start, end, every_week(start, end, transactions_by_currency)
+        )
+        await self.__user_stats_repository.replace_range(
+            start,
+            end,
+            every_week(start, end, registered_users_by_period),
+            every_week(start, end, deposit_cohort_by_period),
+        )
+
+    async def check(self, start: datetime, end: datetime) -> List[dict]:
+        """
+        Compare rollup rows for weeks starting in ``[start, end)`` with the
+        raw tables and return one entry per differing metric.
+        """
+        mismatches = []
+
+        expected = await self.__fetch(
+            every_week(start, end, transactions_by_currency), "currency"
+        )
+        actual = await self.__fetch(
+            self.__transaction_stats_repository.by_currency_query(start, end),
+            "currency",
+        )
+        mismatches.extend(self.__compare(expected, actual, TRANSACTION_FIELDS))
+
+        registered = await self.__fetch(
+            every_week(start, end, registered_users_by_period)
+        )
+        cohort = await self.__fetch(every_week(start, end, deposit_cohort_by_period))
+        expected = {
+            key: {**row, **cohort.get(key, {})} for key, row in registered.items()
+        }
+        actual = await self.__fetch(
+            self.__user_stats_repository.by_week_query(start, end)
+        )
+        mismatches.extend(self.__compare(expected, actual, USER_FIELDS))
+
+        return mismatches
+
+    async def __fetch(self, query, *key_fields: str) -> dict:
+        result = await self.session.execute(query)
+        return {
+            (row["start_date"], *(row[field] for field in key_fields)): dict(row)
+            for row in result.mappings()
+        }
+
+    def __compare(self, expected: dict, actual: dict, fields: tuple) -> List[dict]:
+        mismatches = []
+        for key in sorted(expected.keys() | actual.keys(), key=str):
+            for field in fields:
+                expected_value = expected.get(key, {}).get(field) or 0
+                actual_value = actual.get(key, {}).get(field) or 0
+                if expected_value != actual_value:
+                    mismatches.append(
+                        {
+                            "week_start": key[0],
+                            "currency": key[1] if len(key) > 1 else None,
+                            "field": field,
+                            "expected": expected_value,
+                            "actual": actual_value,
+                        }
+                    )
+        return mismatches
+
+    def __usd_amounts(self, transaction: Transaction) -> tuple[Decimal, Decimal]:
+        """``(deposit, withdraw)`` USD contributions of a transaction."""
+        amount = convert_to_usd(
+            transaction.amount, transaction.currency, transaction.created
+        )
+        if transaction.amount > 0:
+            return amount, Decimal(0)
+        return Decimal(0), amount
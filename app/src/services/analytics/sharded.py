@@ -0,0 +1,75 @@
+from datetime import date, datetime
+from itertools import chain
+from typing import Callable, Dict, Iterable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.src.core.sharding import gather_shards
+from app.src.schemas.transaction_schemas import CohortFilter
+from app.src.services.analytics.cache import AnalysisBackend
+from app.src.services.analytics.report import ANALYSIS_FIELDS, report_window
+from app.src.services.transaction import CohortService
+
+
+def sum_report_rows(rows: Iterable[dict], reverse: bool = False) -> List[dict]:
+    """
+    Per-shard report rows summed per ``start_date`` and sorted by it.
+
+    A user lives on one shard together with all their transactions, so every
+    metric, the distinct user counts included, is the sum of its per-shard
+    values.
+    """
+    periods: Dict[date, dict] = {}
+    for row in rows:
+        period = periods.get(row["start_date"])
+        if period is None:
+            periods[row["start_date"]] = dict(row)
+            continue
+        for field in ANALYSIS_FIELDS:
+            period[field] += row[field]
+
+    return [periods[period] for period in sorted(periods, reverse=reverse)]
+
+
+class ShardedAnalysisService:
+    """
+    Weekly report summed over the reports of every shard, computed
+    concurrently.
+    """
+
+    def __init__(
+        self,
+        session_makers: List[async_sessionmaker[AsyncSession]],
+        backend: Callable[[AsyncSession], AnalysisBackend],
+    ):
+        self.__session_makers = session_makers
+        self.__backend = backend
+
+    async def get_weekly_report(
+        self, weeks: int = 52, today: date | None = None
+    ) -> List[dict]:
+        start, end = report_window(weeks, today)
+        return await self.get_weeks(start, end)
+
+    async def get_weeks(self, start: datetime, end: datetime) -> List[dict]:
+        """Report rows for active weeks in ``[start, end)``, newest first."""
+        reports = await gather_shards(
+            self.__session_makers,
+            lambda session: self.__backend(session).get_weeks(start, end),
+        )
+
+        return sum_report_rows(chain.from_iterable(reports), reverse=True)
+
+
+class ShardedCohortService:
+    """Cohort sizes summed over every shard, users being on exactly one."""
+
+    def __init__(self, session_makers: List[async_sessionmaker[AsyncSession]]):
+        self.__session_makers = session_makers
+
+    async def count(self, filters: CohortFilter) -> int:
+        counts = await gather_shards(
+            self.__session_makers,
+            lambda session: CohortService(session=session).count(filters),
+        )
+        return sum(counts)
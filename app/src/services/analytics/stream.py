@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.src.core.config import config
+from app.src.exceptions.transaction_exceptions import InvalidDateRangeException
+from app.src.schemas.transaction_schemas import AnalyticsFilter
+from app.src.services.analytics.report import report_query, to_report_row
+from app.src.services.analytics.sharded import sum_report_rows
+from app.src.utils.dates import next_period, period_start
+
+
+class TransactionAnalyticsService:
+    """
+    Analysis metrics over an arbitrary date range at day, week or month
+    granularity.
+
+    The range is processed in chunks of ``ANALYTICS_STREAM_CHUNK_BUCKETS``
+    buckets, one grouped query each, and buckets are yielded as soon as their
+    chunk is read, so memory stays flat and the first bytes go out before the
+    whole range is computed. Every chunk is queried on all shards
+    concurrently and their rows are summed per bucket.
+    """
+
+    def __init__(self, session_makers: List[async_sessionmaker[AsyncSession]]):
+        self.__session_makers = session_makers
+
+    def stream(self, filters: AnalyticsFilter) -> AsyncIterator[dict]:
+        """
+        :raises InvalidDateRangeException: If ``end_date`` is before ``start_date``.
+        """
+        if filters.end_date < filters.start_date:
+            raise InvalidDateRangeException
+        return self.__stream(filters)
+
+    async def __stream(self, filters: AnalyticsFilter) -> AsyncIterator[dict]:
+        granularity = filters.granularity
+        start = period_start(filters.start_date, granularity)
+        end = next_period(period_start(filters.end_date, granularity), granularity)
+        chunk_size = config.analytics.ANALYTICS_STREAM_CHUNK_BUCKETS
+
+        # The sessions are owned by the stream rather than the request so they
+        # stay open for as long as the response body is being sent.
+        async with AsyncExitStack() as stack:
+            sessions = [
+                await stack.enter_async_context(session_maker())
+                for session_maker in self.__session_makers
+            ]
+            while start < end:
+                chunk_end = min(next_period(start, granularity, chunk_size), end)
+                query = report_query(start, chunk_end, granularity, filters.currency)
+                results = await asyncio.gather(
+                    *(session.execute(query) for session in sessions)
+                )
+                for row in sum_report_rows(
+                    to_report_row(row, granularity)
+                    for result in results
+                    for row in result.mappings()
+                ):
+                    yield row
+                start = chunk_end
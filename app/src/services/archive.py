@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.core.config import config
+from app.src.exceptions.transaction_exceptions import (
+    ArchiveRowCountMismatchException,
+)
+from app.src.models.transaction import transaction_partition_name
+from app.src.models.transaction_archive import TransactionArchive
+from app.src.repositories.transaction import (
+    TransactionPartitionRepository,
+    TransactionRepository,
+)
+from app.src.repositories.transaction_archive import (
+    ArchiveFileWriter,
+    TransactionArchiveRepository,
+)
+from app.src.utils.dates import next_period, period_start
+
+
+def archive_file_name(start: datetime, shard: int = 0) -> str:
+    """Files of shards other than the primary are kept in ``shard-N/``."""
+    name = f"{start.year}/{start.year}-{start.month:02d}.parquet"
+    return name if shard == 0 else f"shard-{shard}/{name}"
+
+
+class TransactionArchiveService:
+    """
+    Moves transactions older than ``TRANSACTION_ARCHIVE_AFTER_DAYS`` to
+    compressed Parquet files, one per calendar month.
+
+    A month's file is written first. Its rows are then removed from
+    ``transaction`` and its manifest entry is added in the caller's
+    transaction, so readers find every row either hot or in a listed file.
+    The month is locked against writes before it is read, so a rollback
+    cannot change a row between the file and the removal. Months that are a
+    whole partition are locked and dropped with it instead of being deleted
+    row by row, which leaves no dead tuples to vacuum.
+
+    Each shard archives its own transactions; ``shard`` keeps the files of
+    one shard apart from another's.
+    """
+
+    def __init__(self, session: AsyncSession, shard: int = 0):
+        self.session = session
+        self.__shard = shard
+        self.__transaction_repository = TransactionRepository(session=self.session)
+        self.__archive_repository = TransactionArchiveRepository(session=self.session)
+        self.__partition_repository = TransactionPartitionRepository(
+            session=self.session
+        )
+
+    async def get_pending_months(
+        self, now: datetime | None = None
+    ) -> List[Tuple[datetime, datetime]]:
+        """``[start, end)`` of every month old enough and not archived yet."""
+        horizon = period_start(
+            (now or datetime.utcnow())
+            - timedelta(days=config.archive.TRANSACTION_ARCHIVE_AFTER_DAYS),
+            "month",
+        )
+        start = await self.__archive_repository.get_archived_until()
+        if start is None:
+            oldest = await self.__transaction_repository.get_oldest_created()
+            if oldest is None:
+                return []
+            start = period_start(oldest, "month")
+
+        months = []
+        while start < horizon:
+            months.append((start, next_period(start, "month")))
+            start = months[-1][1]
+        return months
+
+    async def archive_month(self, start: datetime, end: datetime) -> TransactionArchive:
+        """
+        Archive ``[start, end)``; the caller commits.
+
+        :raises ArchiveRowCountMismatchException: If fewer or more rows were
+            deleted than archived; the caller must roll back.
+        """
+        await self.__partition_repository.lock()
+        partition = transaction_partition_name(start)
+        whole_partition = await self.__partition_repository.lock_partition(partition)
+        chunk_size = config.archive.TRANSACTION_ARCHIVE_ROW_GROUP_SIZE
+        path = archive_file_name(start, self.__shard)
+        archive = TransactionArchive(
+            period_start=start, period_end=end, path=path, row_count=0
+        )
+
+        writer = None
+        try:
+            async for rows in self.__transaction_repository.iter_range(
+                start, end, chunk_size, lock=not whole_partition
+            ):
+                if writer is None:
+                    writer = await asyncio.to_thread(ArchiveFileWriter, path)
+                await asyncio.to_thread(writer.write, rows)
+                ids = [row["id"] for row in rows]
+                archive.row_count += len(rows)
+                archive.min_id = min(ids + [archive.min_id or ids[0]])
+                archive.max_id = max(ids + [archive.max_id or ids[0]])
+
+            if whole_partition:
+                await self.__partition_repository.drop_partition(partition)
+            else:
+                deleted = await self.__transaction_repository.delete_range(start, end)
+                if deleted != archive.row_count:
+                    raise ArchiveRowCountMismatchException
+        except BaseException:
+            if writer is not None:
+                await asyncio.to_thread(writer.discard)
+            raise
+        if writer is None:
+            archive.path = None
+        else:
+            await asyncio.to_thread(writer.close)
+
+        return await self.__archive_repository.create(archive)
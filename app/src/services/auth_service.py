@@ -1,18 +1,17 @@
-from sqlalchemy.ext.asyncio import AsyncSession
 from app.src.core.redis import RedisClient
 from app.src.exceptions.auth_exceptions import InvalidUserPasswordException
 
 from app.src.schemas.auth import RequestUserLoginInfoModel, TokenInfo
-from app.src.utils.auth_security import verify_password
 from app.src.models.user import User
 from app.src.schemas.user_schemas import RequestUserModel, ResponseUserModel, UserModel
-from app.src.services.user import UserService
+from app.src.services.password_hashing import password_hasher
+from app.src.services.user import ShardedUserService
 from app.src.utils.jwt import JWTHandler
 
 
 class AuthService:
-    def __init__(self, session: AsyncSession, redis: RedisClient):
-        self.user_sevice: UserService = UserService(session)
+    def __init__(self, users: ShardedUserService, redis: RedisClient):
+        self.user_sevice: ShardedUserService = users
         self.__redis_client = redis
 
     async def register(self, request_user: RequestUserModel) -> ResponseUserModel:
@@ -68,9 +67,10 @@ class AuthService:
             InvalidUserPasswordException: If the provided password does not match the stored hash.
             UserNotExistsException: If no user with the given email exists.
             UserAlreadyBlockedException: If the user account is blocked.
+            PasswordHashingBusyException: If the hashing pool stays saturated.
         """
         user: User = await self.user_sevice.get_active_user_by_email(email=email)
-        if not verify_password(password, user.password_hash):
+        if not await password_hasher.verify(password, user.password_hash):
             await self.__track_attempts(key)
             raise InvalidUserPasswordException
         return UserModel.model_validate(user)
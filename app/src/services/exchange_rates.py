@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from bisect import bisect_right
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.src.core.enums import CURRENCY_SCALES, EXCHANGE_RATES_TO_USD
+from app.src.repositories.exchange_rate import ExchangeRateRepository
+from app.src.utils.money import minor_unit
+
+logger = logging.getLogger(__name__)
+
+# Rates recorded in ``exchange_rate`` apply from their ``effective_from``;
+# anything older falls back to the static ``EXCHANGE_RATES_TO_USD`` table.
+HISTORY_START = datetime.min
+HISTORY_END = datetime.max
+
+RateHistory = Dict[str, Tuple[List[datetime], List[Decimal]]]
+
+
+def static_history() -> RateHistory:
+    return {
+        str(currency): ([HISTORY_START], [Decimal(str(rate))])
+        for currency, rate in EXCHANGE_RATES_TO_USD.items()
+    }
+
+
+class ExchangeRateStore:
+    """
+    In-memory, point-in-time view of the ``exchange_rate`` table.
+
+    Each currency keeps its effective dates and rates in two parallel sorted
+    lists, so a lookup is a single ``bisect``. The whole history is replaced
+    on every refresh, which makes reads lock-free: a request sees either the
+    old or the new snapshot, never a mix.
+    """
+
+    def __init__(self):
+        self.__history: RateHistory = static_history()
+        self.__task: asyncio.Task | None = None
+
+    def rate_at(self, currency: str, at: datetime | None = None) -> Decimal:
+        """USD rate of ``currency`` effective at ``at`` (latest when omitted)."""
+        effective_from, rates = self.__history[currency]
+        if at is None:
+            return rates[-1]
+        return rates[bisect_right(effective_from, at) - 1]
+
+    def convert(
+        self, amount: Decimal, currency: str, at: datetime | None = None
+    ) -> Decimal:
+        return amount * self.rate_at(currency, at)
+
+    def ranges(self) -> List[Tuple[str, Decimal, datetime, datetime]]:
+        """``(currency, rate, valid_from, valid_to)`` rows covering all time."""
+        rows = []
+        for currency, (effective_from, rates) in self.__history.items():
+            valid_to = effective_from[1:] + [HISTORY_END]
+            rows.extend(zip([currency] * len(rates), rates, effective_from, valid_to))
+        return rows
+
+    def minor_unit_ranges(self) -> List[Tuple[str, Decimal, datetime, datetime]]:
+        """``ranges`` with USD rates per minor unit of the stored amounts."""
+        return [
+            (currency, rate * minor_unit(currency), valid_from, valid_to)
+            for currency, rate, valid_from, valid_to in self.ranges()
+            if currency in CURRENCY_SCALES
+        ]
+
+    async def refresh(self, session: AsyncSession) -> None:
+        history = static_history()
+        for exchange_rate in await ExchangeRateRepository(session).get_history():
+            # A currency missing from the static table uses its first known
+            # rate for everything before it.
+            effective_from, rates = history.setdefault(
+                exchange_rate.currency, ([HISTORY_START], [exchange_rate.rate])
+            )
+            effective_from.append(exchange_rate.effective_from)
+            rates.append(exchange_rate.rate)
+        self.__history = history
+
+    def start(self, session_maker: async_sessionmaker, interval: int) -> None:
+        """Refresh every ``interval`` seconds in a background task."""
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run(session_maker, interval))
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+
+    async def __run(self, session_maker: async_sessionmaker, interval: int) -> None:
+        while True:
+            try:
+                async with session_maker() as session:
+                    await self.refresh(session)
+            except (SQLAlchemyError, OSError):
+                logger.exception("Exchange rate refresh failed, keeping old rates")
+            await asyncio.sleep(interval)
+
+
+exchange_rate_store = ExchangeRateStore()
@@ -0,0 +1,105 @@
+from typing import AsyncGenerator, AsyncIterator, List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.src.core.config import config
+from app.src.core.sharding import ShardRouter, merge_shard_chunks
+from app.src.models.transaction import Transaction
+from app.src.repositories.transaction import TransactionRepository
+from app.src.schemas.transaction_schemas import TransactionFilter
+from app.src.utils.money import from_minor_units
+from app.src.utils.pagination import decode_cursor, encode_cursor
+
+EXPORT_FIELDS = ("id", "user_id", "currency", "amount", "status", "created", "cursor")
+
+
+class TransactionExportService:
+    """
+    Streams every transaction matching a filter, newest first.
+
+    Every shard is streamed on its own session and the streams are merged by
+    ``(created, id)``; a ``user_id`` filter only reads that user's shard.
+
+    Rows are read through a server-side cursor in chunks of
+    ``EXPORT_CHUNK_SIZE`` and handed out chunk by chunk, so memory use does
+    not depend on the size of the export. Archived transactions follow the
+    hot ones, read one Parquet row group at a time. Amounts are exported in
+    currency units and each row carries the ``cursor`` that resumes the
+    export right after it.
+    """
+
+    def __init__(
+        self,
+        router: ShardRouter,
+        session_makers: List[async_sessionmaker[AsyncSession]] | None = None,
+    ):
+        self.__router = router
+        self.__session_makers = session_makers or router.read_session_makers
+
+    def stream(
+        self, filters: TransactionFilter, cursor: str | None = None
+    ) -> AsyncIterator[List[dict]]:
+        """
+        :raises InvalidCursorException: If ``cursor`` is malformed.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        return self.__stream(filters, after)
+
+    async def __stream(
+        self, filters: TransactionFilter, after: tuple | None
+    ) -> AsyncIterator[List[dict]]:
+        session_makers = self.__session_makers
+        if filters.user_id is not None:
+            session_makers = [session_makers[self.__router.shard_for(filters.user_id)]]
+        streams = [
+            self.__stream_shard(session_maker, filters, after)
+            for session_maker in session_makers
+        ]
+        async for rows in merge_shard_chunks(
+            streams,
+            key=lambda row: (row["created"], row["id"]),
+            chunk_size=config.export.EXPORT_CHUNK_SIZE,
+            reverse=True,
+        ):
+            yield self.__to_export_rows(rows)
+
+    async def __stream_shard(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        filters: TransactionFilter,
+        after: tuple | None,
+    ) -> AsyncGenerator[List, None]:
+        chunk_size = config.export.EXPORT_CHUNK_SIZE
+
+        async with session_maker() as session:
+            repository = TransactionRepository(session)
+            archived_until = await repository.get_archived_until()
+            query = (
+                repository.filtered_query(filters, after, archived_until)
+                .with_only_columns(
+                    Transaction.id,
+                    Transaction.user_id,
+                    Transaction.currency,
+                    Transaction.amount,
+                    Transaction.status,
+                    Transaction.created,
+                )
+                .execution_options(yield_per=chunk_size)
+            )
+            result = await session.stream(query)
+            async for rows in result.mappings().partitions(chunk_size):
+                yield rows
+
+            if archived_until:
+                async for rows in repository.iter_archived(filters, after):
+                    yield rows
+
+    def __to_export_rows(self, rows) -> List[dict]:
+        return [
+            {
+                **row,
+                "amount": from_minor_units(row["amount"], row["currency"]),
+                "cursor": encode_cursor(row["created"], row["id"]),
+            }
+            for row in rows
+        ]
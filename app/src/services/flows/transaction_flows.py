@@ -1,29 +1,45 @@
-from decimal import Decimal
+from collections import defaultdict
+from typing import List
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.src.core.redis import RedisClient
 from app.src.exceptions.transaction_exceptions import (
     TransactionAlreadyRollbackedException,
+    TransactionArchivedException,
     TransactionDoesNotBelongToUserException,
 )
-from app.src.exceptions.user_exceptions import NegativeBalanceException
 from app.src.schemas.transaction_schemas import (
+    RequestTransactionBatchModel,
     RequestTransactionModel,
     TransactionModel,
     TransactionStatusEnum,
 )
+from app.src.services.analytics.cache import invalidate_weeks
+from app.src.services.analytics.rollup import WeeklyRollupService
+from app.src.services.idempotency import IdempotencyService, request_hash
+from app.src.services.ledger import LedgerService
 from app.src.services.transaction import TransactionService
 from app.src.services.user import UserService
 
 
 class CreateTransactionUseCase:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, redis: RedisClient):
         self.__session = session
+        self.__redis = redis
         self.__transaction_service = TransactionService(session=self.__session)
         self.__user_service = UserService(session=self.__session)
+        self.__rollup_service = WeeklyRollupService(session=self.__session)
+        self.__ledger_service = LedgerService(session=self.__session)
+        self.__idempotency_service = IdempotencyService(
+            session=self.__session, redis=self.__redis
+        )
 
     async def execute(
-        self, user_id: int, request: RequestTransactionModel
+        self,
+        user_id: int,
+        request: RequestTransactionModel,
+        idempotency_key: str | None = None,
     ) -> TransactionModel:
         """
         Execute a transaction for a user and update their balance.
@@ -34,56 +50,137 @@ class CreateTransactionUseCase:
             - currency (str): The currency in which the transaction is made.
             - amount (Decimal): The transaction amount (positive for credit, negative for debit).
         :type request: RequestTransactionModel
+        :param idempotency_key: Optional client key; a repeated key replays the first response.
+        :type idempotency_key: str | None
         :return: A validated transaction model
         :rtype: TransactionModel
         :raises CreateTransactionForBlockedUserException: Try to create transaction for blocked user
         :raises UserBalanceNotFound: If no user's balance in database
         :raises UserNotExistsException: If the user does not exist in the system.
         :raises NegativeBalanceException: If the resulting balance after the transaction would be negative.
+        :raises IdempotencyKeyReusedException: If the key was used for a different request.
         """
-        user_balance = await self.__user_service.get_user_balance_by_currency(
-            user_id=user_id, currency=request.currency
-        )
-        new_balance_amount = self.__calculate_new_balance(
-            user_balance.amount, request_amount=request.amount
+        fingerprint = request_hash("create", request)
+        response = await self.__idempotency_service.replay(
+            user_id, idempotency_key, fingerprint
         )
-        user_balance = await self.__user_service.update_balance(
-            user_balance, amount=new_balance_amount
+        if response is not None:
+            return TransactionModel.model_validate(response)
+
+        await self.__user_service.change_balance(
+            user_id=user_id, currency=request.currency, delta=request.minor_amount
         )
 
         transaction = await self.__transaction_service.create_transaction(
             user_id=user_id, obj=request
         )
+        await self.__ledger_service.record_transactions([transaction])
+        await self.__rollup_service.record_transaction_created(transaction)
+        result = TransactionModel.model_validate(transaction)
+        response = result.model_dump(mode="json")
+        await self.__idempotency_service.save(user_id, idempotency_key, response)
 
         await self.__session.commit()
+        await self.__idempotency_service.remember(
+            user_id, idempotency_key, fingerprint, response
+        )
+        await invalidate_weeks(self.__redis, [transaction.created])
 
-        return TransactionModel.model_validate(transaction)
-
-    def __calculate_new_balance(
-        self, current_balance_amount: Decimal, request_amount: Decimal
-    ) -> Decimal:
-        return current_balance_amount + request_amount
+        return result
 
 
-class TransactionRollBackUseCase:
-    def __init__(self, session: AsyncSession):
+class CreateTransactionBatchUseCase:
+    def __init__(self, session: AsyncSession, redis: RedisClient):
         self.__session = session
+        self.__redis = redis
         self.__transaction_service = TransactionService(session=self.__session)
         self.__user_service = UserService(session=self.__session)
+        self.__rollup_service = WeeklyRollupService(session=self.__session)
+        self.__ledger_service = LedgerService(session=self.__session)
+        self.__idempotency_service = IdempotencyService(
+            session=self.__session, redis=self.__redis
+        )
 
-    def __calculate_new_balance(
-        self, balance_amount: Decimal, transaction_amount: Decimal
-    ) -> Decimal:
-        new_amount = balance_amount
+    async def execute(
+        self,
+        user_id: int,
+        request: RequestTransactionBatchModel,
+        idempotency_key: str | None = None,
+    ) -> List[TransactionModel]:
+        """
+        Execute a batch of transactions for a user in a single database
+        transaction.
+
+        Amounts are netted per currency and only the final balances are
+        validated, so the batch either applies completely or not at all.
+
+        :param user_id: The unique identifier of the user for whom the transactions are executed.
+        :type user_id: int
+        :param request: The batch request object containing the transactions in submission order.
+        :type request: RequestTransactionBatchModel
+        :param idempotency_key: Optional client key; a repeated key replays the first response.
+        :type idempotency_key: str | None
+        :return: Validated transaction models in submission order
+        :rtype: List[TransactionModel]
+        :raises CreateTransactionForBlockedUserException: Try to create transaction for blocked user
+        :raises UserBalanceNotFound: If a user's balance is missing for any currency of the batch
+        :raises UserNotExistsException: If the user does not exist in the system.
+        :raises NegativeBalanceException: If any resulting balance would be negative.
+        :raises IdempotencyKeyReusedException: If the key was used for a different request.
+        """
+        fingerprint = request_hash("create_batch", request)
+        response = await self.__idempotency_service.replay(
+            user_id, idempotency_key, fingerprint
+        )
+        if response is not None:
+            return [TransactionModel.model_validate(item) for item in response]
+
+        deltas = defaultdict(int)
+        for item in request.transactions:
+            deltas[item.currency] += item.minor_amount
+
+        balances = await self.__user_service.get_user_balances_for_update(
+            user_id=user_id, currencies=list(deltas)
+        )
+        await self.__user_service.apply_balance_deltas(balances, deltas)
+
+        transactions = await self.__transaction_service.create_transactions(
+            user_id=user_id, objs=request.transactions
+        )
+        await self.__ledger_service.record_transactions(transactions)
+        await self.__rollup_service.record_transactions_created(transactions)
+        result = [
+            TransactionModel.model_validate(transaction) for transaction in transactions
+        ]
+        response = [item.model_dump(mode="json") for item in result]
+        await self.__idempotency_service.save(user_id, idempotency_key, response)
+
+        await self.__session.commit()
+        await self.__idempotency_service.remember(
+            user_id, idempotency_key, fingerprint, response
+        )
+        await invalidate_weeks(
+            self.__redis, [transaction.created for transaction in transactions]
+        )
 
-        if transaction_amount < 0:
-            new_amount += abs(transaction_amount)
-        else:
-            new_amount -= transaction_amount
+        return result
 
-        return new_amount
 
-    async def execute(self, user_id: int, transaction_id: int) -> TransactionModel:
+class TransactionRollBackUseCase:
+    def __init__(self, session: AsyncSession, redis: RedisClient):
+        self.__session = session
+        self.__redis = redis
+        self.__transaction_service = TransactionService(session=self.__session)
+        self.__user_service = UserService(session=self.__session)
+        self.__rollup_service = WeeklyRollupService(session=self.__session)
+        self.__ledger_service = LedgerService(session=self.__session)
+        self.__idempotency_service = IdempotencyService(
+            session=self.__session, redis=self.__redis
+        )
+
+    async def execute(
+        self, user_id: int, transaction_id: int, idempotency_key: str | None = None
+    ) -> TransactionModel:
         """
         Roll back a transaction for a user and update their balance accordingly.
 
@@ -91,6 +188,8 @@ class TransactionRollBackUseCase:
         :type user_id: int
         :param transaction_id: The unique identifier of the transaction to be rolled back.
         :type transaction_id: int
+        :param idempotency_key: Optional client key; a repeated key replays the first response.
+        :type idempotency_key: str | None
         :return: A validated transaction model
         :rtype: TransactionModel
         :raises UserAlreadyBlockedException: If user is blocked.
@@ -101,35 +200,47 @@ class TransactionRollBackUseCase:
         :raises TransactionDoesNotBelongToUserException: If the transaction does not belong to the specified user.
         :raises TransactionAlreadyRollbackedException: If the transaction has already been rolled back.
         :raises NegativeBalanceException: If rolling back the transaction would result in a negative balance.
+        :raises IdempotencyKeyReusedException: If the key was used for a different request.
         """
-        user = await self.__user_service.get_active_user(user_id=user_id)
-
-        user_transacrion = await self.__transaction_service.get_one(
-            transaction_id=transaction_id
+        fingerprint = request_hash("rollback", transaction_id)
+        response = await self.__idempotency_service.replay(
+            user_id, idempotency_key, fingerprint
         )
+        if response is not None:
+            return TransactionModel.model_validate(response)
 
-        if user_transacrion.user_id != user.id:
-            raise TransactionDoesNotBelongToUserException
-
-        if user_transacrion.status == TransactionStatusEnum.roll_backed:
-            raise TransactionAlreadyRollbackedException
-
-        user_balance = await self.__user_service.get_user_balance_by_currency(
-            user.id, user_transacrion.currency
+        transaction = await self.__transaction_service.rollback_transaction(
+            transaction_id=transaction_id, user_id=user_id
         )
+        if transaction is None:
+            await self.__raise_rollback_error(user_id, transaction_id)
 
-        new_balance_amount: Decimal = self.__calculate_new_balance(
-            user_balance.amount, user_transacrion.amount
-        )
-        if new_balance_amount < 0:
-            raise NegativeBalanceException
-        await self.__user_service.update_balance(
-            user_balance, amount=new_balance_amount
+        await self.__user_service.change_balance(
+            user_id=user_id, currency=transaction.currency, delta=-transaction.amount
         )
+        await self.__ledger_service.record_rollback(transaction)
+        await self.__rollup_service.record_transaction_rollbacked(transaction)
+        result = TransactionModel.model_validate(transaction)
+        response = result.model_dump(mode="json")
+        await self.__idempotency_service.save(user_id, idempotency_key, response)
 
-        transaction = await self.__transaction_service.set_transaction_rollback(
-            transaction=user_transacrion
-        )
         await self.__session.commit()
+        await self.__idempotency_service.remember(
+            user_id, idempotency_key, fingerprint, response
+        )
+        await invalidate_weeks(self.__redis, [transaction.created])
 
-        return TransactionModel.model_validate(transaction)
+        return result
+
+    async def __raise_rollback_error(self, user_id: int, transaction_id: int) -> None:
+        """Find out why the rollback ``UPDATE`` matched no row."""
+        user = await self.__user_service.get_active_user(user_id=user_id)
+        transaction = await self.__transaction_service.get_one(
+            transaction_id=transaction_id
+        )
+        if transaction.user_id != user.id:
+            raise TransactionDoesNotBelongToUserException
+        if transaction.status == TransactionStatusEnum.roll_backed:
+            raise TransactionAlreadyRollbackedException
+        # Only archived transactions are found but never updated.
+        raise TransactionArchivedException
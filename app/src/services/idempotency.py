@@ -0,0 +1,127 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.core.config import config
+from app.src.core.redis import RedisClient
+from app.src.exceptions.transaction_exceptions import IdempotencyKeyReusedException
+from app.src.repositories.idempotency_key import IdempotencyKeyRepository
+
+KEY_PREFIX = "idempotency"
+
+
+def request_hash(operation: str, payload: Any) -> str:
+    """Fingerprint of a request, used to reject a key reused for another one."""
+    body = json.dumps([operation, jsonable_encoder(payload)], sort_keys=True)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Replays the stored response of a request already made with the same
+    ``Idempotency-Key``.
+
+    Completed responses are read from Redis first. On a miss the key is
+    claimed in the ``idempotency_key`` table inside the caller's database
+    transaction: a duplicate of a request still in flight blocks on that row
+    until the original commits and then replays its response, or takes over
+    if the original failed. The response is written to the same row before
+    the caller commits, so it is recorded if and only if the operation is.
+    """
+
+    def __init__(self, session: AsyncSession, redis: RedisClient):
+        self.__session = session
+        self.__redis = redis
+        self.__idempotency_key_repository = IdempotencyKeyRepository(
+            session=self.__session
+        )
+
+    async def replay(
+        self, user_id: int, key: str | None, request_hash: str
+    ) -> Any | None:
+        """
+        Stored response for ``key``, or ``None`` when the caller now owns the
+        key (or sent none) and must execute the request.
+
+        :raises IdempotencyKeyReusedException: If the key was used for a different request.
+        """
+        if key is None:
+            return None
+
+        stored = await self.__get_cached(user_id, key)
+        if stored is None:
+            if await self.__idempotency_key_repository.claim(
+                user_id, key, request_hash
+            ):
+                return None
+            idempotency_key = await self.__idempotency_key_repository.get_by_key(
+                user_id, key
+            )
+            stored = {
+                "request_hash": idempotency_key.request_hash,
+                "response": idempotency_key.response,
+            }
+
+        if stored["request_hash"] != request_hash:
+            raise IdempotencyKeyReusedException
+        return stored["response"]
+
+    async def save(self, user_id: int, key: str | None, response: Any) -> None:
+        """Record ``response`` for a claimed key, before the caller commits."""
+        if key is None:
+            return
+        await self.__idempotency_key_repository.set_response(user_id, key, response)
+
+    async def remember(
+        self, user_id: int, key: str | None, request_hash: str, response: Any
+    ) -> None:
+        """Cache a committed response in Redis; the table remains the fallback."""
+        if key is None:
+            return
+        try:
+            async with self.__redis as storage:
+                await storage.set_json(
+                    self.__cache_key(user_id, key),
+                    {"request_hash": request_hash, "response": response},
+                    expire=config.idempotency.IDEMPOTENCY_KEY_TTL,
+                )
+        except RedisError:
+            pass
+
+    async def __get_cached(self, user_id: int, key: str) -> dict | None:
+        try:
+            async with self.__redis as storage:
+                return await storage.get_json(self.__cache_key(user_id, key))
+        except RedisError:
+            return None
+
+    def __cache_key(self, user_id: int, key: str) -> str:
+        return f"{KEY_PREFIX}:{user_id}:{key}"
+
+
+class IdempotencyKeyPurgeService:
+    """
+    Deletes ``idempotency_key`` rows older than ``IDEMPOTENCY_KEY_TTL``, the
+    window Redis replays responses for, so the table does not grow forever.
+    A key is reusable once purged, just as after its Redis entry expires.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.__idempotency_key_repository = IdempotencyKeyRepository(session=session)
+
+    async def purge_batch(self, now: datetime | None = None) -> int:
+        """
+        Delete up to ``IDEMPOTENCY_PURGE_BATCH_SIZE`` expired keys; the
+        caller commits. Returns how many were deleted, 0 once none are left.
+        """
+        before = (now or datetime.utcnow()) - timedelta(
+            seconds=config.idempotency.IDEMPOTENCY_KEY_TTL
+        )
+        return await self.__idempotency_key_repository.delete_created_before(
+            before, config.idempotency.IDEMPOTENCY_PURGE_BATCH_SIZE
+        )
@@ -0,0 +1,122 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.exceptions.transaction_exceptions import InvalidDateRangeException
+from app.src.models.transaction import Transaction
+from app.src.repositories.ledger import (
+    BalanceSnapshotRepository,
+    LedgerEntryRepository,
+)
+from app.src.schemas.ledger_schemas import (
+    BalanceAtFilter,
+    LedgerEntryKindEnum,
+    LedgerEntryModel,
+    ResponseBalanceModel,
+    ResponseStatementModel,
+    StatementFilter,
+)
+from app.src.utils.dates import date_range_bounds
+from app.src.utils.money import from_minor_units
+
+
+class LedgerService:
+    """
+    Append-only record of every balance change.
+
+    Writers call the ``record_*`` methods before committing, so entries
+    change atomically with ``UserBalance``. Rollbacks are booked as
+    compensating entries and never modify earlier ones. Periodic snapshots
+    bound historical reads to the entries recorded since the latest snapshot.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.__ledger_entry_repository = LedgerEntryRepository(session=self.session)
+        self.__balance_snapshot_repository = BalanceSnapshotRepository(
+            session=self.session
+        )
+
+    async def record_transactions(self, transactions: List[Transaction]) -> None:
+        await self.__ledger_entry_repository.add_entries(
+            [
+                {
+                    "user_id": transaction.user_id,
+                    "transaction_id": transaction.id,
+                    "currency": transaction.currency,
+                    "amount": transaction.amount,
+                    "kind": LedgerEntryKindEnum.transaction,
+                }
+                for transaction in transactions
+            ]
+        )
+
+    async def record_rollback(self, transaction: Transaction) -> None:
+        await self.__ledger_entry_repository.add_entries(
+            [
+                {
+                    "user_id": transaction.user_id,
+                    "transaction_id": transaction.id,
+                    "currency": transaction.currency,
+                    "amount": -transaction.amount,
+                    "kind": LedgerEntryKindEnum.rollback,
+                }
+            ]
+        )
+
+    async def get_balances(
+        self, user_id: int, filters: BalanceAtFilter
+    ) -> List[ResponseBalanceModel]:
+        """Balances including every entry created before ``filters.at`` (now)."""
+        rows = await self.__ledger_entry_repository.get_balances(
+            user_id, filters.at or datetime.utcnow(), filters.currency
+        )
+        return [
+            ResponseBalanceModel(
+                currency=row["currency"],
+                amount=from_minor_units(row["amount"], row["currency"]),
+            )
+            for row in rows
+        ]
+
+    async def get_statement(
+        self, user_id: int, filters: StatementFilter
+    ) -> ResponseStatementModel:
+        """
+        Opening balance, entries and closing balance for the inclusive
+        ``[start_date, end_date]`` window.
+
+        :raises InvalidDateRangeException: If ``end_date`` is before ``start_date``.
+        """
+        if filters.end_date < filters.start_date:
+            raise InvalidDateRangeException
+        start, end = date_range_bounds(filters.start_date, filters.end_date)
+
+        opening = await self.__ledger_entry_repository.get_balances(
+            user_id, start, filters.currency
+        )
+        opening_balance = opening[0]["amount"] if opening else 0
+        entries = await self.__ledger_entry_repository.get_range(
+            user_id, filters.currency, start, end
+        )
+
+        closing_balance = opening_balance + sum(entry.amount for entry in entries)
+
+        return ResponseStatementModel(
+            currency=filters.currency,
+            start_date=filters.start_date,
+            end_date=filters.end_date,
+            opening_balance=from_minor_units(opening_balance, filters.currency),
+            closing_balance=from_minor_units(closing_balance, filters.currency),
+            entries=[LedgerEntryModel.model_validate(entry) for entry in entries],
+        )
+
+    async def take_snapshots(self, taken_at: datetime | None = None) -> int:
+        """Snapshot balances as of ``taken_at``, by default now."""
+        if taken_at is None:
+            taken_at = datetime.utcnow()
+        return await self.__balance_snapshot_repository.take(taken_at)
+
+    async def backfill(self) -> None:
+        await self.__ledger_entry_repository.backfill()
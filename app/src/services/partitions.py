@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.src.core.config import config
+from app.src.models.transaction import (
+    TRANSACTION_HISTORY_PARTITION,
+    transaction_partition_name,
+)
+from app.src.repositories.transaction import TransactionPartitionRepository
+from app.src.utils.dates import next_period, period_start
+
+
+class TransactionPartitionService:
+    """
+    Keeps monthly ``transaction`` partitions created ahead of time.
+
+    Partitions are contiguous: ``transaction_history`` holds everything
+    before the first monthly partition and each run appends months after the
+    current upper bound. There is deliberately no default partition, whose
+    rows every new partition would have to be checked against, so a row
+    dated past the last partition is rejected; keep ``months_ahead`` well
+    above the interval this runs at.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.__partition_repository = TransactionPartitionRepository(
+            session=self.session
+        )
+
+    async def ensure(
+        self, months_ahead: int | None = None, now: datetime | None = None
+    ) -> List[str]:
+        """
+        Create the partitions missing up to ``months_ahead`` months after the
+        current one and return their names.
+        """
+        if months_ahead is None:
+            months_ahead = config.partitions.TRANSACTION_PARTITIONS_AHEAD
+        current = period_start(now or datetime.utcnow(), "month")
+        until = next_period(current, "month", months_ahead + 1)
+
+        await self.__partition_repository.lock()
+        start = await self.__partition_repository.get_upper_bound()
+        created = []
+        if start is None:
+            await self.__partition_repository.create_partition(
+                TRANSACTION_HISTORY_PARTITION, None, current
+            )
+            created.append(TRANSACTION_HISTORY_PARTITION)
+            start = current
+
+        while start < until:
+            end = next_period(period_start(start, "month"), "month")
+            await self.__partition_repository.create_partition(
+                transaction_partition_name(start), start, end
+            )
+            created.append(transaction_partition_name(start))
+            start = end
+
+        return created
@@ -0,0 +1,84 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, TypeVar
+
+from app.src.core.config import config
+from app.src.exceptions.auth_exceptions import PasswordHashingBusyException
+from app.src.settings.password_hashing import PasswordHashExecutorEnum
+from app.src.utils.auth_security import get_password_hash, verify_password
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords on a worker pool, so Argon2 never runs on
+    the event loop.
+
+    At most ``PASSWORD_HASH_MAX_PENDING`` calls are queued on or running in
+    the pool. Callers beyond that wait up to ``PASSWORD_HASH_QUEUE_TIMEOUT``
+    seconds for a slot and are then turned away, so a burst of logins gets
+    quick 503s instead of a backlog every request has to sit through. A slot
+    is only freed once its worker is done, even if the caller went away.
+    """
+
+    def __init__(self):
+        self.__executor: Executor | None = None
+        self.__slots: asyncio.Semaphore | None = None
+
+    async def hash(self, password: str) -> str:
+        """:raises PasswordHashingBusyException: If no slot frees up in time."""
+        return await self.__run(get_password_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """:raises PasswordHashingBusyException: If no slot frees up in time."""
+        return await self.__run(verify_password, password, password_hash)
+
+    def start(self) -> None:
+        """Create the pool; the first call does it when not started."""
+        if self.__executor is not None:
+            return
+        settings = config.password_hashing
+        # Explicit, as ThreadPoolExecutor would default to cpu_count() + 4.
+        workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+        if settings.PASSWORD_HASH_EXECUTOR == PasswordHashExecutorEnum.PROCESS:
+            self.__executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn")
+            )
+        else:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hash"
+            )
+        self.__slots = asyncio.Semaphore(
+            max(workers, settings.PASSWORD_HASH_MAX_PENDING)
+        )
+
+    def stop(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+            self.__slots = None
+
+    async def __run(self, function: Callable[..., T], *args) -> T:
+        self.start()
+        slots = self.__slots
+        try:
+            await asyncio.wait_for(
+                slots.acquire(), config.password_hashing.PASSWORD_HASH_QUEUE_TIMEOUT
+            )
+        except TimeoutError as exc:
+            raise PasswordHashingBusyException from exc
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.__executor.submit(function, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+        return await asyncio.wrap_future(future)
+
+
+password_hasher = PasswordHasher()
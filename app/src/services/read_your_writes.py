@@ -0,0 +1,41 @@
+from redis.exceptions import RedisError
+
+from app.src.core.config import config
+from app.src.core.redis import RedisClient
+
+KEY_PREFIX = "recent_write"
+
+
+class ReadYourWritesService:
+    """
+    Remembers which users wrote in the last ``READ_YOUR_WRITES_WINDOW``
+    seconds, so their reads can skip a replica that may not have caught up.
+
+    Marks expire on their own in Redis and are shared by every app instance.
+    When Redis is unavailable users are treated as recent writers, trading
+    replica offload for consistency.
+    """
+
+    def __init__(self, redis: RedisClient):
+        self.__redis = redis
+
+    async def mark(self, user_id: int) -> None:
+        try:
+            async with self.__redis as storage:
+                await storage.set_json(
+                    self.__key(user_id),
+                    True,
+                    expire=config.database.READ_YOUR_WRITES_WINDOW,
+                )
+        except RedisError:
+            pass
+
+    async def wrote_recently(self, user_id: int) -> bool:
+        try:
+            async with self.__redis as storage:
+                return await storage.get_json(self.__key(user_id)) is not None
+        except RedisError:
+            return True
+
+    def __key(self, user_id: int) -> str:
+        return f"{KEY_PREFIX}:{user_id}"
@@ -0,0 +1,68 @@
+from typing import Dict
+
+from app.src.core.config import config
+from app.src.core.sharding import ShardRouter, gather_shards
+from app.src.repositories.sequence import IdSequenceRepository
+
+# Tables whose ids are shown across shards: merged into one keyset order and
+# looked up by id alone.
+SHARD_ID_TABLES = ("transaction", "ledger_entry", "balance_snapshot")
+
+# Ids the shards may still hand out at their old step while their sequences
+# are being switched over one by one.
+SHARD_ID_HEADROOM = 1_000_000
+
+
+class ShardIdService:
+    """
+    Keeps the ids of ``SHARD_ID_TABLES`` unique across shards. Each shard
+    has its own sequences, so they are interleaved: every sequence counts in
+    steps of ``SHARD_ID_STRIDE`` and those of shard ``i`` only hand out ids
+    equal to ``i`` modulo the stride. When a table is not interleaved yet,
+    e.g. on a new shard, all its sequences restart together above every id
+    handed out so far.
+    """
+
+    def __init__(self, router: ShardRouter):
+        self.__router = router
+        self.__stride = config.sharding.SHARD_ID_STRIDE
+
+    async def interleave(self) -> Dict[str, int | None]:
+        """
+        Interleave the sequences of ``SHARD_ID_TABLES`` that are not yet.
+        Returns the new first id of shard 0 per table, ``None`` for tables
+        left as they were. A single database keeps its sequences as they are.
+
+        :raises ValueError: If there are more shards than ``SHARD_ID_STRIDE``.
+        """
+        session_makers = self.__router.session_makers
+        if len(session_makers) > self.__stride:
+            raise ValueError(
+                f"{len(session_makers)} shards need SHARD_ID_STRIDE >= "
+                f"{len(session_makers)}, it is {self.__stride}"
+            )
+
+        restarted = dict.fromkeys(SHARD_ID_TABLES)
+        if not self.__router.sharded:
+            return restarted
+        for table in SHARD_ID_TABLES:
+            states = await gather_shards(
+                session_makers,
+                lambda session: IdSequenceRepository(session).get_state(table),
+            )
+            if all(
+                increment == self.__stride and current % self.__stride == shard
+                for shard, (_, current, increment) in enumerate(states)
+            ):
+                continue
+
+            last_id = max(last_id for last_id, _, _ in states) + SHARD_ID_HEADROOM
+            base = (last_id // self.__stride + 1) * self.__stride
+            for shard, session_maker in enumerate(session_makers):
+                async with session_maker() as session:
+                    await IdSequenceRepository(session).restart(
+                        table, base + shard, self.__stride
+                    )
+                    await session.commit()
+            restarted[table] = base
+        return restarted
@@ -1,19 +1,78 @@
-from datetime import date
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import chain
 from typing import List
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    DateTime,
+    Numeric,
+    and_,
+    column,
+    func,
+    select,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.src.core.enums import EXCHANGE_RATES_TO_USD
+from app.src.core.sharding import ShardRouter, gather_shards
 from app.src.exceptions.transaction_exceptions import TransactionNotExistsException
 from app.src.models.transaction import Transaction
+from app.src.models.types import CurrencyType
 from app.src.models.user import User
 from app.src.repositories.transaction import TransactionRepository
 from app.src.schemas.transaction_schemas import (
+    CohortActivityEnum,
+    CohortFilter,
     RequestTransactionModel,
+    ResponseTransactionPageModel,
+    TransactionFilter,
     TransactionModel,
+    TransactionPageParams,
     TransactionStatusEnum,
 )
+from app.src.services.exchange_rates import exchange_rate_store
+from app.src.utils.dates import date_range_bounds, day_start
+from app.src.utils.money import from_minor_units
+from app.src.utils.pagination import decode_cursor, encode_cursor
+
+
+# Metric building blocks shared with the grouped report queries in
+# ``app.src.services.analytics``.
+NOT_ROLLBACKED = Transaction.status != TransactionStatusEnum.roll_backed
+IS_DEPOSIT = Transaction.amount > 0
+IS_WITHDRAW = Transaction.amount < 0
+
+
+def exchange_rates_to_usd():
+    """
+    Inline ``VALUES (currency, rate, valid_from, valid_to)`` table with the
+    point-in-time rate history held by ``exchange_rate_store``. Rates are per
+    minor unit, so they apply to summed ``amount`` columns directly.
+    """
+    return values(
+        column("currency", CurrencyType),
+        column("rate", Numeric),
+        column("valid_from", DateTime),
+        column("valid_to", DateTime),
+        name="exchange_rates_to_usd",
+    ).data(exchange_rate_store.minor_unit_ranges())
+
+
+def rate_join_clause(rates):
+    """Match each transaction with the rate effective when it was created."""
+    return and_(
+        rates.c.currency == Transaction.currency,
+        Transaction.created >= rates.c.valid_from,
+        Transaction.created < rates.c.valid_to,
+    )
+
+
+def convert_to_usd(amount: int, currency: str, at: datetime | None = None) -> Decimal:
+    """
+    Convert ``amount`` minor units at the rate effective at ``at``, the latest
+    one when omitted.
+    """
+    return exchange_rate_store.convert(from_minor_units(amount, currency), currency, at)
 
 
 class TransactionService:
@@ -28,16 +87,27 @@ class TransactionService:
             raise TransactionNotExistsException
         return transaction
 
-    async def get_all(self, user_id: int | None) -> List[TransactionModel]:
-        if user_id:
-            transactions = await self.__transaction_repository.get_all_by_user_id(
-                user_id=user_id
-            )
-        else:
-            transactions = await self.__transaction_repository.get_all()
-        return [
-            TransactionModel.model_validate(transaction) for transaction in transactions
-        ]
+    async def get_page(
+        self, filters: TransactionFilter, page: TransactionPageParams
+    ) -> ResponseTransactionPageModel:
+        after = decode_cursor(page.cursor) if page.cursor else None
+        # One extra row tells whether another page exists without a COUNT.
+        transactions = await self.__transaction_repository.get_page(
+            filters, after, page.limit + 1
+        )
+
+        next_cursor = None
+        if len(transactions) > page.limit:
+            transactions = transactions[: page.limit]
+            last = transactions[-1]
+            next_cursor = encode_cursor(last.created, last.id)
+        return ResponseTransactionPageModel(
+            items=[
+                TransactionModel.model_validate(transaction)
+                for transaction in transactions
+            ],
+            next_cursor=next_cursor,
+        )
 
     async def create_transaction(
         self, user_id: int, obj: RequestTransactionModel
@@ -45,116 +115,122 @@ class TransactionService:
         transaction = Transaction(
             user_id=user_id,
             currency=obj.currency,
-            amount=obj.amount,
+            amount=obj.minor_amount,
             status=TransactionStatusEnum.processed,
         )
         transaction = await self.__transaction_repository.create(transaction)
         return transaction
 
-    async def set_transaction_rollback(self, transaction: Transaction) -> Transaction:
-        transaction = await self.__transaction_repository.update(
-            transaction, status=TransactionStatusEnum.roll_backed
+    async def create_transactions(
+        self, user_id: int, objs: List[RequestTransactionModel]
+    ) -> List[Transaction]:
+        return await self.__transaction_repository.create_many(
+            [
+                {
+                    "user_id": user_id,
+                    "currency": obj.currency,
+                    "amount": obj.minor_amount,
+                    "status": TransactionStatusEnum.processed,
+                }
+                for obj in objs
+            ]
         )
-        return transaction
 
+    async def rollback_transaction(
+        self, transaction_id: int, user_id: int
+    ) -> Transaction | None:
+        return await self.__transaction_repository.set_rollbacked(
+            transaction_id=transaction_id, user_id=user_id
+        )
 
-async def get_registered_and_deposit_users_count(
-    session: AsyncSession, dt_gt: date, dt_lt: date
-):
-    result = 0
-    q = select(User).where(
-        (func.date(User.created) >= dt_gt) & (func.date(User.created) <= dt_lt)
-    )
-    registered_users = await session.execute(q)
-    registered_users = registered_users.scalars()
-    for user in registered_users:
-        q = select(Transaction).where(
-            (func.date(Transaction.created) >= dt_gt)
-            & (func.date(Transaction.created) <= dt_lt)
-            & (Transaction.user_id == user.id)
-            & (Transaction.amount > 0)
+
+class ShardedTransactionService:
+    """
+    Transaction listing across every shard. A ``user_id`` filter is served
+    by that user's shard alone, since their transactions all live there.
+    """
+
+    def __init__(
+        self,
+        router: ShardRouter,
+        session_makers: List[async_sessionmaker[AsyncSession]] | None = None,
+    ):
+        self.__router = router
+        self.__session_makers = session_makers or router.session_makers
+
+    async def get_page(
+        self, filters: TransactionFilter, page: TransactionPageParams
+    ) -> ResponseTransactionPageModel:
+        """
+        The same page taken from every shard, merged by ``(created, id)``
+        and cut back to ``page.limit``.
+        """
+        session_makers = self.__session_makers
+        if filters.user_id is not None:
+            session_makers = [session_makers[self.__router.shard_for(filters.user_id)]]
+        pages = await gather_shards(
+            session_makers,
+            lambda session: TransactionService(session).get_page(
+                filters=filters, page=page
+            ),
         )
-        deposits = await session.execute(q)
-        deposits = deposits.fetchall()
-        if len(deposits) > 0:
-            result += 1
-    return result
-
-
-async def get_registered_and_not_rollbacked_deposit_users_count(
-    session: AsyncSession, dt_gt: date, dt_lt: date
-):
-    result = 0
-    q = select(User).where(
-        (func.date(User.created >= dt_gt)) & (func.date(User.created) <= dt_lt)
-    )
-    registered_users = await session.execute(q)
-    registered_users = registered_users.scalars()
-    for user in registered_users:
-        q = select(Transaction).where(
-            (func.date(Transaction.created) >= dt_gt)
-            & (func.date(Transaction.created) <= dt_lt)
-            & (Transaction.user_id == user.id)
-            & (Transaction.amount > 0)
-            & (Transaction.status != "ROLLBACKED")
+        if len(pages) == 1:
+            return pages[0]
+
+        items = sorted(
+            chain.from_iterable(shard_page.items for shard_page in pages),
+            key=lambda transaction: (transaction.created, transaction.id),
+            reverse=True,
         )
-        not_rollbacked_deposits = await session.execute(q)
-        not_rollbacked_deposits = not_rollbacked_deposits.fetchall()
-        if len(not_rollbacked_deposits) > 0:
-            result += 1
-    return result
-
-
-async def get_not_rollbacked_deposit_amount(
-    session: AsyncSession, dt_gt: date, dt_lt: date
-):
-    q = select(Transaction).where(
-        (func.date(Transaction.created) >= dt_gt)
-        & (func.date(Transaction.created) <= dt_lt)
-        & (Transaction.amount > 0)
-        & (Transaction.status != "ROLLBACKED")
-    )
-    not_rollbacked_deposits = await session.execute(q)
-    not_rollbacked_deposits = not_rollbacked_deposits.scalars()
-    return sum(
-        [x.amount * EXCHANGE_RATES_TO_USD[x.currency] for x in not_rollbacked_deposits]
-    )
+        next_cursor = None
+        if len(items) > page.limit or any(
+            shard_page.next_cursor for shard_page in pages
+        ):
+            items = items[: page.limit]
+            next_cursor = encode_cursor(items[-1].created, items[-1].id)
+        return ResponseTransactionPageModel(items=items, next_cursor=next_cursor)
 
 
-async def get_not_rollbacked_withdraw_amount(
-    session: AsyncSession, dt_gt: date, dt_lt: date
-):
-    q = select(Transaction).where(
-        (func.date(Transaction.created) >= dt_gt)
-        & (func.date(Transaction.created) <= dt_lt)
-        & (Transaction.amount < 0)
-        & (Transaction.status != "ROLLBACKED")
-    )
-    not_rollbacked_withdraws = await session.execute(q)
-    not_rollbacked_withdraws = not_rollbacked_withdraws.scalars()
-    return sum(
-        [x.amount * EXCHANGE_RATES_TO_USD[x.currency] for x in not_rollbacked_withdraws]
-    )
+class CohortService:
+    """
+    Counts users by registration window and transaction activity.
 
+    The activity condition is an ``EXISTS`` semi-join on ``transaction``, so
+    every question is answered by one ``COUNT`` without loading users or
+    transactions into Python.
+    """
 
-async def get_transactions_count(session: AsyncSession, dt_gt: date, dt_lt: date):
-    q = select(Transaction).where(
-        (func.date(Transaction.created) >= dt_gt)
-        & (func.date(Transaction.created) <= dt_lt)
-    )
-    transactions = await session.execute(q)
-    transactions = transactions.fetchall()
-    return len(transactions)
-
-
-async def get_not_rollbacked_transactions_count(
-    session: AsyncSession, dt_gt: date, dt_lt: date
-):
-    q = select(Transaction).where(
-        (func.date(Transaction.created) >= dt_gt)
-        & (func.date(Transaction.created) <= dt_lt)
-        & (Transaction.status != "ROLLBACKED")
-    )
-    transactions = await session.execute(q)
-    transactions = transactions.fetchall()
-    return len(transactions)
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def count(self, filters: CohortFilter) -> int:
+        registered_from, registered_to = date_range_bounds(
+            filters.registered_from, filters.registered_to
+        )
+        query = select(func.count(User.id)).where(
+            User.created >= registered_from, User.created < registered_to
+        )
+        if filters.activity:
+            query = query.where(self.__activity_clause(filters).exists())
+
+        return await self.session.scalar(query)
+
+    def __activity_clause(self, filters: CohortFilter):
+        query = select(Transaction.id).where(Transaction.user_id == User.id)
+
+        if filters.activity == CohortActivityEnum.deposit:
+            query = query.where(IS_DEPOSIT)
+        elif filters.activity == CohortActivityEnum.withdraw:
+            query = query.where(IS_WITHDRAW)
+        if filters.active_from:
+            query = query.where(Transaction.created >= day_start(filters.active_from))
+        if filters.active_to:
+            query = query.where(
+                Transaction.created < day_start(filters.active_to + timedelta(days=1))
+            )
+        if filters.currency:
+            query = query.where(Transaction.currency == filters.currency)
+        if filters.exclude_rollbacked:
+            query = query.where(NOT_ROLLBACKED)
+
+        return query
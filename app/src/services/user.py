@@ -1,16 +1,17 @@
-from datetime import date
-from decimal import Decimal
-from typing import Optional
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, List
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.src.core.exceptions import BadRequestDataException
+from app.src.core.sharding import ShardRouter, gather_shards
 from app.src.exceptions.transaction_exceptions import (
     CreateTransactionForBlockedUserException,
     RoleNotExistsException,
 )
 from app.src.exceptions.user_exceptions import (
+    InvalidBalanceFilterException,
     NegativeBalanceException,
     UserAlreadyActiveException,
     UserAlreadyBlockedException,
@@ -19,17 +20,53 @@ from app.src.exceptions.user_exceptions import (
     UserNotExistsException,
 )
 from app.src.models.user import User, UserBalance
-from app.src.repositories.user import UserBalanceRepository, UserRepository
+from app.src.repositories.user import (
+    UserBalanceRepository,
+    UserEmailRepository,
+    UserRepository,
+)
+from app.src.services.password_hashing import password_hasher
 from app.src.schemas.auth import RoleEnum
 from app.src.schemas.user_schemas import (
     RequestUserModel,
     RequestUserUpdateModel,
+    ResponseUserBalanceModel,
     ResponseUserModel,
-    UserBalanceModel,
+    ResponseUserPageModel,
+    SortOrderEnum,
     UserFilter,
     UserModel,
+    UserPageParams,
+    UserSortEnum,
     UserStatusEnum,
 )
+from app.src.utils.money import to_minor_units
+from app.src.utils.pagination import decode_cursor, encode_cursor
+
+
+def user_page_key(user: ResponseUserModel, sort: UserSortEnum) -> tuple:
+    return (user.created, user.id) if sort == UserSortEnum.created else (user.id,)
+
+
+def balance_range(filters: UserFilter) -> tuple[int | None, int | None]:
+    """
+    The filter's balance bounds in minor units of its currency.
+
+    :raises InvalidBalanceFilterException: If a bound is set without a
+        currency or is more precise than the currency allows.
+    """
+    bounds = (filters.balance_from, filters.balance_to)
+    if all(bound is None for bound in bounds):
+        return None, None
+    if filters.currency is None:
+        raise InvalidBalanceFilterException
+    try:
+        return tuple(
+            None if bound is None else to_minor_units(bound, filters.currency)
+            for bound in bounds
+        )
+    except ValueError as exc:
+        raise InvalidBalanceFilterException from exc
 
 
 class UserService:
@@ -46,6 +83,10 @@ class UserService:
 
     async def get_active_user_by_email(self, email: str) -> User:
         user: User = await self.__user_repository.get_by_email(email=email)
+        return self.check_active(user)
+
+    @staticmethod
+    def check_active(user: User | None) -> User:
         if not user:
             raise UserNotExistsException
         if user.status == UserStatusEnum.BLOCKED:
@@ -59,19 +100,61 @@ class UserService:
             raise UserAlreadyBlockedException
         return user
 
-    async def get_all(self, filters: Optional[UserFilter]) -> list[ResponseUserModel]:
-        users = await self.__user_repository.get_users_with_balancies(filters=filters)
-        return [ResponseUserModel.model_validate(user) for user in users]
+    async def get_page(
+        self, filters: UserFilter, page: UserPageParams
+    ) -> ResponseUserPageModel:
+        """
+        One page of users matching ``filters``. Balances, when included, are
+        loaded for the page's users only, in a single extra query.
 
-    async def create_user(self, model: RequestUserModel) -> User:
+        :raises InvalidCursorException: If ``page.cursor`` is malformed.
+        :raises InvalidBalanceFilterException: If the balance bounds are invalid.
+        """
+        after = decode_cursor(page.cursor) if page.cursor else None
+        # One extra row tells whether another page exists without a COUNT.
+        users = await self.__user_repository.get_page(
+            filters,
+            balance_range(filters),
+            page.sort,
+            page.order == SortOrderEnum.desc,
+            after,
+            page.limit + 1,
+        )
+
+        next_cursor = None
+        if len(users) > page.limit:
+            users = users[: page.limit]
+            next_cursor = encode_cursor(users[-1]["created"], users[-1]["id"])
+
+        balances = defaultdict(list)
+        if page.include_balances and users:
+            for balance in await self.__user_balance_repository.get_for_users(
+                [user["id"] for user in users]
+            ):
+                balances[balance.user_id].append(
+                    ResponseUserBalanceModel.model_validate(balance)
+                )
+        return ResponseUserPageModel(
+            items=[
+                ResponseUserModel(
+                    **user,
+                    user_balance=balances[user["id"]]
+                    if page.include_balances
+                    else None,
+                )
+                for user in users
+            ],
+            next_cursor=next_cursor,
+        )
+
+    async def create_user(self, model: RequestUserModel, id: int | None = None) -> User:
         if not model.email:
             raise BadRequestDataException
 
-        user = await self.__user_repository.get_by_email(model.email)
-        if user:
+        password_hash = await password_hasher.hash(model.password)
+        user = await self.__user_repository.create_user(model, password_hash, id=id)
+        if user is None:
             raise UserAlreadyExistsException
-
-        user = await self.__user_repository.create_user(model)
         return user
 
     async def patch_user(self, id: int, user: RequestUserUpdateModel) -> UserModel:
@@ -85,9 +168,23 @@ class UserService:
         await self.__session.commit()
         return UserModel.model_validate(updated_user)
 
-    async def get_user_balance_by_currency(
-        self, user_id: int, currency: str
-    ) -> UserBalance:
+    async def change_balance(self, user_id: int, currency: str, delta: int) -> int:
+        """
+        Atomically add ``delta`` minor units to the user's balance in
+        ``currency`` and return the new amount. The cause of a failure is only looked up after
+        the single ``UPDATE`` matched nothing.
+
+        :raises UserNotExistsException: If the user does not exist.
+        :raises CreateTransactionForBlockedUserException: If the user is blocked.
+        :raises UserBalanceNotFound: If no user's balance in database
+        :raises NegativeBalanceException: If the resulting balance would be negative.
+        """
+        amount = await self.__user_balance_repository.add_amount(
+            user_id=user_id, currency=currency, delta=delta
+        )
+        if amount is not None:
+            return amount
+
         user: User = await self.get_user(user_id=user_id)
         if user.status != UserStatusEnum.ACTIVE:
             raise CreateTransactionForBlockedUserException
@@ -98,8 +195,45 @@ class UserService:
         )
         if not user_balance:
             raise UserBalanceNotFound
+        raise NegativeBalanceException
 
-        return user_balance
+    async def get_user_balances_for_update(
+        self, user_id: int, currencies: List[str]
+    ) -> Dict[str, UserBalance]:
+        """
+        Lock the user's balances in ``currencies`` until commit.
+
+        :raises UserNotExistsException: If the user does not exist.
+        :raises CreateTransactionForBlockedUserException: If the user is blocked.
+        :raises UserBalanceNotFound: If any of the balances is missing.
+        """
+        user: User = await self.get_user(user_id=user_id)
+        if user.status != UserStatusEnum.ACTIVE:
+            raise CreateTransactionForBlockedUserException
+        balances = await self.__user_balance_repository.get_user_balances_for_update(
+            user_id=user.id, currencies=currencies
+        )
+        if len(balances) != len(set(currencies)):
+            raise UserBalanceNotFound
+
+        return {balance.currency: balance for balance in balances}
+
+    async def apply_balance_deltas(
+        self, balances: Dict[str, UserBalance], deltas: Dict[str, int]
+    ) -> None:
+        """
+        Add ``deltas`` (minor units) to locked ``balances``, one UPDATE per
+        balance.
+
+        :raises NegativeBalanceException: If any resulting balance is negative.
+        """
+        amounts = {
+            balances[currency].id: balances[currency].amount + delta
+            for currency, delta in deltas.items()
+        }
+        if any(amount < 0 for amount in amounts.values()):
+            raise NegativeBalanceException
+        await self.__user_balance_repository.update_amounts(amounts)
 
     async def update_role(self, user_id: int, role: str):
         if role not in list(RoleEnum):
@@ -109,22 +243,105 @@ class UserService:
         await self.__session.commit()
         return UserModel.model_validate(user)
 
-    async def update_balance(
-        self, balance: UserBalance, amount: Decimal
-    ) -> UserBalanceModel:
-        if balance.amount + amount < 0:
-            raise NegativeBalanceException
-        balance = await self.__user_balance_repository.update_balance(
-            balance, amount
-        )  # TODO
 
-        return UserBalanceModel.model_validate(balance)
+async def release_emails(router: ShardRouter, emails: List[str]) -> None:
+    """Release the directory claims of ``emails`` on the primary."""
+    async with router.session_makers[0]() as session:
+        await UserEmailRepository(session=session).release(emails)
+        await session.commit()
+
 
+class ShardedUserService:
+    """
+    User operations that are not about one known user id, run across every
+    shard: the admin user search, lookups by email and registration.
+    """
 
-async def get_registered_users_count(session: AsyncSession, dt_gt: date, dt_lt: date):
-    q = select(User).where(
-        (func.date(User.created >= dt_gt)) & (func.date(User.created) <= dt_lt)
-    )
-    registered_users = await session.execute(q)
-    registered_users = registered_users.fetchall()
-    return len(registered_users)
+    def __init__(
+        self,
+        router: ShardRouter,
+        session_makers: List[async_sessionmaker[AsyncSession]] | None = None,
+    ):
+        self.__router = router
+        self.__session_makers = session_makers or router.session_makers
+
+    async def get_page(
+        self, filters: UserFilter, page: UserPageParams
+    ) -> ResponseUserPageModel:
+        """
+        The same page taken from every shard, merged in sort order and cut
+        back to ``page.limit``.
+        """
+        pages = await gather_shards(
+            self.__session_makers,
+            lambda session: UserService(session).get_page(filters=filters, page=page),
+        )
+        items = sorted(
+            chain.from_iterable(shard_page.items for shard_page in pages),
+            key=lambda user: user_page_key(user, page.sort),
+            reverse=page.order == SortOrderEnum.desc,
+        )
+
+        next_cursor = None
+        if len(items) > page.limit or any(
+            shard_page.next_cursor for shard_page in pages
+        ):
+            items = items[: page.limit]
+            next_cursor = encode_cursor(items[-1].created, items[-1].id)
+        return ResponseUserPageModel(items=items, next_cursor=next_cursor)
+
+    async def get_active_user_by_email(self, email: str) -> User:
+        return UserService.check_active(await self.__find_by_email(email))
+
+    async def create_user(self, model: RequestUserModel) -> User:
+        """
+        Register the user on the shard of a new id. When sharded, the email is
+        first claimed in the primary's ``user_email`` directory together with
+        an id from the primary's sequence, in one statement, so ids are unique
+        across shards and of concurrent sign-ups with one address only the
+        first gets past the claim. The claim is released if the user is not
+        created.
+
+        :raises UserAlreadyExistsException: If the email is already claimed.
+        """
+        if not self.__router.sharded:
+            async with self.__router.session_makers[0]() as session:
+                return await UserService(session).create_user(model)
+        if not model.email:
+            raise BadRequestDataException
+
+        async with self.__router.session_makers[0]() as session:
+            claimed = await UserEmailRepository(session=session).claim([model.email])
+            await session.commit()
+        if not claimed:
+            raise UserAlreadyExistsException
+        user_id = claimed[model.email]
+
+        try:
+            async with self.__router.session_maker_for(user_id)() as session:
+                return await UserService(session).create_user(model, id=user_id)
+        except Exception:
+            await release_emails(self.__router, [model.email])
+            raise
+
+    async def register_emails(self, shard: int, chunk_size: int) -> tuple[int, int]:
+        """
+        Record the users of ``shard`` in the primary's ``user_email``
+        directory, ``chunk_size`` users per transaction. Returns how many
+        users were read and how many were not yet recorded.
+        """
+        read = added = 0
+        async with self.__router.session_makers[shard]() as session:
+            async for rows in UserRepository(session=session).iter_emails(chunk_size):
+                async with self.__router.session_makers[0]() as primary:
+                    added += await UserEmailRepository(session=primary).register(rows)
+                    await primary.commit()
+                read += len(rows)
+        return read, added
+
+    async def __find_by_email(self, email: str) -> User | None:
+        users = await gather_shards(
+            self.__session_makers,
+            lambda session: UserRepository(session=session).get_by_email(email),
+        )
+        return next((user for user in users if user is not None), None)
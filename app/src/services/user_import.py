@@ -0,0 +1,253 @@
+import asyncio
+import csv
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from multiprocessing import get_context
+from typing import AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+
+from app.src.core.config import config
+from app.src.core.sharding import ShardRouter
+from app.src.exceptions.user_exceptions import InvalidUserImportFileException
+from app.src.repositories.user import UserEmailRepository, UserRepository
+from app.src.schemas.user_schemas import (
+    RequestUserModel,
+    UserImportErrorModel,
+    UserImportReportModel,
+)
+from app.src.services.user import release_emails
+from app.src.utils.auth_security import get_password_hashes
+from app.src.utils.streaming import CsvLineBuffer
+
+IMPORT_COLUMNS = ("email", "first_name", "last_name", "password")
+
+ImportRow = Tuple[int, RequestUserModel]
+
+
+class UserImportService:
+    """
+    Registers users from CSV lines with the columns ``IMPORT_COLUMNS``,
+    header first and one user per record.
+
+    Lines are consumed as they arrive and every row is validated like a
+    sign-up. Valid rows are collected into batches of
+    ``USER_IMPORT_BATCH_SIZE`` whose passwords are hashed in a process pool;
+    a batch is loaded with ``UserRepository.bulk_create`` on the shard of
+    each id while the next one is hashed. Every rejected row is reported
+    with its line number and the reasons: invalid fields, an email repeated
+    in the file or one that is already registered.
+    """
+
+    def __init__(self, router: ShardRouter):
+        self.__router = router
+        self.__workers = (
+            config.user_import.USER_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+        )
+
+    async def import_lines(self, lines: AsyncIterator[str]) -> UserImportReportModel:
+        """
+        Batches loaded before a failure stay imported.
+
+        :raises InvalidUserImportFileException: If the input is not UTF-8 or
+            its header lacks one of ``IMPORT_COLUMNS``.
+        """
+        report = UserImportReportModel()
+        pool = ProcessPoolExecutor(
+            max_workers=self.__workers, mp_context=get_context("spawn")
+        )
+        load = None
+        try:
+            async for batch in self.__batches(lines, report):
+                hashes = await self.__hash(pool, [model.password for _, model in batch])
+                if load:
+                    await load
+                load = asyncio.create_task(self.__load(batch, hashes, report))
+            if load:
+                await load
+        except UnicodeDecodeError as exc:
+            raise InvalidUserImportFileException from exc
+        finally:
+            if load and not load.done():
+                load.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        report.errors.sort(key=lambda error: error.line)
+        return report
+
+    async def __batches(
+        self, lines: AsyncIterator[str], report: UserImportReportModel
+    ) -> AsyncIterator[List[ImportRow]]:
+        batch_size = config.user_import.USER_IMPORT_BATCH_SIZE
+        header = None
+        first_lines: Dict[str, int] = {}
+        batch: List[ImportRow] = []
+
+        async for line_number, values in self.__records(lines):
+            if isinstance(values, csv.Error):
+                if header is None:
+                    raise InvalidUserImportFileException from values
+                self.__reject(report, line_number, None, [str(values)])
+                continue
+            if not "".join(values).strip():
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                if not set(IMPORT_COLUMNS) <= set(header):
+                    raise InvalidUserImportFileException
+                continue
+
+            row = dict(zip(header, values))
+            if len(values) != len(header):
+                errors = [f"expected {len(header)} columns"]
+            else:
+                errors = self.__validate(row)
+            if isinstance(errors, list):
+                self.__reject(report, line_number, row.get("email"), errors)
+                continue
+            model = errors
+            if model.email in first_lines:
+                errors = [f"email: repeats line {first_lines[model.email]}"]
+                self.__reject(report, line_number, model.email, errors)
+                continue
+            first_lines[model.email] = line_number
+
+            batch.append((line_number, model))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def __records(
+        self, lines: AsyncIterator[str]
+    ) -> AsyncIterator[Tuple[int, List[str] | csv.Error]]:
+        """
+        The records of ``lines`` with the number of their first line, read by
+        a single ``csv.reader`` so that quoted fields may span lines.
+        """
+        buffer = CsvLineBuffer()
+        reader = csv.reader(buffer)
+        async for line in lines:
+            buffer.append(line)
+            while buffer.ready:
+                yield self.__read_record(reader)
+        while buffer:
+            yield self.__read_record(reader)
+
+    @staticmethod
+    def __read_record(reader) -> Tuple[int, List[str] | csv.Error]:
+        line_number = reader.line_num + 1
+        try:
+            return line_number, next(reader)
+        except csv.Error as exc:
+            return line_number, exc
+
+    @staticmethod
+    def __validate(row: Dict[str, str]) -> RequestUserModel | List[str]:
+        """The row as a sign-up, or why it is not one."""
+        values = {name: row.get(name) or None for name in IMPORT_COLUMNS}
+        missing = [f"{name}: required" for name, value in values.items() if not value]
+        if missing:
+            return missing
+        try:
+            return RequestUserModel(**values)
+        except ValidationError as exc:
+            return [
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                for error in exc.errors()
+            ]
+
+    async def __hash(
+        self, pool: ProcessPoolExecutor, passwords: List[str]
+    ) -> List[str]:
+        """Hash ``passwords`` in one slice per worker."""
+        loop = asyncio.get_running_loop()
+        size = -(-len(passwords) // self.__workers)
+        hashes = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool, get_password_hashes, passwords[offset : offset + size]
+                )
+                for offset in range(0, len(passwords), size)
+            )
+        )
+        return list(chain.from_iterable(hashes))
+
+    async def __load(
+        self,
+        batch: List[ImportRow],
+        hashes: List[str],
+        report: UserImportReportModel,
+    ) -> None:
+        """
+        When sharded, the emails are claimed in the primary's ``user_email``
+        directory with their ids first, as in ``ShardedUserService``; rows
+        whose email is already claimed are rejected and the claims of rows not
+        created on their shard are released.
+        """
+        rows = list(zip(batch, hashes))
+        user_ids = [None] * len(rows)
+        if self.__router.sharded:
+            async with self.__router.session_makers[0]() as session:
+                claimed = await UserEmailRepository(session).claim(
+                    [model.email for (_, model), _ in rows]
+                )
+                await session.commit()
+            rows = [row for row in rows if row[0][1].email in claimed]
+            user_ids = [claimed[model.email] for (_, model), _ in rows]
+
+        shards = defaultdict(list)
+        for ((line, model), password_hash), user_id in zip(rows, user_ids):
+            shards[self.__router.shard_for(user_id)].append(
+                (
+                    line,
+                    user_id,
+                    model.email,
+                    model.first_name,
+                    model.last_name,
+                    password_hash,
+                )
+            )
+        created = set(
+            chain.from_iterable(
+                await asyncio.gather(
+                    *(
+                        self.__bulk_create(shard, shard_rows)
+                        for shard, shard_rows in shards.items()
+                    )
+                )
+            )
+        )
+
+        if self.__router.sharded:
+            lost = [model.email for (_, model), _ in rows if model.email not in created]
+            if lost:
+                await release_emails(self.__router, lost)
+
+        report.imported += len(created)
+        for line, model in batch:
+            if model.email not in created:
+                self.__reject(report, line, model.email, ["email: already registered"])
+
+    async def __bulk_create(self, shard: int, rows: List[tuple]) -> List[str]:
+        try:
+            async with self.__router.session_makers[shard]() as session:
+                return await UserRepository(session).bulk_create(
+                    rows, with_ids=self.__router.sharded
+                )
+        except Exception:
+            if self.__router.sharded:
+                await release_emails(self.__router, [row[2] for row in rows])
+            raise
+
+    @staticmethod
+    def __reject(
+        report: UserImportReportModel, line: int, email: str | None, errors: List[str]
+    ) -> None:
+        report.rejected += 1
+        report.errors.append(
+            UserImportErrorModel(line=line, email=email, errors=errors)
+        )
@@ -0,0 +1,28 @@
+from enum import StrEnum
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class AnalyticsBackendEnum(StrEnum):
+    SQL = "sql"
+    ROLLUP = "rollup"
+    COLUMNAR = "columnar"
+
+
+class AnalyticsSetting(BaseSettings):
+    ANALYTICS_BACKEND: AnalyticsBackendEnum = AnalyticsBackendEnum.ROLLUP
+    ANALYTICS_CACHE_ENABLED: bool = True
+    ANALYTICS_CURRENT_WEEK_TTL: int = 60
+    ANALYTICS_STREAM_CHUNK_BUCKETS: int = 31
+    ANALYTICS_SNAPSHOT_REFRESH_INTERVAL: int = 60
+    # Rows are picked up once they are this many seconds old, so transactions
+    # still in flight when a refresh runs are not skipped.
+    ANALYTICS_SNAPSHOT_LAG: int = 60
+    ANALYTICS_SNAPSHOT_CHUNK_SIZE: int = 50000
+    # Seconds a report waits for the first snapshot load before a 503.
+    ANALYTICS_SNAPSHOT_READY_TIMEOUT: float = 10
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
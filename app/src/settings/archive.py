@@ -0,0 +1,12 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ArchiveSetting(BaseSettings):
+    TRANSACTION_ARCHIVE_DIR: str = "archive/transactions"
+    TRANSACTION_ARCHIVE_AFTER_DAYS: int = 365
+    TRANSACTION_ARCHIVE_ROW_GROUP_SIZE: int = 50000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
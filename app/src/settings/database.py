@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,12 +9,28 @@ class PostgreSQLSetting(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_PORT: int
     POSTGRES_HOST: str
+    # Read replica used by read-only endpoints; unset fields fall back to the
+    # primary's, and without a host every read goes to the primary.
+    POSTGRES_REPLICA_HOST: Optional[str] = None
+    POSTGRES_REPLICA_PORT: Optional[int] = None
+    POSTGRES_REPLICA_DB: Optional[str] = None
+    # Seconds after a user's last write during which their reads stay on the
+    # primary, longer than the replica is expected to lag.
+    READ_YOUR_WRITES_WINDOW: int = 5
 
     @property
     def url(self):
         # postgresql+psycopg://db_user:db:pass@db_host:db_port/db_name
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def replica_url(self) -> Optional[str]:
+        if self.POSTGRES_REPLICA_HOST is None:
+            return None
+        port = self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        db = self.POSTGRES_REPLICA_DB or self.POSTGRES_DB
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_HOST}:{port}/{db}"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore",
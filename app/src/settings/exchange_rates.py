@@ -0,0 +1,10 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ExchangeRateSetting(BaseSettings):
+    EXCHANGE_RATES_REFRESH_INTERVAL: int = 300
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
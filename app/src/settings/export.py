@@ -0,0 +1,10 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ExportSetting(BaseSettings):
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
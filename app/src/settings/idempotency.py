@@ -0,0 +1,12 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class IdempotencySetting(BaseSettings):
+    IDEMPOTENCY_KEY_TTL: int = 86400
+    # Expired keys deleted per transaction by the purge command.
+    IDEMPOTENCY_PURGE_BATCH_SIZE: int = 10000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
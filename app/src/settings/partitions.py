@@ -0,0 +1,10 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class PartitionSetting(BaseSettings):
+    TRANSACTION_PARTITIONS_AHEAD: int = 3
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
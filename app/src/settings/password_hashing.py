@@ -0,0 +1,27 @@
+from enum import StrEnum
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class PasswordHashExecutorEnum(StrEnum):
+    # Argon2 releases the GIL, so threads hash in parallel without the cost
+    # of shipping each call to another process.
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class PasswordHashingSetting(BaseSettings):
+    PASSWORD_HASH_EXECUTOR: PasswordHashExecutorEnum = PasswordHashExecutorEnum.THREAD
+    # Pool size, ``os.cpu_count()`` when unset.
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    # Hashes queued on or running in the pool at once, at least one per
+    # worker.
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Seconds a call waits for a free slot before it is turned away.
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
@@ -0,0 +1,19 @@
+from typing import List
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ShardingSetting(BaseSettings):
+    # Databases users are spread over besides the primary, which is shard 0
+    # and keeps the shared tables. A JSON list of SQLAlchemy URLs.
+    SHARD_URLS: List[str] = []
+    # Points per shard on the hash ring; more points even out the spread.
+    SHARD_VIRTUAL_NODES: int = 128
+    # Step of the interleaved id sequences of each shard, see
+    # ``ShardIdService``; must not be below the number of shards.
+    SHARD_ID_STRIDE: int = 16
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
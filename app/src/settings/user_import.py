@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class UserImportSetting(BaseSettings):
+    # Valid rows hashed and loaded together.
+    USER_IMPORT_BATCH_SIZE: int = 5000
+    # Processes hashing passwords, one per CPU when unset.
+    USER_IMPORT_HASH_WORKERS: Optional[int] = None
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",
+    )
@@ -1,3 +1,5 @@
+from typing import List
+
 from pwdlib import PasswordHash
 
 
@@ -13,3 +15,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str):
     return password_hash.hash(password)
+
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    return [password_hash.hash(password) for password in passwords]
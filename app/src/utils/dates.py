@@ -0,0 +1,60 @@
+from datetime import date, datetime, time, timedelta
+from typing import List
+
+
+def day_start(value: date) -> datetime:
+    return datetime.combine(value, time.min)
+
+
+def date_range_bounds(dt_gt: date, dt_lt: date) -> tuple[datetime, datetime]:
+    """
+    Turn an inclusive ``[dt_gt, dt_lt]`` date window into a half-open
+    ``[start, end)`` datetime range usable directly against timestamp columns.
+    """
+    return day_start(dt_gt), day_start(dt_lt + timedelta(days=1))
+
+
+def created_bounds(filters) -> tuple[datetime | None, datetime | None]:
+    """
+    A filter's inclusive ``[created_from, created_to]`` dates, either of them
+    optional, as a half-open range.
+    """
+    start = day_start(filters.created_from) if filters.created_from else None
+    end = None
+    if filters.created_to:
+        end = day_start(filters.created_to + timedelta(days=1))
+    return start, end
+
+
+def week_start(value: date) -> datetime:
+    """Monday 00:00 of the calendar week containing ``value``."""
+    monday = value - timedelta(days=value.weekday())
+    return datetime(monday.year, monday.month, monday.day)
+
+
+def window_starts(value: date) -> List[datetime]:
+    """
+    Starts of the seven-day windows containing ``value``, one per weekday a
+    window can start on, latest first.
+    """
+    day = day_start(value)
+    return [day - timedelta(days=offset) for offset in range(7)]
+
+
+def period_start(value: date, granularity: str) -> datetime:
+    """Start of the ``day``/``week``/``month`` period containing ``value``."""
+    if granularity == "month":
+        return datetime(value.year, value.month, 1)
+    if granularity == "week":
+        return week_start(value)
+    return day_start(value)
+
+
+def next_period(value: datetime, granularity: str, count: int = 1) -> datetime:
+    """Start of the period ``count`` periods after the one starting at ``value``."""
+    if granularity == "month":
+        month = value.month - 1 + count
+        return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+    if granularity == "week":
+        return value + timedelta(weeks=count)
+    return value + timedelta(days=count)
@@ -0,0 +1,40 @@
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import PlainSerializer
+
+from app.src.core.enums import CURRENCY_SCALES
+
+BIGINT_MIN = -(2**63)
+BIGINT_MAX = 2**63 - 1
+
+# Response amounts: exact in Python, but still JSON numbers as they were
+# before amounts were stored in minor units.
+JsonAmount = Annotated[
+    Decimal, PlainSerializer(float, return_type=float, when_used="json")
+]
+
+
+def minor_unit(currency: str) -> Decimal:
+    """Value of one minor unit of ``currency``, e.g. ``0.01`` for USD."""
+    return Decimal(1).scaleb(-CURRENCY_SCALES[currency])
+
+
+def to_minor_units(amount: Decimal, currency: str) -> int:
+    """
+    ``amount`` of ``currency`` as an integer number of minor units.
+
+    :raises ValueError: If ``amount`` is more precise than ``currency`` allows
+        or does not fit a ``BIGINT`` column.
+    """
+    scale = CURRENCY_SCALES[currency]
+    minor = Decimal(amount).scaleb(scale)
+    if minor != minor.to_integral_value():
+        raise ValueError(f"{currency} amounts can have at most {scale} decimal places")
+    if not BIGINT_MIN <= minor <= BIGINT_MAX:
+        raise ValueError(f"{currency} amount is out of range")
+    return int(minor)
+
+
+def from_minor_units(amount: int, currency: str) -> Decimal:
+    return Decimal(amount).scaleb(-CURRENCY_SCALES[currency])
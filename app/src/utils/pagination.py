@@ -0,0 +1,19 @@
+import base64
+import binascii
+from datetime import datetime
+
+from app.src.exceptions.transaction_exceptions import InvalidCursorException
+
+
+def encode_cursor(created: datetime, id: int) -> str:
+    """Opaque cursor pointing right after the row ``(created, id)``."""
+    raw = f"{created.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created), int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorException from exc
@@ -0,0 +1,109 @@
+import codecs
+import csv
+import io
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, Sequence
+
+from fastapi.encoders import jsonable_encoder
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+async def to_ndjson(rows: AsyncIterator[Any]) -> AsyncIterator[str]:
+    """Encode each item of ``rows`` as one JSON line."""
+    async for row in rows:
+        yield json.dumps(jsonable_encoder(row)) + "\n"
+
+
+async def chunks_to_ndjson(chunks: AsyncIterator[List[Any]]) -> AsyncIterator[str]:
+    """Encode each chunk of rows as one block of JSON lines."""
+    async for chunk in chunks:
+        yield "".join(json.dumps(jsonable_encoder(row)) + "\n" for row in chunk)
+
+
+async def chunks_to_csv(
+    chunks: AsyncIterator[List[dict]], fields: Sequence[str]
+) -> AsyncIterator[str]:
+    """Encode chunks of dict rows as CSV, header first, one block per chunk."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    async for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], encoding: str = "utf-8-sig"
+) -> AsyncIterator[str]:
+    """Decode a byte stream as it arrives and yield it line by line."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    async for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+class CsvLineBuffer:
+    """
+    Lines waiting to be read by one ``csv.reader`` (default dialect), with or
+    without their line break.
+
+    The lines are followed through the reader's quoting rules, so it is only
+    advanced once the buffered lines end a record (``ready``). A quoted field
+    spanning several lines is then read whole, even though lines arrive one
+    at a time.
+    """
+
+    def __init__(self):
+        self.__lines: Deque[str] = deque()
+        self.__in_quotes = False
+
+    def append(self, line: str) -> None:
+        line = line.removesuffix("\n").removesuffix("\r")
+        self.__lines.append(line + "\n")
+        if self.__in_quotes or '"' in line:
+            self.__in_quotes = self.__ends_in_quotes(line, self.__in_quotes)
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.__lines) and not self.__in_quotes
+
+    def __bool__(self) -> bool:
+        return bool(self.__lines)
+
+    def __iter__(self) -> "CsvLineBuffer":
+        return self
+
+    def __next__(self) -> str:
+        if not self.__lines:
+            raise StopIteration
+        return self.__lines.popleft()
+
+    @staticmethod
+    def __ends_in_quotes(line: str, in_quotes: bool) -> bool:
+        """
+        Whether ``line`` ends inside a quoted field. Quotes only open a field
+        at its start; inside one, a doubled quote is a literal quote.
+        """
+        field_start = not in_quotes
+        after_quote = False
+        for char in line:
+            if in_quotes:
+                if char == '"':
+                    in_quotes, after_quote = False, True
+            elif char == '"' and (field_start or after_quote):
+                in_quotes, after_quote = True, False
+            else:
+                field_start, after_quote = char == ",", False
+        return in_quotes